@@ -0,0 +1,77 @@
+// Micro-benchmark for suggestion ranking. Run with `node components/autocomplete_search/autocomplete_bench.js [count]`,
+// or load it after autocomplete_core.js in a page and call `runAutocompleteBenchmark(50000)` from the console.
+(function (root) {
+  const core = typeof module === "object" && module.exports ? require("./autocomplete_core.js") : root.AutocompleteCore;
+  const WORDS = ["bow", "staff", "critical", "rate", "guard", "arrow", "rain", "max", "mp", "hp", "dte", "fire", "x"];
+  const KINDS = ["Item", "Stat", "Skill", "Skill Tree", "Registlet"];
+  const QUERIES = ["b", "bo", "bow", "cr", "crit rate", "guard 3", "ar rn", "max mp", "zz"];
+
+  function syntheticPayload(count) {
+    let seed = 7;
+    const random = () => (seed = (seed * 1103515245 + 12345) % 2147483648) / 2147483648;
+    const pick = (values) => values[Math.floor(random() * values.length)];
+    const rows = [];
+    for (let index = 0; index < count; index++) {
+      const words = Array.from({ length: 1 + Math.floor(random() * 3) }, () => pick(WORDS));
+      const value = `${words.map((word) => word[0].toUpperCase() + word.slice(1)).join(" ")} ${index}`;
+      rows.push({ value, label: random() < 0.8 ? value : `${value} — ${pick(WORDS)}`, kind: pick(KINDS) });
+    }
+    rows.sort((a, b) => (a.value < b.value ? -1 : a.value > b.value ? 1 : 0));
+    const payload = { hash: `bench-${count}`, kinds: KINDS, prefix: [], suffix: [], kind: [], labels: [] };
+    let previous = "";
+    rows.forEach((row, index) => {
+      let shared = 0;
+      while (shared < previous.length && previous[shared] === row.value[shared]) shared++;
+      payload.prefix.push(shared); payload.suffix.push(row.value.slice(shared)); payload.kind.push(KINDS.indexOf(row.kind));
+      if (row.label !== row.value) payload.labels.push([index, row.label]);
+      previous = row.value;
+    });
+    return { rows, payload };
+  }
+
+  function naiveMatches(rows, typed, limit) {
+    // The previous main-thread path: re-normalize every row, score it, then sort everything.
+    return rows.map((item) => ({ item, score: core.fuzzyScore(typed, `${item.value} ${item.label} ${item.kind}`) }))
+      .filter((entry) => entry.score > 0 && core.normalize(entry.item.value) !== core.normalize(typed))
+      .sort((a, b) => b.score - a.score || String(a.item.label).localeCompare(String(b.item.label)))
+      .slice(0, limit).map((entry) => entry.item);
+  }
+
+  function time(callback, repeat) {
+    const now = typeof performance !== "undefined" ? () => performance.now() : () => Date.now();
+    const started = now();
+    for (let run = 0; run < repeat; run++) callback();
+    return (now() - started) / repeat;
+  }
+
+  function runAutocompleteBenchmark(count = 50000, repeat = 5) {
+    const { rows, payload } = syntheticPayload(count);
+    let set = null;
+    const decode = time(() => { set = core.decodeSuggestions(payload); }, 1);
+    const results = { count, decodeMs: decode, queries: [] };
+    for (const query of QUERIES) {
+      const expected = naiveMatches(rows, query, 6).map((row) => row.value).join("|");
+      const actual = core.topMatches(set, query, 6).map((row) => row.value).join("|");
+      results.queries.push({
+        query,
+        naiveMs: time(() => naiveMatches(rows, query, 6), repeat),
+        topKMs: time(() => core.topMatches(set, query, 6), repeat),
+        same: expected === actual,
+      });
+    }
+    return results;
+  }
+
+  root.runAutocompleteBenchmark = runAutocompleteBenchmark;
+  if (typeof module === "object" && module.exports) {
+    module.exports = { runAutocompleteBenchmark, syntheticPayload, naiveMatches };
+    if (require.main === module) {
+      const results = runAutocompleteBenchmark(Number(process.argv[2]) || 50000);
+      console.log(`decode ${results.count} suggestions: ${results.decodeMs.toFixed(1)} ms`);
+      for (const row of results.queries) {
+        console.log(`${row.query.padEnd(10)} naive ${row.naiveMs.toFixed(1)} ms  top-k ${row.topKMs.toFixed(1)} ms${row.same ? "" : "  MISMATCH"}`);
+      }
+      process.exitCode = results.queries.every((row) => row.same) ? 0 : 1;
+    }
+  }
+})(typeof self !== "undefined" ? self : this);
@@ -0,0 +1,60 @@
+// Suggestion decoding and ranking shared by the page, the scoring worker, and the node benchmark.
+(function (root, factory) {
+  const core = factory();
+  if (typeof module === "object" && module.exports) module.exports = core;
+  else root.AutocompleteCore = core;
+})(typeof self !== "undefined" ? self : this, function () {
+  function normalize(value) { return String(value || "").toLowerCase().replace(/[^a-z0-9%:+-]+/g, " ").trim(); }
+
+  function scoreNormalized(q, c) {
+    if (!q || !c) return 0;
+    if (c === q) return 10000;
+    if (c.startsWith(q)) return 9000 - Math.min(c.length, 500);
+    if (c.includes(q)) return 7500 - c.indexOf(q);
+    let score = 0; let lastIndex = -1; let streak = 0;
+    for (const ch of q) {
+      const index = c.indexOf(ch, lastIndex + 1);
+      if (index === -1) return 0;
+      streak = index === lastIndex + 1 ? streak + 1 : 1;
+      score += 10 + streak * 4 - Math.min(index - lastIndex, 8);
+      lastIndex = index;
+    }
+    return score - Math.abs(c.length - q.length) * .2;
+  }
+
+  function fuzzyScore(query, candidate) { return scoreNormalized(normalize(query), normalize(candidate)); }
+
+  function decodeSuggestions(payload) {
+    // Front-coded values share a UTF-16 prefix with the previous row; labels are only sent when they differ.
+    const count = payload.suffix.length; const labels = new Map(payload.labels);
+    const set = { hash: payload.hash, values: new Array(count), labels: new Array(count), kinds: new Array(count), keys: new Array(count), texts: new Array(count) };
+    let previous = "";
+    for (let index = 0; index < count; index++) {
+      const value = previous.slice(0, payload.prefix[index]) + payload.suffix[index]; previous = value;
+      const label = labels.has(index) ? labels.get(index) : value; const kind = payload.kinds[payload.kind[index]];
+      set.values[index] = value; set.labels[index] = label; set.kinds[index] = kind;
+      set.keys[index] = normalize(value); set.texts[index] = normalize(`${value} ${label} ${kind}`);
+    }
+    return set;
+  }
+
+  function topMatches(set, typed, limit = 6) {
+    // Keeps only the best `limit` rows in a small sorted buffer instead of sorting every scored row.
+    const query = normalize(typed); if (!query || limit <= 0) return [];
+    const best = [];
+    const before = (a, b) => b.score - a.score || set.labels[a.index].localeCompare(set.labels[b.index]) || a.index - b.index;
+    for (let index = 0; index < set.texts.length; index++) {
+      if (set.keys[index] === query) continue;
+      const score = scoreNormalized(query, set.texts[index]);
+      if (score <= 0) continue;
+      const entry = { index, score };
+      if (best.length === limit && before(entry, best[limit - 1]) >= 0) continue;
+      let position = best.length === limit ? limit - 1 : best.length;
+      while (position > 0 && before(entry, best[position - 1]) < 0) { best[position] = best[position - 1]; position--; }
+      best[position] = entry;
+    }
+    return best.map((entry) => ({ value: set.values[entry.index], label: set.labels[entry.index], kind: set.kinds[entry.index] }));
+  }
+
+  return { normalize, scoreNormalized, fuzzyScore, decodeSuggestions, topMatches };
+});
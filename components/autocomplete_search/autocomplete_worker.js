@@ -0,0 +1,28 @@
+// Scores suggestions off the main thread. Only the newest pending match request runs; older ones are dropped.
+importScripts("./autocomplete_core.js");
+
+const DECODED_CACHE_LIMIT = 4;
+const decodedSets = new Map();
+let pending = null;
+let scheduled = false;
+
+function runPending() {
+  scheduled = false;
+  const request = pending; pending = null;
+  if (!request) return;
+  const set = decodedSets.get(request.hash);
+  const matches = set ? AutocompleteCore.topMatches(set, request.typed, request.limit) : [];
+  self.postMessage({ type: "matches", id: request.id, typed: request.typed, matches });
+}
+
+self.onmessage = (event) => {
+  const message = event.data || {};
+  if (message.type === "load") {
+    decodedSets.delete(message.hash);
+    decodedSets.set(message.hash, AutocompleteCore.decodeSuggestions(message.payload));
+    if (decodedSets.size > DECODED_CACHE_LIMIT) decodedSets.delete(decodedSets.keys().next().value);
+  } else if (message.type === "match") {
+    pending = message;
+    if (!scheduled) { scheduled = true; setTimeout(runPending, 0); }
+  }
+};
@@ -0,0 +1,38 @@
+import pytest
+
+from toram_search.query_plan import StatementRecorder, format_plans, plan_violations
+
+_RECORDER = pytest.StashKey[StatementRecorder]()
+
+
+def pytest_addoption(parser) -> None:
+    parser.addoption(
+        '--audit-query-plans',
+        action='store_true',
+        default=False,
+        help='EXPLAIN every SQL statement template executed by the suite and fail on hot full scans.',
+    )
+
+
+def pytest_configure(config) -> None:
+    if config.getoption('--audit-query-plans'):
+        recorder = StatementRecorder()
+        recorder.__enter__()
+        config.stash[_RECORDER] = recorder
+
+
+def pytest_sessionfinish(session, exitstatus) -> None:
+    recorder = session.config.stash.get(_RECORDER, None)
+    if recorder is None:
+        return
+    recorder.__exit__(None, None, None)
+    if plan_violations(recorder.plans()) and session.exitstatus == 0:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config) -> None:
+    recorder = config.stash.get(_RECORDER, None)
+    if recorder is not None:
+        terminalreporter.section('query plan audit')
+        terminalreporter.write_line(format_plans(recorder.plans()))
+
@@ -0,0 +1,40 @@
+from pathlib import Path
+import json
+
+from tests.item_db_factory import create_item_database
+from tests.skill_db_factory import create_skill_database
+
+
+def create_sources(root: Path) -> dict[str, Path]:
+    items = root / 'items.sqlite'
+    skills = root / 'skills.sqlite'
+    food_entries = root / 'food.csv'
+    food_aliases = root / 'aliases.json'
+    registlets = root / 'registlets.json'
+    create_item_database(items)
+    create_skill_database(skills)
+    food_aliases.write_text(json.dumps({
+        'stats': [{'key': 'maxmp', 'display': 'MaxMP', 'aliases': ['max mp']}]
+    }), encoding='utf-8')
+    food_entries.write_text('code,stat,level\n111,maxmp,10\n', encoding='utf-8')
+    registlets.write_text(json.dumps({
+        'metadata': {'valid_stoodie_levels': [220]},
+        'registlets': [],
+    }), encoding='utf-8')
+    return {
+        'items_path': items,
+        'skills_path': skills,
+        'food_entries_path': food_entries,
+        'food_aliases_path': food_aliases,
+        'registlets_path': registlets,
+    }
+
+
+def source_arguments(paths: dict[str, Path]) -> list[str]:
+    return [
+        '--items', str(paths['items_path']),
+        '--skills', str(paths['skills_path']),
+        '--food-entries', str(paths['food_entries_path']),
+        '--food-aliases', str(paths['food_aliases_path']),
+        '--registlets', str(paths['registlets_path']),
+    ]
@@ -0,0 +1,161 @@
+import asyncio
+import gzip
+import json
+from pathlib import Path
+from urllib.parse import quote
+
+from tests.source_factory import create_sources
+from toram_search.api import SearchAPI, start_server
+from toram_search.benchmarks import benchmark_local_api
+from toram_search.database import data_fingerprint, file_fingerprint
+
+_ALL = frozenset({'Items', 'Skills', 'Food', 'Registlets'})
+
+
+async def _exchange(port: int, requests: list[str]) -> list[tuple[int, dict[str, str], bytes]]:
+    """Send every request over one keep-alive connection and collect the responses."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    responses = []
+    try:
+        for request in requests:
+            writer.write(request.encode('latin-1'))
+            await writer.drain()
+            head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+            headers = {}
+            for line in head[1:]:
+                if line:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().casefold()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+            responses.append((int(head[0].split(' ')[1]), headers, body))
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return responses
+
+
+def _get(target: str, **headers: str) -> str:
+    lines = [f'GET {target} HTTP/1.1', 'Host: localhost']
+    lines.extend(f'{name.replace("_", "-")}: {value}' for name, value in headers.items())
+    return '\r\n'.join(lines) + '\r\n\r\n'
+
+
+def _serve(paths: dict[str, Path], requests: list[str]) -> list[tuple[int, dict[str, str], bytes]]:
+    async def run():
+        api = SearchAPI(paths, _ALL, max_workers=2)
+        try:
+            server = await start_server(api, '127.0.0.1', 0)
+            async with server:
+                return await _exchange(server.sockets[0].getsockname()[1], requests)
+        finally:
+            api.close()
+
+    return asyncio.run(run())
+
+
+def test_data_fingerprint_tracks_file_contents(tmp_path: Path) -> None:
+    paths = create_sources(tmp_path)
+    before = data_fingerprint(**paths)
+
+    assert data_fingerprint(**paths) == before
+    assert file_fingerprint(tmp_path / 'missing.sqlite') == 'missing'
+
+    paths['food_entries_path'].write_text('code,stat,level\n111,maxmp,10\n222,maxmp,20\n', encoding='utf-8')
+    assert data_fingerprint(**paths) != before
+
+
+def test_search_detail_and_autocomplete_share_one_keep_alive_connection(tmp_path: Path) -> None:
+    paths = create_sources(tmp_path)
+
+    responses = _serve(paths, [
+        _get(f'/search?q={quote("cr bow")}'),
+        _get('/items/1'),
+        _get(f'/skills/{quote("shield_skills/guardian", safe="")}'),
+        _get('/autocomplete?q=guar&mode=Skills'),
+        _get('/skills/shield_skills/guardian'),
+        _get('/items/999'),
+        _get('/search'),
+    ])
+
+    statuses = [status for status, _, _ in responses]
+    assert statuses == [200, 200, 200, 200, 200, 404, 400]
+    search = json.loads(responses[0][2])
+    assert search['mode'] == 'Universal'
+    assert search['items']['results']
+    assert json.loads(responses[1][2])['summary']['id'] == 1
+    skill = json.loads(responses[2][2])
+    assert skill['skill']['name'] == 'Guardian'
+    assert skill['skill']['raw_text']
+    assert [row['value'] for row in json.loads(responses[3][2])['suggestions']] == ['Guardian']
+    assert all(headers['connection'] == 'keep-alive' for _, headers, _ in responses)
+
+
+def test_etag_revalidation_and_gzip(tmp_path: Path) -> None:
+    paths = create_sources(tmp_path)
+    target = f'/search?q={quote("cr bow")}'
+    first, = _serve(paths, [_get(target)])
+    etag = first[1]['etag']
+
+    revalidated, compressed = _serve(paths, [
+        _get(target, If_None_Match=etag),
+        _get(target, Accept_Encoding='gzip, br'),
+    ])
+
+    assert revalidated[0] == 304
+    assert revalidated[2] == b''
+    assert compressed[1]['content-encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(compressed[2])) == json.loads(first[2])
+
+    paths['registlets_path'].write_text(json.dumps({
+        'metadata': {'valid_stoodie_levels': [220, 240]},
+        'registlets': [],
+    }), encoding='utf-8')
+    changed, = _serve(paths, [_get(target, If_None_Match=etag)])
+    assert changed[0] == 200
+    assert changed[1]['etag'] != etag
+
+
+def test_metrics_count_requests_by_route_and_status(tmp_path: Path) -> None:
+    paths = create_sources(tmp_path)
+
+    *_, metrics = _serve(paths, [_get('/search?q=food%20maxmp'), _get('/nope'), _get('/metrics')])
+
+    text = metrics[2].decode('utf-8')
+    assert metrics[1]['content-type'].startswith('text/plain')
+    assert 'toram_api_requests_total{route="search",status="200"} 1' in text
+    assert 'toram_api_requests_total{route="unknown",status="404"} 1' in text
+    assert 'toram_api_executor_workers 2' in text
+    assert 'toram_api_coalesced_searches_total 0' in text
+
+
+def test_connection_close_is_honoured(tmp_path: Path) -> None:
+    paths = create_sources(tmp_path)
+
+    (status, headers, _), = _serve(paths, [_get('/healthz', Connection='close')])
+
+    assert status == 200
+    assert headers['connection'] == 'close'
+
+
+def test_local_benchmark_reports_request_rate(tmp_path: Path) -> None:
+    paths = create_sources(tmp_path)
+
+    result = asyncio.run(benchmark_local_api(paths, _ALL, requests=30, concurrency=3, max_workers=2))
+
+    assert result.requests == 30
+    assert result.errors == 0
+    assert result.rate > 0
+    assert 'requests' in result.format()
+
+
+def test_malformed_content_length_gets_an_error_response(tmp_path: Path) -> None:
+    paths = create_sources(tmp_path)
+
+    for length, expected in (('abc', 400), ('-5', 400), ('+5', 400), (str(10**12), 413)):
+        (status, headers, body), = _serve(paths, [_get('/healthz', Content_Length=length)])
+        assert status == expected, length
+        assert headers['connection'] == 'close'
+        assert 'error' in json.loads(body)
+
+    (status, _, _), = _serve(paths, [_get('/healthz', Content_Length='2') + 'ok'])
+    assert status == 200
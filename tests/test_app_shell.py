@@ -6,7 +6,9 @@ streamlit = pytest.importorskip('streamlit')
 from streamlit.testing.v1 import AppTest
 
 from toram_search.interpretation import QueryChip, QueryInterpretation
+from toram_search.engine import SearchEngine
 from toram_search.models import UniversalSearchOutcome
+from toram_search.paging import OutcomeHandle
 
 ROOT = Path(__file__).resolve().parents[1]
 APP_PATH = ROOT / 'main.py'
@@ -30,7 +32,7 @@ def test_example_button_fills_query_without_searching() -> None:
     target = next(button for button in app.button if button.label == 'critical rate')
     target.click().run(timeout=10)
     assert app.session_state['query'] == 'critical rate'
-    assert app.session_state['last_outcome'] is None
+    assert app.session_state['last_search'] is None
 
 
 def test_food_example_fills_query_without_submitting() -> None:
@@ -40,11 +42,11 @@ def test_food_example_fills_query_without_submitting() -> None:
     target.click().run(timeout=10)
 
     assert app.session_state['query'] == 'food maxmp'
-    assert app.session_state['last_outcome'] is None
+    assert app.session_state['last_search'] is None
     assert app.session_state['last_submission_nonce'] == before_nonce
 
 
-def test_chip_removal_fills_query_clears_results_and_does_not_submit() -> None:
+def test_chip_removal_fills_query_clears_results_and_does_not_submit(monkeypatch) -> None:
     app = AppTest.from_file(APP_PATH).run(timeout=10)
     interpretation = QueryInterpretation(
         domain='Items',
@@ -57,46 +59,134 @@ def test_chip_removal_fills_query_clears_results_and_does_not_submit() -> None:
     )
     app.session_state['query'] = 'highest cr bow'
     app.session_state['last_submission_nonce'] = 'already-submitted'
-    app.session_state['last_outcome'] = UniversalSearchOutcome(
-        query='highest cr bow',
-        interpretation=interpretation,
-    )
-    app.session_state['item_limit'] = 60
-    app.session_state['skill_limit'] = 40
-    app.session_state['food_limit'] = 30
-    app.session_state['registlet_limit'] = 50
+    outcome = UniversalSearchOutcome(query='highest cr bow', interpretation=interpretation)
+    monkeypatch.setattr(SearchEngine, 'outcome', lambda self, handle, **_: outcome)
+    app.session_state['last_search'] = OutcomeHandle('Universal', 'highest cr bow', 'fingerprint')
     app.run(timeout=10)
 
     target = next(button for button in app.button if button.label == 'Critical Rate ×')
     target.click().run(timeout=10)
 
     assert app.session_state['query'] == 'bow'
-    assert app.session_state['last_outcome'] is None
+    assert app.session_state['last_search'] is None
     assert app.session_state['last_submission_nonce'] == 'already-submitted'
-    assert app.session_state['item_limit'] == 20
-    assert app.session_state['skill_limit'] == 20
-    assert app.session_state['food_limit'] == 20
-    assert app.session_state['registlet_limit'] == 20
     assert not any(button.label.endswith(' ×') for button in app.button)
 
 
-def test_mode_change_clears_outcome_and_resets_all_limits() -> None:
+def test_mode_change_clears_outcome() -> None:
     app = AppTest.from_file(APP_PATH).run(timeout=10)
-    app.session_state['last_outcome'] = UniversalSearchOutcome(query='old')
-    app.session_state['item_limit'] = 60
-    app.session_state['skill_limit'] = 40
-    app.session_state['food_limit'] = 30
-    app.session_state['registlet_limit'] = 50
+    app.session_state['last_search'] = OutcomeHandle('Universal', 'old', 'fingerprint')
     radio = list(app.sidebar.radio)[0]
     radio.set_value('Food').run(timeout=10)
 
     assert app.session_state['last_mode'] == 'Food'
-    assert app.session_state['last_outcome'] is None
-    assert app.session_state['item_limit'] == 20
-    assert app.session_state['skill_limit'] == 20
-    assert app.session_state['food_limit'] == 20
-    assert app.session_state['registlet_limit'] == 20
+    assert app.session_state['last_search'] is None
 
 
 def test_root_entrypoint_exists() -> None:
     assert APP_PATH.is_file()
+
+
+def test_memory_panel_is_hidden_without_admin_token(monkeypatch) -> None:
+    monkeypatch.delenv('TORAM_SEARCH_ADMIN_TOKEN', raising=False)
+    app = AppTest.from_file(APP_PATH)
+    app.query_params['admin'] = 'secret'
+    app.run(timeout=10)
+    assert not any(expander.label == 'Memory (admin)' for expander in app.sidebar.expander)
+
+
+def test_memory_panel_renders_for_matching_admin_token(monkeypatch) -> None:
+    monkeypatch.setenv('TORAM_SEARCH_ADMIN_TOKEN', 'secret')
+    app = AppTest.from_file(APP_PATH)
+    app.query_params['admin'] = 'secret'
+    app.run(timeout=10)
+    assert list(app.exception) == []
+    assert any(expander.label == 'Memory (admin)' for expander in app.sidebar.expander)
+
+
+@pytest.mark.parametrize(('token', 'recorded'), [('', False), ('secret', True)])
+def test_only_admin_searches_are_sized_for_the_memory_panel(monkeypatch, token: str, recorded: bool) -> None:
+    from toram_search import memory
+
+    monkeypatch.setattr(memory, '_sessions', type(memory._sessions)())
+    monkeypatch.setenv('TORAM_SEARCH_ADMIN_TOKEN', token)
+    app = AppTest.from_file(APP_PATH)
+    app.query_params['admin'] = 'secret'
+    app.run(timeout=10)
+    app.session_state['toram_search_box'] = {'event': 'submit', 'value': 'food maxmp', 'nonce': 1}
+    app.run(timeout=10)
+
+    assert list(app.exception) == []
+    assert app.session_state['last_search'] is not None
+    assert bool(memory.memory_report().sessions) is recorded
+
+
+def test_allocation_tracing_stops_when_the_admin_leaves(monkeypatch) -> None:
+    from toram_search.memory import tracing_session
+
+    monkeypatch.setenv('TORAM_SEARCH_ADMIN_TOKEN', 'secret')
+    app = AppTest.from_file(APP_PATH)
+    app.query_params['admin'] = 'secret'
+    app.run(timeout=10)
+    app.toggle(key='admin_tracemalloc').set_value(True).run(timeout=10)
+    assert tracing_session() is not None
+
+    app.query_params.pop('admin')
+    app.run(timeout=10)
+
+    assert list(app.exception) == []
+    assert tracing_session() is None
+
+
+def _server_ranked_search_box() -> None:
+    import streamlit as st
+
+    from toram_search.autocomplete import AutocompleteEngine
+    from toram_search.models import AutocompleteSuggestion
+    from ui.search import render_search_box
+
+    rows = tuple(AutocompleteSuggestion(value, value, 'Item') for value in ('Critical Rate', 'Critical Damage', 'Guardian'))
+    st.session_state.setdefault('speculated', [])
+    render_search_box(
+        value='', suggestions=rows, placeholder='', engine=AutocompleteEngine(rows), on_top_match=st.session_state.speculated.append
+    )
+
+
+def test_server_ranked_search_box_passes_on_its_top_match(monkeypatch) -> None:
+    from ui import search
+
+    monkeypatch.setattr(search, 'CLIENT_SUGGESTION_LIMIT', 2)
+    app = AppTest.from_function(_server_ranked_search_box).run(timeout=10)
+    assert app.session_state['speculated'] == []
+
+    app.session_state['toram_search_box'] = {'event': 'type', 'value': 'crit'}
+    app.run(timeout=10)
+
+    assert list(app.exception) == []
+    assert app.session_state['speculated'] == ['Critical Rate']
+
+
+def _results_page(engine) -> None:
+    import streamlit as st
+
+    from ui.results import render_domain_results
+
+    if 'last_search' not in st.session_state:
+        st.session_state.last_search = engine.search_handle('Skills', 'Shield Skills', page_size=1)
+    render_domain_results('skills', engine=engine)
+
+
+def test_show_more_grows_the_session_handle_inside_the_results_fragment(tmp_path: Path) -> None:
+    from tests.source_factory import create_sources
+
+    with SearchEngine(**create_sources(tmp_path), snapshot_path=None) as engine:
+        app = AppTest.from_function(_results_page, kwargs={'engine': engine}).run(timeout=10)
+        assert engine.outcome(app.session_state['last_search']).skills.total == 3
+
+        app.button(key='show_more_skills').click().run(timeout=10)
+
+        assert list(app.exception) == []
+        skills = engine.outcome(app.session_state['last_search']).skills
+        assert len(skills.results) == 3 and skills.cursor is None
+        assert not any(button.key == 'show_more_skills' for button in app.button)
+        assert 'results.skills' in app.session_state['admin_cpu_ms']
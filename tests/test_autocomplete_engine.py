@@ -0,0 +1,175 @@
+import json
+import random
+import shutil
+import subprocess
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from toram_search import autocomplete
+from toram_search.autocomplete import (
+    AutocompleteEngine,
+    AutocompleteIndex,
+    encode_suggestions,
+    fuzzy_score,
+    normalize_suggestion_text,
+)
+from toram_search.models import AutocompleteSuggestion
+
+
+def _reference_matches(suggestions, typed: str, limit: int = 6):
+    """Line-by-line port of getMatches in components/autocomplete_search/index.html."""
+    typed = typed.strip()
+    if not typed:
+        return ()
+    query = normalize_suggestion_text(typed)
+    scored = [
+        (fuzzy_score(query, normalize_suggestion_text(f'{row.value} {row.label} {row.kind}')), row)
+        for row in suggestions
+    ]
+    scored = [
+        entry for entry in scored
+        if entry[0] > 0 and normalize_suggestion_text(entry[1].value) != query
+    ]
+    scored.sort(key=lambda entry: (-entry[0], entry[1].label.casefold(), entry[1].label))
+    return tuple(row for _, row in scored[:limit])
+
+
+def _corpus(size: int, seed: int) -> tuple[AutocompleteSuggestion, ...]:
+    rng = random.Random(seed)
+    words = ['bow', 'staff', 'critical', 'rate', 'guard', 'arrow', 'rain', 'max', 'mp', 'hp', 'dte', 'fire', 'x']
+    kinds = ['Item', 'Stat', 'Skill', 'Skill Tree', 'Registlet']
+    rows = []
+    for index in range(size):
+        value = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 3))).title() + f' {index % 7}'
+        label = value if rng.random() < 0.8 else f'{value} — {rng.choice(words)}'
+        rows.append(AutocompleteSuggestion(value, label, rng.choice(kinds)))
+    return tuple(rows)
+
+
+def test_fuzzy_score_tiers() -> None:
+    assert fuzzy_score('bow', 'bow') == 10000
+    assert fuzzy_score('bow', 'bow item') == 9000 - 8
+    assert fuzzy_score('bow', 'test bow item') == 7500 - 5
+    assert 0 < fuzzy_score('tbw', 'test bow item') < 7000
+    assert fuzzy_score('zzz', 'test bow item') == 0
+    assert normalize_suggestion_text('  Critical-Rate (%) ') == 'critical-rate %'
+
+
+def test_engine_matches_reference_ordering() -> None:
+    suggestions = _corpus(400, seed=7)
+    engine = AutocompleteEngine(suggestions)
+    queries = ['b', 'bo', 'bow', 'cr', 'crit rate', 'guard 3', 'ar rn', 'max mp', 'x', 'mp 1', 'fr', 'zz', '  ']
+
+    for query in queries:
+        for limit in (1, 6, 25):
+            assert engine.matches(query, limit) == _reference_matches(suggestions, query, limit), (query, limit)
+
+
+def test_engine_excludes_the_exact_typed_value() -> None:
+    suggestions = (
+        AutocompleteSuggestion('Bow', 'Bow', 'Item Type'),
+        AutocompleteSuggestion('Bowgun', 'Bowgun', 'Item Type'),
+    )
+
+    assert [row.value for row in AutocompleteEngine(suggestions).matches('bow')] == ['Bowgun']
+
+
+def test_engine_prefix_tier_short_circuits_substring_scan(monkeypatch) -> None:
+    suggestions = tuple(AutocompleteSuggestion(f'Arrow {index}', f'Arrow {index}', 'Item') for index in range(50))
+    engine = AutocompleteEngine(suggestions + (AutocompleteSuggestion('Rain Arrow', 'Rain Arrow', 'Skill'),))
+    scored: list[str] = []
+    monkeypatch.setattr(autocomplete, 'fuzzy_score', lambda query, text: scored.append(text) or fuzzy_score(query, text))
+
+    assert len(engine.matches('arr', 6)) == 6
+    assert len(scored) == 50
+    assert 'rain arrow rain arrow skill' not in scored
+
+
+def test_index_views_match_per_mode_builds(tmp_path) -> None:
+    from tests.source_factory import create_sources
+
+    paths = create_sources(tmp_path)
+    available = frozenset({'Items', 'Skills', 'Food', 'Registlets'})
+    index = AutocompleteIndex(autocomplete.build_autocomplete_index('Universal', **paths, available_domains=available), 'abc')
+
+    for mode in ('Universal', 'Items', 'Skills', 'Food', 'Registlets'):
+        assert index.view(mode) == autocomplete.build_autocomplete_index(mode, **paths, available_domains=available), mode
+        assert index.view(mode) is index.view(mode)
+        assert index.engine(mode) is index.engine(mode)
+    assert index.fingerprint == 'abc'
+    assert len(index) == len(index.view('Universal'))
+
+
+def _decode_wire(payload) -> list[AutocompleteSuggestion]:
+    """Port of decodeSuggestions in the component, slicing by UTF-16 code units like JavaScript."""
+    labels = dict(payload['labels'])
+    rows = []
+    previous = b''
+    for index, (prefix, suffix) in enumerate(zip(payload['prefix'], payload['suffix'])):
+        encoded = previous[:prefix * 2] + suffix.encode('utf-16-le')
+        value = encoded.decode('utf-16-le')
+        rows.append(AutocompleteSuggestion(value, labels.get(index, value), payload['kinds'][payload['kind'][index]]))
+        previous = encoded
+    return rows
+
+
+def test_wire_payload_round_trips_and_is_smaller() -> None:
+    suggestions = _corpus(1500, seed=3) + (
+        AutocompleteSuggestion('Fire \U0001f525 Bow', 'Fire \U0001f525 Bow', 'Item'),
+        AutocompleteSuggestion('Fire \U0001f525 Bowgun', 'Fire \U0001f525 Bowgun — x', 'Item'),
+    )
+
+    payload = encode_suggestions(suggestions)
+
+    assert sorted(_decode_wire(payload), key=lambda row: (row.value, row.kind, row.label)) == sorted(
+        suggestions, key=lambda row: (row.value, row.kind, row.label)
+    )
+    assert payload['kinds'] == sorted(set(payload['kinds']), key=payload['kinds'].index)
+    assert len(payload['labels']) < len(suggestions) // 2
+    compact = json.dumps(payload, separators=(',', ':'))
+    verbose = json.dumps([asdict(row) for row in suggestions], separators=(',', ':'))
+    assert len(compact) < len(verbose) // 2
+
+
+def test_wire_hash_tracks_content_not_order() -> None:
+    suggestions = _corpus(50, seed=5)
+
+    assert encode_suggestions(suggestions)['hash'] == encode_suggestions(tuple(reversed(suggestions)))['hash']
+    assert encode_suggestions(suggestions)['hash'] != encode_suggestions(suggestions[1:])['hash']
+    engine = AutocompleteEngine(suggestions)
+    assert engine.wire is engine.wire
+
+
+_COMPONENT = Path(__file__).resolve().parents[1] / 'components' / 'autocomplete_search'
+_NODE_MATCHES = """
+const core = require(process.argv[1]);
+const { payload, queries } = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const set = core.decodeSuggestions(payload);
+console.log(JSON.stringify(queries.map((query) => core.topMatches(set, query, 6))));
+"""
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_component_core_matches_reference_ordering() -> None:
+    suggestions = _corpus(400, seed=7)
+    queries = ['b', 'bow', 'crit rate', 'ar rn', 'max mp', 'x', 'zz']
+    completed = subprocess.run(
+        ['node', '-e', _NODE_MATCHES, str(_COMPONENT / 'autocomplete_core.js')],
+        input=json.dumps({'payload': encode_suggestions(suggestions), 'queries': queries}),
+        capture_output=True, text=True, check=True,
+    )
+    for query, rows in zip(queries, json.loads(completed.stdout)):
+        expected = sorted(suggestions, key=lambda row: (row.value, row.kind, row.label))
+        assert [AutocompleteSuggestion(**row) for row in rows] == list(_reference_matches(expected, query)), query
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_component_benchmark_runs_under_node() -> None:
+    completed = subprocess.run(
+        ['node', str(_COMPONENT / 'autocomplete_bench.js'), '2000'], capture_output=True, text=True, check=True
+    )
+
+    assert 'decode 2000 suggestions' in completed.stdout
+    assert 'MISMATCH' not in completed.stdout
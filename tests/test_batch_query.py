@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+
+from tests.source_factory import create_sources, source_arguments
+from toram_search.batch import BatchQuery, parse_query_line, read_queries, run_batch
+from toram_search.cli import main
+from toram_search.router import DomainServices, search_database
+from toram_search.serialization import outcome_payload, to_payload
+
+
+def test_parse_query_line_reads_optional_mode_column() -> None:
+    assert parse_query_line('cr bow\n') == BatchQuery('Universal', 'cr bow')
+    assert parse_query_line('Skills\tGuardian\n') == BatchQuery('Skills', 'Guardian')
+    assert parse_query_line('not a mode\tcr  bow', 'Items') == BatchQuery('Items', 'not a mode cr bow')
+    assert parse_query_line('   \n') is None
+    assert parse_query_line('# comment') is None
+
+
+def test_payload_keeps_card_fields_and_omits_skill_detail_text(tmp_path: Path) -> None:
+    paths = create_sources(tmp_path)
+
+    payload = outcome_payload(search_database('Skills', 'Guardian', **paths), mode='Skills')
+
+    skill = payload['skills']['results'][0]['skill']
+    assert payload['mode'] == 'Skills'
+    assert skill['name'] == 'Guardian'
+    assert {'raw_text', 'sections', 'description', 'game_description'}.isdisjoint(skill)
+    json.dumps(payload)
+
+
+def test_set_values_are_written_in_sorted_order() -> None:
+    assert to_payload(frozenset({'Shield', 'Blade', 'Magic'})) == ['Blade', 'Magic', 'Shield']
+    assert to_payload({3, 1, 2}) == [1, 2, 3]
+    assert to_payload({10, 9, 100}) == [9, 10, 100]
+    assert to_payload({('a', 10), ('a', 9)}) == [['a', 9], ['a', 10]]
+    assert to_payload({'b', 2, None}) == ['b', 2, None]
+    assert to_payload({'tags': {('b', 2), ('a', 1)}}) == {'tags': [['a', 1], ['b', 2]]}
+
+
+def test_shared_services_match_per_call_search(tmp_path: Path) -> None:
+    paths = create_sources(tmp_path)
+
+    with DomainServices(**paths) as services:
+        for query in ('cr bow', 'Guardian', 'food maxmp'):
+            assert search_database('Universal', query, **paths, services=services) == search_database(
+                'Universal', query, **paths
+            )
+
+
+def test_run_batch_preserves_input_order_across_workers(tmp_path: Path) -> None:
+    paths = create_sources(tmp_path)
+    available = frozenset({'Items', 'Skills', 'Food', 'Registlets'})
+    queries = list(read_queries(['cr bow', 'Skills\tGuardian', 'food maxmp'] * 3))
+
+    serial = list(run_batch(queries, paths=paths, available_domains=available))
+    parallel = list(run_batch(queries, paths=paths, available_domains=available, workers=2, chunk_size=2))
+
+    assert parallel == serial
+    assert [json.loads(line)['query'] for line in serial] == [query.query for query in queries]
+
+
+def test_query_cli_streams_json_lines_from_file(tmp_path: Path, capsys) -> None:
+    paths = create_sources(tmp_path)
+    source = tmp_path / 'queries.tsv'
+    source.write_text('cr bow\nSkills\tGuardian\n\nfood maxmp\n', encoding='utf-8')
+
+    exit_code = main(['query', *source_arguments(paths), '--input', str(source)])
+
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert exit_code == 0
+    assert [(row['mode'], row['query']) for row in rows] == [
+        ('Universal', 'cr bow'), ('Skills', 'Guardian'), ('Universal', 'food maxmp'),
+    ]
+    assert rows[0]['items']['results']
+    assert rows[2]['food']['results'][0]['code'] == '111'
+
+
+def test_query_cli_accepts_single_query(tmp_path: Path, capsys) -> None:
+    paths = create_sources(tmp_path)
+
+    exit_code = main(['query', *source_arguments(paths), '--mode', 'Items', 'cr bow'])
+
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert exit_code == 0
+    assert len(rows) == 1
+    assert rows[0]['mode'] == 'Items'
+    assert rows[0]['skills'] is None
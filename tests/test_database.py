@@ -1,11 +1,15 @@
 import json
+import os
 import sqlite3
 from pathlib import Path
 
 import pytest
 
 from toram_search.database import (
+    SQLITE_MODE_ENV,
+    SQLITE_MODES,
     connect_readonly,
+    release_memory_databases,
     validate_food_sources,
     validate_item_database,
     validate_registlet_source,
@@ -21,9 +25,11 @@ def make_db(path: Path) -> None:
     connection.close()
 
 
-def test_connect_readonly_can_read_but_cannot_write(tmp_path: Path) -> None:
+@pytest.mark.parametrize("mode", SQLITE_MODES)
+def test_connect_readonly_can_read_but_cannot_write(tmp_path: Path, monkeypatch, mode: str) -> None:
     path = tmp_path / "sample.sqlite"
     make_db(path)
+    monkeypatch.setenv(SQLITE_MODE_ENV, mode)
     connection = connect_readonly(path)
     try:
         assert connection.execute("SELECT value FROM sample").fetchone()[0] == "ok"
@@ -31,6 +37,40 @@ def test_connect_readonly_can_read_but_cannot_write(tmp_path: Path) -> None:
             connection.execute("INSERT INTO sample(value) VALUES ('blocked')")
     finally:
         connection.close()
+        release_memory_databases()
+
+
+def test_memory_mode_copies_each_file_version_once(tmp_path: Path) -> None:
+    path = tmp_path / "sample.sqlite"
+    make_db(path)
+    try:
+        first = connect_readonly(path, mode="memory")
+        second = connect_readonly(path, mode="memory", check_same_thread=False)
+        assert first.execute("PRAGMA database_list").fetchone()["file"] == ""
+        assert second.execute("SELECT value FROM sample").fetchone()[0] == "ok"
+
+        writer = sqlite3.connect(path)
+        writer.execute("UPDATE sample SET value = 'new'")
+        writer.commit()
+        writer.close()
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert first.execute("SELECT value FROM sample").fetchone()[0] == "ok"
+        third = connect_readonly(path, mode="memory")
+        assert third.execute("SELECT value FROM sample").fetchone()[0] == "new"
+        for connection in (first, second, third):
+            connection.close()
+    finally:
+        release_memory_databases()
+
+
+def test_unknown_sqlite_mode_is_rejected(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "sample.sqlite"
+    make_db(path)
+    monkeypatch.setenv(SQLITE_MODE_ENV, "tmpfs")
+    with pytest.raises(ValueError, match=SQLITE_MODE_ENV):
+        connect_readonly(path)
 
 
 def test_connect_readonly_rejects_missing_file(tmp_path: Path) -> None:
@@ -125,3 +165,15 @@ def test_registlet_health_allows_skipped_record_warnings(tmp_path: Path) -> None
 
     assert health.name == 'Registlets'
     assert health.ok is True
+
+
+def test_sqlite_mode_benchmark_covers_every_mode(tmp_path: Path, capsys) -> None:
+    from tests.source_factory import create_sources, source_arguments
+    from toram_search.cli import main
+
+    paths = create_sources(tmp_path)
+
+    assert main(["bench", *source_arguments(paths), "--sqlite-modes", "--runs", "2"]) == 0
+    output = capsys.readouterr().out
+    for mode in SQLITE_MODES:
+        assert f"sqlite {mode}: 12 queries, 0 errors" in output
@@ -0,0 +1,524 @@
+import sqlite3
+import threading
+import time
+import traceback
+from pathlib import Path
+
+import pytest
+
+import toram_search.engine as engine_module
+from tests.source_factory import create_sources, source_arguments
+from toram_search.autocomplete import build_autocomplete_index
+from toram_search.cli import main
+from toram_search.engine import BoundedCache, SearchEngine
+from toram_search.items.service import ItemSearchService
+from toram_search.memory import deep_sizeof
+from toram_search.outcome_store import OutcomeStore
+from toram_search.paging import rank
+from toram_search.router import SingleFlight, search_database
+from toram_search.speculation import CpuBudget, follow_up_queries
+from toram_search.warmup import load_top_queries, warm_searches
+
+_ALL = frozenset({'Items', 'Skills', 'Food', 'Registlets'})
+
+
+def _engine(tmp_path: Path, **kwargs) -> tuple[SearchEngine, dict[str, Path]]:
+    paths = create_sources(tmp_path)
+    return SearchEngine(**paths, snapshot_path=None, **kwargs), paths
+
+
+def test_engine_search_matches_router(tmp_path: Path) -> None:
+    engine, paths = _engine(tmp_path)
+    with engine:
+        assert engine.available_domains == _ALL
+        for mode, query in (('Universal', 'Guardian'), ('Items', 'critical rate'), ('Food', 'food maxmp')):
+            assert engine.search(mode, query) == search_database(mode, query, **paths, available_domains=_ALL)
+        assert engine.timings.first_query is not None
+
+
+def test_pooled_services_move_between_threads(tmp_path: Path) -> None:
+    engine, _ = _engine(tmp_path, pool_size=2)
+    with engine:
+        with engine.lease() as first:
+            first.items()
+        outcomes = []
+        thread = threading.Thread(target=lambda: outcomes.append(engine.search('Skills', 'Guardian')))
+        thread.start()
+        thread.join()
+
+        assert outcomes and outcomes[0].skills.results
+        with engine.lease() as again:
+            assert again is first
+        assert engine.state._opened == 1
+
+
+def test_warm_opens_pool_and_autocomplete(tmp_path: Path) -> None:
+    engine, paths = _engine(tmp_path, pool_size=3)
+    with engine:
+        engine.warm_in_background().join()
+
+        assert engine.state._opened == 3 and engine.state._pool.qsize() == 3
+        assert engine.timings.warm is not None
+        index = engine.autocomplete_index()
+        assert index is engine.autocomplete_index()
+        assert index.suggestions == build_autocomplete_index('Universal', **paths, available_domains=_ALL)
+        assert engine.item_card_faces((1,))[1].name == 'Test Bow'
+
+
+def _rewrite_food(paths: dict[str, Path]) -> None:
+    paths['food_entries_path'].write_text('code,stat,level\n111,maxmp,10\n222,maxmp,20\n', encoding='utf-8')
+
+
+def test_a_state_kept_across_a_reload_still_serves_leases(tmp_path: Path) -> None:
+    engine, paths = _engine(tmp_path)
+    with engine:
+        engine.warm()
+        handle = engine.search_handle('Universal', 'critical rate', page_size=2)
+        old = engine.state
+        keys = old.ranked('Universal', 'critical rate').keys('items')
+        _rewrite_food(paths)
+        assert engine.reload()
+
+        rows: list = []
+        worker = threading.Thread(target=lambda: rows.extend(old.page_rows('items', keys)), daemon=True)
+        worker.start()
+        worker.join(5)
+
+        assert not worker.is_alive(), 'lease on a retired state blocked'
+        assert [row.item.id for row in rows] == [key[0] for key in keys]
+        assert old._pool.empty() and not old.busy
+        assert engine.outcome(handle).items.total == 3
+
+
+def test_reload_swaps_state_after_in_flight_searches_finish(tmp_path: Path) -> None:
+    engine, paths = _engine(tmp_path)
+    with engine:
+        engine.warm()
+        old = engine.state
+        before = len(engine.search('Food', 'food maxmp').food.results)
+        assert engine.reload() is False
+
+        with old.lease() as services:
+            _rewrite_food(paths)
+            assert engine.reload() is True
+            assert engine.state is not old
+            assert services.items().search('critical rate').results
+            assert old._pool.qsize() > 0
+
+        assert old._pool.qsize() == 0
+        assert len(engine.search('Food', 'food maxmp').food.results) == 2 != before
+        assert engine.timings.reloads == 1
+
+
+def test_watcher_reloads_changed_sources(tmp_path: Path) -> None:
+    engine, paths = _engine(tmp_path)
+    with engine:
+        engine.start_watching(interval=0.01)
+        _rewrite_food(paths)
+        deadline = time.monotonic() + 5
+        while engine.timings.reloads == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert engine.timings.reloads == 1
+        assert engine.state.fingerprint == engine.fingerprint()
+
+
+def test_cold_start_bench_reports_first_query(tmp_path: Path, capsys) -> None:
+    paths = create_sources(tmp_path)
+
+    exit_code = main([
+        'bench', *source_arguments(paths), '--cold-start', '--runs', '1', '--snapshot', str(tmp_path / 'none'),
+    ])
+
+    output = capsys.readouterr().out
+    assert exit_code == 0
+    assert 'cold start (live)' in output
+    assert 'first query (live)' in output
+
+
+def _blocked_search(engine: SearchEngine, monkeypatch, release: threading.Event, error: Exception | None = None):
+    calls = []
+    original = engine_module.search_database
+
+    def slow(*args, **kwargs):
+        calls.append(args[1])
+        release.wait(10)
+        if error is not None:
+            raise error
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(engine_module, 'search_database', slow)
+    return calls
+
+
+def _wait_for_joiners(engine: SearchEngine, count: int) -> None:
+    deadline = time.monotonic() + 10
+    while engine.coalesced_searches < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_identical_concurrent_searches_share_one_computation(tmp_path: Path, monkeypatch) -> None:
+    engine, _ = _engine(tmp_path)
+    release = threading.Event()
+    with engine:
+        calls = _blocked_search(engine, monkeypatch, release)
+        outcomes = []
+        queries = ['Guardian', ' Guardian', 'Guardian  ', 'Guardian']
+        threads = [threading.Thread(target=lambda q=q: outcomes.append(engine.search('Skills', q))) for q in queries]
+        for thread in threads:
+            thread.start()
+        _wait_for_joiners(engine, 3)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert engine.coalesced_searches == 3
+        assert sorted(outcome.query for outcome in outcomes) == sorted(queries)
+        assert len({outcome.skills for outcome in outcomes}) == 1
+
+        engine.search('Skills', 'Guardian')
+        assert len(calls) == 2
+
+
+def test_coalesced_search_errors_reach_every_waiter(tmp_path: Path, monkeypatch) -> None:
+    engine, _ = _engine(tmp_path)
+    release = threading.Event()
+    with engine:
+        _blocked_search(engine, monkeypatch, release, error=RuntimeError('database locked'))
+        errors = []
+
+        def run() -> None:
+            try:
+                engine.search('Items', 'critical rate')
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        _wait_for_joiners(engine, 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3 and {str(error) for error in errors} == {'database locked'}
+        leader = next(error for error in errors if error.__cause__ is None)
+        assert all(error.__cause__ is leader for error in errors if error is not leader)
+
+
+def _frames(error: BaseException, name: str) -> int:
+    return sum(frame.name == name for frame in traceback.extract_tb(error.__traceback__))
+
+
+def test_single_flight_waiters_get_their_own_copy_of_the_leader_error() -> None:
+    flights: SingleFlight[int] = SingleFlight()
+    release = threading.Event()
+    errors: dict[str, BaseException] = {}
+
+    def fail() -> int:
+        release.wait(10)
+        raise sqlite3.OperationalError('database is locked')
+
+    def run(name: str) -> None:
+        try:
+            flights.do('key', fail)
+        except sqlite3.OperationalError as exc:
+            errors[name] = exc
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ('leader', 'first', 'second')]
+    threads[0].start()
+    while not flights._flights:
+        time.sleep(0.01)
+    for thread in threads[1:]:
+        thread.start()
+    while flights.coalesced < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    leader, first, second = errors['leader'], errors['first'], errors['second']
+    assert first is not second and leader not in (first, second)
+    assert first.__cause__ is leader and second.__cause__ is leader
+    assert first.args == second.args == ('database is locked',)
+    assert _frames(leader, 'do') == _frames(first, 'do') == _frames(second, 'do') == 1
+    assert _frames(leader, 'fail') == 1 and _frames(first, 'fail') == 0
+
+
+def test_coalesced_search_wait_honours_timeout(tmp_path: Path, monkeypatch) -> None:
+    engine, _ = _engine(tmp_path)
+    release = threading.Event()
+    with engine:
+        _blocked_search(engine, monkeypatch, release)
+        leader = threading.Thread(target=lambda: engine.search('Food', 'food maxmp'))
+        leader.start()
+        deadline = time.monotonic() + 10
+        while not engine._flights._flights and time.monotonic() < deadline:
+            time.sleep(0.01)
+        try:
+            with pytest.raises(TimeoutError):
+                engine.search('Food', 'food maxmp', timeout=0.05)
+        finally:
+            release.set()
+            leader.join()
+        assert engine.search('Food', 'food maxmp').food.results
+
+
+def test_paged_search_returns_first_page_total_and_cursor(tmp_path: Path, monkeypatch) -> None:
+    engine, _ = _engine(tmp_path)
+    with engine:
+        full = engine.search('Universal', 'critical rate')
+        first = engine.search_page('Universal', 'critical rate', page_size=2)
+
+        assert first.items.results == full.items.results[:2]
+        assert (first.items.total, first.skills.total) == (3, 0)
+        assert first.skills.cursor is None and first.items.cursor is not None
+
+        searches = []
+        monkeypatch.setattr(engine, '_search', lambda *args, **kwargs: searches.append(args) or None)
+        second = engine.next_page(first.items.cursor, page_size=2)
+        assert searches == []
+        assert second.results == full.items.results[2:]
+        assert (second.total, second.cursor) == (3, None)
+
+
+def test_next_page_rebuilds_evicted_results(tmp_path: Path) -> None:
+    engine, _ = _engine(tmp_path)
+    with engine:
+        first = engine.search_page('Skills', ' Shield  Skills ', page_size=1)
+        engine.state.outcomes.clear()
+
+        rest = engine.next_page(first.skills.cursor, page_size=5)
+        assert first.skills.results + rest.results == engine.search('Skills', 'Shield Skills').skills.results
+        assert rest.total == 3
+        with pytest.raises(ValueError):
+            engine.next_page('not-a-cursor')
+
+
+def test_shared_cache_keeps_ranked_keys_and_pages_read_only_their_rows(tmp_path: Path, monkeypatch) -> None:
+    engine, _ = _engine(tmp_path)
+    with engine:
+        full = engine.search('Universal', 'critical rate')
+        handle = engine.search_handle('Universal', 'critical rate', page_size=2)
+        ranked = engine.state.ranked('Universal', 'critical rate')
+        assert ranked.keys('items') == tuple(
+            (card.item.id, card.matched_stats, card.score, card.match_kind) for card in full.items.results
+        )
+        assert ranked.outcome.items.results == () and ranked.outcome.items.total == 3
+
+        read = []
+        page_rows = engine.state.page_rows
+        monkeypatch.setattr(engine.state, 'page_rows', lambda domain, keys: read.append((domain, keys)) or page_rows(domain, keys))
+        shown = engine.outcome(handle, domains=('items',))
+        assert shown.items.results == full.items.results[:2] and shown.items.cursor is not None
+        assert read == [('items', ranked.keys('items')[:2])]
+
+        read.clear()
+        rest = engine.next_page(shown.items.cursor, page_size=2)
+        assert rest.results == full.items.results[2:]
+        assert read == [('items', ranked.keys('items')[2:])]
+
+
+def test_show_more_builds_only_the_page_it_adds(tmp_path: Path, monkeypatch) -> None:
+    engine, _ = _engine(tmp_path)
+    with engine:
+        full = engine.search('Universal', 'critical rate')
+        handle = engine.search_handle('Universal', 'critical rate', page_size=1)
+        keys = engine.state.ranked('Universal', 'critical rate').keys('items')
+        read = []
+        page_rows = engine.state.page_rows
+        monkeypatch.setattr(engine.state, 'page_rows', lambda domain, keys: read.append((domain, keys)) or page_rows(domain, keys))
+        assert engine.outcome(handle, domains=('items',), page_size=1).items.results == full.items.results[:1]
+        assert read == [('items', keys[:1])]
+
+        read.clear()
+        handle = handle.show_more('items', 1)
+        assert engine.outcome(handle, domains=('items',), page_size=1).items.results == full.items.results[:2]
+        assert read == [('items', keys[1:2])]
+
+        read.clear()
+        engine.outcome(handle, domains=('items',), page_size=1)
+        assert read == []
+
+
+def test_item_detail_is_fetched_once_per_data_version(tmp_path: Path, monkeypatch) -> None:
+    engine, paths = _engine(tmp_path)
+    with engine:
+        detail = engine.item_detail(1)
+        monkeypatch.setattr(ItemSearchService, 'get_item', lambda self, item_id: pytest.fail('detail was not cached'))
+        assert engine.item_detail(1) is detail
+        monkeypatch.undo()
+
+        _rewrite_food(paths)
+        assert engine.reload()
+        assert engine.item_detail(1) == detail and engine.item_detail(1) is not detail
+        with pytest.raises(KeyError):
+            engine.item_detail(999)
+
+
+def test_sessions_hold_handles_and_outcomes_come_from_the_shared_cache(tmp_path: Path, monkeypatch) -> None:
+    engine, paths = _engine(tmp_path)
+    with engine:
+        full = engine.search('Universal', 'critical rate')
+        handle = engine.search_handle('Universal', 'critical rate', page_size=2)
+        assert deep_sizeof(handle) < deep_sizeof(full) / 5
+
+        shown = engine.outcome(handle)
+        assert shown.items.results == full.items.results[:2] and shown.items.total == 3
+        more = engine.outcome(handle.show_more('items', 2))
+        assert more.items.results == full.items.results and more.items.cursor is None
+        assert handle.shown == (2, 2, 2, 2)
+
+        engine.state.outcomes.clear()
+        assert engine.outcome(handle) == shown
+
+        _rewrite_food(paths)
+        assert engine.reload()
+        reloaded = engine.outcome(handle).items
+        assert (reloaded.results, reloaded.total) == (shown.items.results, 3)
+
+
+def test_bounded_cache_evicts_by_weight_but_keeps_the_newest_entry() -> None:
+    cache: BoundedCache[str, list[int]] = BoundedCache(5, len)
+    cache.put('a', [1, 2])
+    cache.put('b', [1, 2])
+    assert cache.get('a') == [1, 2]
+    cache.put('c', [1, 2])
+    assert (cache.get('b'), cache.get('a'), cache.weight) == (None, [1, 2], 4)
+    cache.put('huge', list(range(10)))
+    assert (len(cache), cache.get('huge'), cache.weight) == (1, list(range(10)), 10)
+
+
+def test_top_queries_are_ranked_by_frequency(tmp_path: Path) -> None:
+    log = tmp_path / 'queries.txt'
+    log.write_text(
+        '# comment\n\nGuardian\nItems\tcr  bow\nGuardian\nItems\tcr bow\nItems\tcr bow\nNotAMode\tx\n', encoding='utf-8'
+    )
+
+    assert load_top_queries(log) == (('Items', 'cr bow'), ('Universal', 'Guardian'), ('Universal', 'NotAMode x'))
+    assert load_top_queries(log, 1) == (('Items', 'cr bow'),)
+    assert load_top_queries(tmp_path / 'missing.txt') == ()
+    searches = warm_searches(log)
+    assert searches[0] == ('Universal', 'critical rate')
+    assert searches.count(('Items', 'cr bow')) == 1 and ('Universal', 'Guardian') in searches
+
+
+def test_warm_primes_example_and_top_searches(tmp_path: Path, monkeypatch) -> None:
+    log = tmp_path / 'queries.txt'
+    log.write_text('Skills\tShield Skills\nSkills\tHard Hit\n', encoding='utf-8')
+    engine, _ = _engine(tmp_path, top_queries_path=log, warm_top=1)
+    with engine:
+        engine.warm()
+
+        assert engine.timings.primed == len(warm_searches(log, 1)) and engine.timings.prime is not None
+        assert engine.state.ranked('Items', 'cr bow') is not None
+        assert engine.state.ranked('Skills', 'Hard Hit') is None
+        monkeypatch.setattr(engine_module, 'search_database', lambda *args, **kwargs: pytest.fail('not primed'))
+        assert engine.outcome(engine.search_handle('Skills', 'Shield Skills')).skills.results
+        assert engine.prime() == 0
+
+
+def test_priming_waits_for_interactive_searches(tmp_path: Path) -> None:
+    engine, _ = _engine(tmp_path, top_queries_path=None)
+    with engine:
+        with engine.lease():
+            primer = threading.Thread(target=engine.prime)
+            primer.start()
+            time.sleep(0.2)
+            assert len(engine.state.outcomes) == 0
+        primer.join()
+        assert len(engine.state.outcomes) == engine.timings.primed > 0
+
+
+def test_outcome_store_survives_restarts_and_purges_old_data(tmp_path: Path, monkeypatch) -> None:
+    store_path = tmp_path / 'cache' / 'outcomes.sqlite'
+    engine, paths = _engine(tmp_path, top_queries_path=None, outcome_store=OutcomeStore(store_path))
+    with engine:
+        expected = engine.outcome(engine.search_handle('Skills', 'Shield  Skills'))
+        fingerprint = engine.state.fingerprint
+
+    restarted = SearchEngine(**paths, snapshot_path=None, outcome_store=OutcomeStore(store_path))
+    with restarted:
+        monkeypatch.setattr(engine_module, 'search_database', lambda *args, **kwargs: pytest.fail('not stored'))
+        handle = restarted.search_handle('Skills', 'Shield Skills')
+        assert restarted.outcome(handle).skills == expected.skills
+        assert restarted.state.ranked('Skills', 'Shield Skills') is not None
+        monkeypatch.undo()
+
+        _rewrite_food(paths)
+        assert restarted.reload()
+        assert restarted.outcome_store.get(fingerprint, 'Skills', 'Shield Skills') is None
+        assert len(restarted.outcome_store) > 0 and restarted.outcome_store.purge(restarted.state.fingerprint) == 0
+
+
+def test_outcome_store_evicts_least_recently_used_by_size(tmp_path: Path) -> None:
+    engine, _ = _engine(tmp_path)
+    with engine:
+        outcomes = {query: rank(engine.search('Universal', query)) for query in ('Guardian', 'critical rate', 'food maxmp')}
+    store = OutcomeStore(tmp_path / 'outcomes.sqlite', max_bytes=1)
+    try:
+        store.put('v1', 'Universal', 'Guardian', outcomes['Guardian'])
+        assert store.get('v1', 'Universal', ' Guardian ') == outcomes['Guardian']
+        store.max_bytes = store.size * 2
+        store.put('v1', 'Universal', 'critical rate', outcomes['critical rate'])
+        store.get('v1', 'Universal', 'Guardian')
+        store.put('v1', 'Universal', 'food maxmp', outcomes['food maxmp'])
+
+        assert store.get('v1', 'Universal', 'critical rate') is None
+        assert store.get('v1', 'Universal', 'food maxmp') == outcomes['food maxmp']
+        assert store.size <= store.max_bytes or len(store) == 1
+        assert store.get('v2', 'Universal', 'food maxmp') is None
+        kept = len(store)
+        assert store.purge('v2') == kept and len(store) == 0
+    finally:
+        store.close()
+
+
+def test_follow_up_queries_put_suggestions_before_chip_removals(tmp_path: Path) -> None:
+    engine, _ = _engine(tmp_path, top_queries_path=None)
+    with engine:
+        assert follow_up_queries(engine.search('Items', 'crit bow'))[0] == 'Critical Rate bow'
+        assert follow_up_queries(engine.search('Items', '-aggro  armor')) == ('armor', 'aggro <= -1')
+        assert follow_up_queries(engine.search('Items', '-aggro armor'), 1) == ('armor',)
+
+
+def test_suggested_follow_ups_are_searched_ahead_and_hits_counted(tmp_path: Path, monkeypatch) -> None:
+    engine, _ = _engine(tmp_path, top_queries_path=None)
+    with engine:
+        engine.search_handle('Items', 'crit bow')
+        engine._speculator.submit(lambda: None).result()
+
+        assert engine.speculation.run == len(follow_up_queries(engine.search('Items', 'crit bow')))
+        monkeypatch.setattr(engine_module, 'search_database', lambda *args, **kwargs: pytest.fail('not speculated'))
+        engine.search_handle('Items', 'Critical Rate bow')
+        engine.search_handle('Items', 'Critical Rate bow')
+        assert engine.speculation.hits == 1
+        assert engine.speculation.hit_rate == 1 / engine.speculation.run
+
+
+def test_speculation_checks_stored_keys_without_loading_them(tmp_path: Path, monkeypatch) -> None:
+    store = OutcomeStore(tmp_path / 'outcomes.sqlite')
+    engine, _ = _engine(tmp_path, top_queries_path=None, outcome_store=store)
+    with engine:
+        store.put(engine.state.fingerprint, 'Items', 'armor', rank(engine.search('Items', 'armor')))
+        assert store.contains(engine.state.fingerprint, 'Items', ' armor ')
+        assert not store.contains(engine.state.fingerprint, 'Items', 'bow')
+        monkeypatch.setattr(store, 'get', lambda *args: pytest.fail('stored ranking read on the request thread'))
+
+        engine.speculate_queries('Items', ('armor',))
+
+        assert engine._speculator is None
+        assert engine.state.ranked('Items', 'armor') is None
+
+
+def test_speculation_stops_when_the_cpu_budget_is_spent(tmp_path: Path) -> None:
+    budget = CpuBudget(capacity=1.0, window=1e9)
+    budget.charge(2.0)
+    engine, _ = _engine(tmp_path, top_queries_path=None, speculation_budget=budget)
+    with engine:
+        engine.search_handle('Items', '-aggro armor')
+        engine._speculator.submit(lambda: None).result()
+
+        assert (engine.speculation.run, engine.speculation.skipped) == (0, 2)
+        assert engine.state.ranked('Items', 'armor') is None
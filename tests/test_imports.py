@@ -0,0 +1,45 @@
+import subprocess
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parents[1]
+# Microseconds, as reported by -X importtime; eager domain imports took about three times this.
+ROUTER_IMPORT_BUDGET_US = 60_000
+
+
+def _python(code: str, *options: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *options, '-c', code], cwd=_ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def _import_time(module: str) -> int:
+    report = _python(f'import {module}', '-X', 'importtime').stderr
+    for line in report.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise AssertionError(f'{module} missing from -X importtime output')
+
+
+def _loaded(code: str, prefixes: tuple[str, ...]) -> set[str]:
+    script = f'{code}\nimport sys\nprint("\\n".join(m for m in sys.modules if m.startswith({prefixes!r})))'
+    return set(_python(script).stdout.split())
+
+
+def test_router_import_stays_within_budget() -> None:
+    best = min(_import_time('toram_search.router') for _ in range(3))
+    assert best < ROUTER_IMPORT_BUDGET_US, f'import toram_search.router took {best / 1000:.1f} ms'
+
+
+def test_router_defers_domain_services_and_rapidfuzz() -> None:
+    loaded = _loaded('import toram_search.router', ('rapidfuzz', 'csv', 'toram_search.'))
+    assert loaded == {
+        'toram_search.database', 'toram_search.interpretation', 'toram_search.models', 'toram_search.router',
+    }
+
+
+def test_entry_points_never_import_streamlit() -> None:
+    modules = ('cli', 'api', 'batch', 'benchmarks', 'engine', 'memory', 'snapshot')
+    code = '\n'.join(f'import toram_search.{module}' for module in modules)
+    assert _loaded(code, ('streamlit', 'ui.')) == set()
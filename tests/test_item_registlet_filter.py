@@ -72,6 +72,7 @@ def test_repository_denies_direct_detail_and_filters_upgrade_links(contaminated_
             repository.get_item(91)
         assert [row.id for row in repository.get_upgrade_predecessors(5)] == [4]
         assert repository.get_upgrade_successors(90) == ()
+        assert repository.get_card_faces((90, 91)) == {}
 
 
 def test_all_item_search_shapes_hide_contaminated_rows(contaminated_items: Path) -> None:
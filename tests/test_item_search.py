@@ -32,6 +32,25 @@ def test_repository_is_read_only_and_loads_detail(tmp_path: Path) -> None:
             repository.db.execute('DELETE FROM items')
 
 
+def test_card_faces_load_in_bulk_with_first_image(tmp_path: Path) -> None:
+    path = tmp_path / 'items.sqlite'; create_item_database(path)
+    with ItemRepository(path) as repository:
+        faces = repository.get_card_faces((1, 2, 999))
+        assert sorted(faces) == [1, 2]
+        assert (faces[1].name, faces[1].item_type, faces[1].image_url) == ('Test Bow', 'Bow', 'https://example.com/test-bow.png')
+        assert faces[2].image_url is None
+        assert repository.get_card_faces(()) == {}
+
+
+def test_summaries_load_in_bulk_for_visible_items(tmp_path: Path) -> None:
+    path = tmp_path / 'items.sqlite'; create_item_database(path)
+    with ItemRepository(path) as repository:
+        summaries = repository.get_summaries((1, 2, 999))
+        assert sorted(summaries) == [1, 2]
+        assert summaries[1] == repository._summary(1)
+        assert repository.get_summaries(()) == {}
+
+
 def test_stat_expression_extracts_item_filter() -> None:
     parsed = parse_stat_expression('hp > 400 and cr bow', {'Bow','Armor','Special','Normal Crysta'}, ['MaxHP','Critical Rate'])
     assert parsed.item_filter is not None
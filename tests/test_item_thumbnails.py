@@ -0,0 +1,101 @@
+import base64
+import io
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from tests.item_db_factory import create_item_database
+from toram_search.cli import main
+from toram_search.item_thumbnails import ItemThumbnails, build_item_thumbnails
+from toram_search.items.repository import ItemRepository
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def _image(path: Path, size: tuple[int, int], color: tuple[int, int, int]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new('RGB', size, color).save(path, format='JPEG' if path.suffix == '.jpg' else 'PNG')
+
+
+def _database_with_local_images(tmp_path: Path) -> Path:
+    path = tmp_path / 'items.sqlite'
+    create_item_database(path)
+    db = sqlite3.connect(path)
+    db.execute("UPDATE item_images SET local_path='images/bow.jpg' WHERE id=1")
+    db.executemany(
+        'INSERT INTO item_images VALUES (?,?,?,?,?,?,?,?)',
+        [
+            (2, 2, 0, 'main', None, None, 'images/ring.png', None),
+            (3, 3, 0, 'main', 'male', None, 'images/armor-copy.png', 'https://example.com/armor.png'),
+            (4, 3, 1, 'main', 'female', None, 'images/missing.png', None),
+            (5, 4, 0, 'main', None, None, 'images/broken.png', None),
+        ],
+    )
+    db.commit(); db.close()
+    _image(tmp_path / 'images' / 'bow.jpg', (400, 200), (200, 30, 30))
+    _image(tmp_path / 'images' / 'ring.png', (50, 50), (30, 200, 30))
+    _image(tmp_path / 'images' / 'armor-copy.png', (50, 50), (30, 200, 30))
+    (tmp_path / 'images' / 'broken.png').write_bytes(b'not an image')
+    return path
+
+
+def _size(uri: str) -> tuple[int, int]:
+    assert uri.startswith('data:image/png;base64,')
+    with Image.open(io.BytesIO(base64.b64decode(uri.split(',', 1)[1]))) as image:
+        return image.size
+
+
+def test_thumbnails_are_content_addressed_and_deduplicated(tmp_path: Path) -> None:
+    items = _database_with_local_images(tmp_path)
+    output = tmp_path / 'thumbnails'
+
+    build = build_item_thumbnails(output, items_path=items)
+
+    assert (build.images, build.written, build.reused) == (3, 4, 2)
+    assert build.missing == ('images/missing.png',) and build.unreadable == ('images/broken.png',)
+    assert len(list(output.glob('*.png'))) == 4
+
+    thumbnails = ItemThumbnails(output)
+    assert _size(thumbnails.data_uri('images/bow.jpg', 72)) == (72, 36)
+    assert _size(thumbnails.data_uri('images/bow.jpg', 220)) == (220, 110)
+    assert _size(thumbnails.data_uri('images/ring.png', 220)) == (50, 50)
+    assert thumbnails.data_uri('images/ring.png', 72) == thumbnails.data_uri('images/armor-copy.png', 72)
+    assert thumbnails.data_uri('images/missing.png', 72) is None
+    assert thumbnails.data_uri('images/bow.jpg', 64) is None
+    assert ItemThumbnails(tmp_path / 'none').data_uri('images/bow.jpg', 72) is None
+
+
+def test_rebuild_reuses_unchanged_thumbnails_and_drops_stale_ones(tmp_path: Path) -> None:
+    items = _database_with_local_images(tmp_path)
+    output = tmp_path / 'thumbnails'
+    build_item_thumbnails(output, items_path=items)
+    before = set(output.glob('*.png'))
+
+    _image(tmp_path / 'images' / 'bow.jpg', (300, 300), (10, 10, 200))
+    build = build_item_thumbnails(output, items_path=items)
+
+    assert (build.written, build.reused) == (2, 4)
+    after = set(output.glob('*.png'))
+    assert len(after) == 4 and len(before & after) == 2
+    assert _size(ItemThumbnails(output).data_uri('images/bow.jpg', 72)) == (72, 72)
+
+
+def test_card_faces_carry_local_path_and_source_url(tmp_path: Path) -> None:
+    items = _database_with_local_images(tmp_path)
+    with ItemRepository(items) as repository:
+        faces = repository.get_card_faces((1, 2, 3))
+    assert (faces[1].image_path, faces[1].image_url) == ('images/bow.jpg', 'https://example.com/test-bow.png')
+    assert (faces[2].image_path, faces[2].image_url) == ('images/ring.png', None)
+    assert (faces[3].image_path, faces[3].image_url) == ('images/armor-copy.png', 'https://example.com/armor.png')
+
+
+def test_thumbnails_cli_reports_missing_images(tmp_path: Path, capsys) -> None:
+    items = _database_with_local_images(tmp_path)
+
+    assert main(['thumbnails', '--items', str(items), '--output', str(tmp_path / 'out')]) == 0
+
+    output = capsys.readouterr().out
+    assert 'for 3 images' in output
+    assert '1 missing: images/missing.png' in output
+    assert (tmp_path / 'out' / 'manifest.json').is_file()
@@ -0,0 +1,122 @@
+import json
+import tracemalloc
+from pathlib import Path
+
+from toram_search import memory
+from toram_search.cli import main
+from toram_search.memory import (
+    deep_sizeof,
+    format_report,
+    measure_sources,
+    memory_report,
+    record_session_outcome,
+    register_memory_source,
+    sample_allocation,
+    start_tracing,
+    stop_tracing,
+    tracing_session,
+    unregister_memory_source,
+)
+from toram_search.models import UniversalSearchOutcome
+
+
+def test_deep_sizeof_counts_nested_payloads_once() -> None:
+    shared = 'x' * 10_000
+    small = deep_sizeof(('a',))
+    large = deep_sizeof((shared, shared, {'key': [shared]}))
+
+    assert large > small + 10_000
+    assert large < small + 20_000
+
+
+def test_registered_sources_report_entries_and_bytes() -> None:
+    payload = tuple(str(index) * 50 for index in range(100))
+    register_memory_source('test.payload', lambda: (len(payload), payload))
+    try:
+        rows = {row.name: row for row in measure_sources()}
+    finally:
+        unregister_memory_source('test.payload')
+
+    assert rows['test.payload'].entries == 100
+    assert rows['test.payload'].bytes >= deep_sizeof(payload)
+    assert {'food.datasets', 'registlets.datasets', 'skill_icons.catalog'} <= set(rows)
+
+
+def test_session_samples_keep_latest_outcome_per_session(monkeypatch) -> None:
+    monkeypatch.setattr(memory, '_sessions', type(memory._sessions)())
+    record_session_outcome('session-a', 'old', UniversalSearchOutcome(query='old'))
+    record_session_outcome('session-a', 'new', UniversalSearchOutcome(query='new' * 100))
+    record_session_outcome('session-b', 'other', UniversalSearchOutcome(query='other'))
+
+    report = memory_report()
+
+    assert [row.session_id for row in report.sessions] == ['session-a', 'session-b']
+    assert report.sessions[0].query == 'new'
+    assert report.session_bytes == sum(row.outcome_bytes for row in report.sessions)
+    assert 'session-' in format_report(report)
+
+
+def test_session_samples_are_bounded(monkeypatch) -> None:
+    monkeypatch.setattr(memory, '_sessions', type(memory._sessions)())
+    monkeypatch.setattr(memory, '_MAX_SESSION_SAMPLES', 3)
+    for index in range(5):
+        record_session_outcome(f'session-{index}', 'q', UniversalSearchOutcome(query='q'))
+
+    assert [row.session_id for row in memory_report().sessions] == ['session-2', 'session-3', 'session-4']
+
+
+def test_sample_allocation_uses_tracemalloc_only_when_tracing() -> None:
+    assert sample_allocation(lambda: 'value') == ('value', None)
+
+    tracemalloc.start()
+    try:
+        result, traced = sample_allocation(lambda: [str(index) * 1000 for index in range(100)])
+    finally:
+        tracemalloc.stop()
+
+    assert len(result) == 100
+    assert traced is not None and traced >= 100_000
+
+
+def test_tracing_started_for_a_session_samples_only_that_session() -> None:
+    start_tracing('admin')
+    try:
+        assert tracing_session() == 'admin'
+        assert sample_allocation(lambda: 'value', 'visitor') == ('value', None)
+        assert sample_allocation(lambda: [str(index) * 1000 for index in range(100)], 'admin')[1] is not None
+    finally:
+        stop_tracing()
+
+    assert not tracemalloc.is_tracing()
+    assert tracing_session() is None
+
+
+def test_memory_cli_reports_caches_and_sample_outcomes(tmp_path: Path, capsys) -> None:
+    food_entries = tmp_path / 'food.csv'
+    food_aliases = tmp_path / 'aliases.json'
+    registlets = tmp_path / 'registlets.json'
+    food_aliases.write_text(json.dumps({
+        'stats': [{'key': 'maxmp', 'display': 'MaxMP', 'aliases': ['max mp']}]
+    }), encoding='utf-8')
+    food_entries.write_text('code,stat,level\n111,maxmp,10\n', encoding='utf-8')
+    registlets.write_text(json.dumps({
+        'metadata': {'valid_stoodie_levels': [220]},
+        'registlets': [],
+    }), encoding='utf-8')
+
+    exit_code = main([
+        'memory',
+        '--items', str(tmp_path / 'missing-items.sqlite'),
+        '--skills', str(tmp_path / 'missing-skills.sqlite'),
+        '--food-entries', str(food_entries),
+        '--food-aliases', str(food_aliases),
+        '--registlets', str(registlets),
+        '--query', 'food maxmp',
+    ])
+
+    output = capsys.readouterr().out
+    assert exit_code == 0
+    assert 'food.datasets' in output
+    assert 'autocomplete.index' in output
+    assert "'food maxmp'" in output
+    assert 'tracemalloc:' in output
@@ -0,0 +1,106 @@
+import sqlite3
+from pathlib import Path
+
+from tests.item_db_factory import create_item_database
+from tests.skill_db_factory import create_skill_database
+from toram_search.cli import main
+from toram_search.items.service import ItemSearchService
+from toram_search.query_plan import StatementRecorder, plan_violations, statement_template, table_aliases
+from toram_search.skills.service import SkillSearchService
+
+
+def _index_item_stats(path: Path) -> None:
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE INDEX item_stats_by_stat ON item_stats(stat_name, amount)')
+    connection.execute('CREATE INDEX item_stats_by_item ON item_stats(item_id, position)')
+    connection.commit()
+    connection.close()
+
+
+def test_statement_template_replaces_literals_and_collapses_parameter_lists() -> None:
+    sql = "SELECT id FROM items WHERE item_type IN ('Bow', 'Staff') AND   id=12 AND name LIKE '%it''s%'"
+
+    assert statement_template(sql) == 'SELECT id FROM items WHERE item_type IN (?) AND id=? AND name LIKE ?'
+
+
+def test_table_aliases_map_plan_aliases_back_to_tables() -> None:
+    aliases = table_aliases('SELECT s.id FROM item_stats s JOIN items AS i ON i.id=s.item_id WHERE s.amount>0')
+
+    assert aliases['s'] == 'item_stats'
+    assert aliases['i'] == 'items'
+    assert 'WHERE' not in aliases
+
+
+def test_recorder_reports_hot_full_scan_of_item_stats(tmp_path: Path) -> None:
+    path = tmp_path / 'items.sqlite'
+    create_item_database(path)
+
+    with StatementRecorder() as recorder:
+        service = ItemSearchService(path)
+        try:
+            service.search('cr bow')
+        finally:
+            service.close()
+
+    plans = recorder.plans()
+    stat_plan = next(plan for plan in plans if 'WHERE s.stat_name=? AND s.amount IS NOT NULL' in plan.template)
+    assert stat_plan.hot
+    assert stat_plan.violations == ('item_stats',)
+    assert any(step.operation == 'SEARCH' and step.table == 'items' for step in stat_plan.steps)
+    assert stat_plan in plan_violations(plans)
+
+
+def test_recorder_accepts_indexed_hot_statements(tmp_path: Path) -> None:
+    path = tmp_path / 'items.sqlite'
+    create_item_database(path)
+    _index_item_stats(path)
+
+    with StatementRecorder() as recorder:
+        service = ItemSearchService(path)
+        try:
+            service.search('cr bow')
+            service.get_item(1)
+        finally:
+            service.close()
+
+    assert plan_violations(recorder.plans()) == ()
+
+
+def test_recorder_counts_executions_per_template_and_stops_after_exit(tmp_path: Path) -> None:
+    path = tmp_path / 'skills.sqlite'
+    create_skill_database(path)
+
+    with StatementRecorder() as recorder:
+        service = SkillSearchService(path)
+        try:
+            service.get_skill('shield_skills/guardian')
+            service.get_skill('shield_skills/hard-hit')
+        finally:
+            service.close()
+    after = SkillSearchService(path)
+    try:
+        after.get_skill('shield_skills/guardian')
+    finally:
+        after.close()
+
+    plan = next(plan for plan in recorder.plans() if plan.template.endswith('FROM skills WHERE id=?'))
+    assert plan.executions == 2
+    assert plan.violations == ()
+
+
+def test_explain_cli_fails_only_for_hot_full_scans(tmp_path: Path, capsys) -> None:
+    items = tmp_path / 'items.sqlite'
+    create_item_database(items)
+    arguments = [
+        'explain',
+        '--items', str(items),
+        '--skills', str(tmp_path / 'missing-skills.sqlite'),
+        '--query', 'cr bow',
+    ]
+
+    assert main(arguments) == 1
+    assert '!!SCAN s' in capsys.readouterr().out
+
+    _index_item_stats(items)
+    assert main(arguments) == 0
+    assert '0 hot full-scan violations' in capsys.readouterr().out
@@ -1,9 +1,11 @@
 import json
+from dataclasses import replace
 from pathlib import Path
 
 import pytest
 
-from toram_search.registlets.data import RegistletDataError, load_registlet_dataset
+import toram_search.registlets.data as registlet_data
+from toram_search.registlets.data import RegistletDataError, load_registlet_dataset, seed_registlet_dataset
 
 
 def _valid_payload() -> dict:
@@ -119,3 +121,21 @@ def test_registlet_loader_rejects_missing_valid_level_metadata(tmp_path: Path) -
 
     with pytest.raises(RegistletDataError):
         load_registlet_dataset(path)
+
+
+def test_seeding_a_new_version_replaces_the_old_seed(tmp_path: Path) -> None:
+    path = tmp_path / 'registlets.json'
+    path.write_text(json.dumps(_valid_payload()), encoding='utf-8')
+    live = load_registlet_dataset(path)
+    first, second = replace(live, warnings=('first',)), replace(live, warnings=('second',))
+
+    seed_registlet_dataset(path, first)
+    assert load_registlet_dataset(path) is first
+    path.write_text(json.dumps(_valid_payload(), indent=1), encoding='utf-8')
+    seed_registlet_dataset(path, second)
+    assert load_registlet_dataset(path) is second
+    assert registlet_data._seeded[str(path.resolve())][1] is second
+
+    path.write_text(json.dumps(_valid_payload(), indent=2), encoding='utf-8')
+    assert load_registlet_dataset(path).warnings == live.warnings
+    assert str(path.resolve()) not in registlet_data._seeded
@@ -0,0 +1,174 @@
+from dataclasses import replace
+from itertools import product
+from pathlib import Path
+
+import pytest
+
+from tests.item_db_factory import create_item_database
+from tests.skill_db_factory import create_skill_database
+from toram_search.database import FOOD_ALIASES, FOOD_ENTRIES, REGISTLET_DATA
+from toram_search.food.data import load_food_dataset
+from toram_search.interpretation import RouteQuality
+from toram_search.items.service import ItemSearchService
+from toram_search.models import UniversalSearchOutcome
+from toram_search.registlets.data import load_registlet_dataset
+from toram_search.router import (
+    DomainServices,
+    _enrich_skill_relationships,
+    search_database,
+    select_surviving_domains,
+    select_winning_interpretation,
+)
+
+_DOMAINS = ('items', 'skills', 'food', 'registlets')
+
+
+def _paths(tmp_path: Path) -> dict[str, Path]:
+    items = tmp_path / 'items.sqlite'
+    skills = tmp_path / 'skills.sqlite'
+    create_item_database(items)
+    create_skill_database(skills)
+    return {
+        'items_path': items,
+        'skills_path': skills,
+        'food_entries_path': FOOD_ENTRIES,
+        'food_aliases_path': FOOD_ALIASES,
+        'registlets_path': REGISTLET_DATA,
+    }
+
+
+def _corpus() -> list[str]:
+    food = load_food_dataset(FOOD_ENTRIES, FOOD_ALIASES)
+    registlets = load_registlet_dataset(REGISTLET_DATA).records
+    heads = [
+        'Test Bow', 'test bow', 'Crit Ring', 'New Crystal', 'Aggro Weapon Crystal', 'tset bwo',
+        'Guardian', 'Hard Hit', 'hardhit', 'Shield Bash', 'Shield Skills', 'shield skill tree',
+        'critical rate', 'cr', 'crit', 'hp', 'aggro', 'mp', 'maxmp', 'ampr', 'pp', 'stun',
+        'food', 'code', 'std', 'stoodie lvl', 'upgrade', 'highest', 'lowest', '-aggro',
+        'compare Guardian', 'what tier is', 'how does', 'how many', 'help', 'list stats',
+        'best tank xtal', 'hp >= 5000', 'cr > 10 and', 'tier 2', 'mp cost <= 300',
+        'skills that inflict', 'restores mp', 'Arrow Rain', '', '?',
+    ]
+    heads += [stat.display for stat in food.stats[:8]]
+    heads += [record.name for record in registlets[:12]]
+    heads += [' '.join(record.effect.split()[:3]) for record in registlets[:12]]
+    tails = ['', 'bow', 'xtal', 'armor', 'wp', 'Guardian', 'Hard Hit', 'maxmp', '220', '10', 'work']
+    queries = {' '.join(f'{head} {tail}'.split()) for head, tail in product(heads, tails)}
+    return sorted(queries)
+
+
+def _suppress(domain, outcome):
+    """Frozen copy of how the router emptied losing outcomes before pruning."""
+    common = {
+        'kind': 'not_found',
+        'results': (),
+        'message': None,
+        'suggested_queries': (),
+        'interpretation': None,
+    }
+    if domain == 'Items':
+        return replace(outcome, routing_confidence='none', **common)
+    if domain == 'Registlets':
+        return replace(outcome, match=None, **common)
+    return replace(outcome, **common)
+
+
+def _original_universal_search(query: str, services: DomainServices, sources: dict[str, Path]) -> UniversalSearchOutcome:
+    """Universal search as it was before pruning: every domain searched in full, losers suppressed."""
+    outcomes = {
+        'Items': services.items().search(query),
+        'Skills': _enrich_skill_relationships(
+            services.skills().search(query, allow_weak_fallback=True),
+            skills_path=sources['skills_path'],
+            registlets_path=sources['registlets_path'],
+            services=services,
+        ),
+        'Food': services.food().search(query),
+        'Registlets': services.registlets().search(query),
+    }
+    survivors = select_surviving_domains({domain: outcome.route_quality for domain, outcome in outcomes.items()})
+    interpretation = select_winning_interpretation(*outcomes.values())
+    suppressed = {
+        domain: outcome if domain in survivors else _suppress(domain, outcome) for domain, outcome in outcomes.items()
+    }
+    return UniversalSearchOutcome(
+        query=query,
+        items=suppressed['Items'],
+        skills=suppressed['Skills'],
+        food=suppressed['Food'],
+        registlets=suppressed['Registlets'],
+        interpretation=interpretation,
+    )
+
+
+@pytest.fixture(scope='module')
+def sources(tmp_path_factory) -> dict[str, Path]:
+    return _paths(tmp_path_factory.mktemp('pruning'))
+
+
+def test_route_ceilings_bound_every_domain_outcome(sources: dict[str, Path]) -> None:
+    with DomainServices(**sources) as services:
+        searchers = (services.items(), services.skills(), services.food(), services.registlets())
+        for query in _corpus():
+            for service in searchers:
+                actual = service.search(query).route_quality.sort_key
+                assert actual <= service.route_ceiling(query).sort_key, (type(service).__name__, query)
+
+
+def test_pruned_universal_search_matches_original_router(sources: dict[str, Path]) -> None:
+    corpus = _corpus()
+    assert len(corpus) > 800
+    with DomainServices(**sources) as services:
+        for query in corpus:
+            original = _original_universal_search(query, services, sources)
+            pruned = search_database('Universal', query, **sources, services=services)
+            assert pruned.interpretation == original.interpretation, query
+            for domain in _DOMAINS:
+                expected, actual = getattr(original, domain), getattr(pruned, domain)
+                if actual.route_quality != expected.route_quality:
+                    # A pruned domain was never probed, so it reports an empty route instead of its losing one.
+                    assert actual.route_quality == RouteQuality() and not expected.results, (domain, query)
+                    actual = replace(actual, route_quality=expected.route_quality)
+                assert actual == expected, (domain, query)
+
+
+def test_exact_skill_name_skips_item_probe(sources: dict[str, Path], monkeypatch) -> None:
+    calls = []
+    original = ItemSearchService.probe
+    monkeypatch.setattr(ItemSearchService, 'probe', lambda self, query: calls.append(query) or original(self, query))
+
+    with DomainServices(**sources) as services:
+        outcome = search_database('Universal', 'Guardian', **sources, services=services)
+        assert calls == []
+        assert outcome.skills.results[0].skill.name == 'Guardian'
+        assert outcome.items.kind == 'not_found' and not outcome.items.results
+
+        search_database('Universal', 'cr bow', **sources, services=services)
+        assert calls == ['cr bow']
+
+
+def test_probe_quality_matches_materialized_outcome(sources: dict[str, Path]) -> None:
+    with DomainServices(**sources) as services:
+        searchers = (services.items(), services.skills(), services.food(), services.registlets())
+        for query in _corpus():
+            for service in searchers:
+                probe = service.probe(query)
+                assert probe.materialize().route_quality == probe.route_quality, (type(service).__name__, query)
+
+
+def test_losing_domains_are_probed_but_never_materialized(sources: dict[str, Path], monkeypatch) -> None:
+    materialized = []
+    original = ItemSearchService.probe
+
+    def probe(self, query):
+        result = original(self, query)
+        return replace(result, materialize=lambda: materialized.append(query) or result.materialize())
+
+    monkeypatch.setattr(ItemSearchService, 'probe', probe)
+    with DomainServices(**sources) as services:
+        outcome = search_database('Universal', 'Guardian', **sources, services=services, prune_domains=False)
+        assert materialized == []
+        assert outcome.items.route_quality == services.items().probe('Guardian').route_quality
+
+        search_database('Universal', 'Test Bow', **sources, services=services, prune_domains=False)
+        assert materialized == ['Test Bow']
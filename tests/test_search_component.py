@@ -17,3 +17,20 @@ def test_external_fill_syncs_when_streamlit_value_changes_even_if_input_keeps_fo
     assert 'lastExternalValue' in text
     assert 'value !== lastExternalValue' in render
     assert 'document.activeElement !== input' not in render
+
+def test_large_lists_request_top_matches_from_python_with_debounce()->None:
+    text=component_text();assert 'event: "type"' in text;assert 'TYPE_DEBOUNCE_MS' in text;assert 'clearTimeout(typeTimer)' in text
+    render=text[text.index('Streamlit.events.addEventListener(Streamlit.RENDER_EVENT'):]
+    assert 'args.matches_for' in render;assert 'serverMode = args.suggestions == null' in render
+
+def test_search_box_sends_full_list_only_below_client_limit()->None:
+    source=Path('ui/search.py').read_text(encoding='utf-8');assert 'CLIENT_SUGGESTION_LIMIT' in source;assert 'suggestions=None' in source;assert 'engine.matches(' in source
+
+def test_component_keeps_payloads_by_hash_and_asks_for_resync()->None:
+    text=component_text();render=text[text.index('Streamlit.events.addEventListener(Streamlit.RENDER_EVENT'):]
+    assert 'receiveSuggestions(args.suggestions)' in render;assert 'payloads.get(payload.hash)' in text;assert 'event: "resync"' in text
+
+def test_component_scores_in_worker_and_drops_stale_replies()->None:
+    text=component_text();assert 'src="./autocomplete_core.js"' in text;assert 'new Worker("./autocomplete_worker.js")' in text
+    assert 'data.id === matchRequest' in text;assert 'const id = ++matchRequest' in text
+    worker=Path('components/autocomplete_search/autocomplete_worker.js').read_text(encoding='utf-8');assert 'importScripts("./autocomplete_core.js")' in worker;assert 'pending = message' in worker
@@ -1,3 +1,7 @@
+import base64
+import io
+import threading
+import time
 from pathlib import Path
 
 from toram_search.skill_icons import SkillIconCatalog, normalize_icon_key
@@ -62,3 +66,79 @@ def test_real_guardian_icon_is_checked_in() -> None:
     assert icon is not None
     assert icon.name == "Guardian.png"
     assert icon.is_file()
+
+
+def _png(path: Path, size: tuple[int, int]) -> bytes:
+    from PIL import Image
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGBA", size, (200, 40, 40, 255)).save(path, format="PNG")
+    return path.read_bytes()
+
+
+def _decoded_size(uri: str) -> tuple[int, int]:
+    from PIL import Image
+
+    assert uri.startswith("data:image/png;base64,")
+    with Image.open(io.BytesIO(base64.b64decode(uri.split(",", 1)[1]))) as image:
+        return image.size
+
+
+def test_data_uris_are_resized_once_and_cached(tmp_path: Path) -> None:
+    root = tmp_path / "icons"
+    _png(root / "Shield" / "Guardian.png", (200, 100))
+    small = _png(root / "Shield" / "Aegis.png", (34, 35))
+    catalog = SkillIconCatalog(root)
+
+    card = catalog.data_uri("Shield Skills", "Guardian", 64)
+    assert _decoded_size(card) == (64, 32)
+    assert _decoded_size(catalog.data_uri("Shield Skills", "Guardian", 96)) == (96, 48)
+    assert catalog.data_uri("Shield Skills", "Guardian", 64) is card
+    assert base64.b64decode(catalog.data_uri("Shield Skills", "Aegis", 96).split(",", 1)[1]) == small
+    assert catalog.data_uri("Shield Skills", "Missing", 64) is None
+
+
+def test_index_is_scanned_once_across_threads(tmp_path: Path, monkeypatch) -> None:
+    root = tmp_path / "icons"
+    (root / "Shield").mkdir(parents=True)
+    (root / "Shield" / "Guardian.png").write_bytes(b"png")
+    catalog = SkillIconCatalog(root)
+    scans = []
+    original = catalog._scan
+
+    def slow_scan():
+        scans.append(1)
+        time.sleep(0.05)
+        return original()
+
+    monkeypatch.setattr(catalog, "_scan", slow_scan)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(catalog.resolve("Shield Skills", "Guardian")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert scans == [1]
+    assert results == [(root / "Shield" / "Guardian.png").resolve()] * 8
+
+
+def test_prebuilt_lookup_accepts_functions_and_holds_methods_weakly(tmp_path: Path) -> None:
+    root = tmp_path / "icons"
+    _png(root / "Shield" / "Guardian.png", (200, 100))
+    catalog = SkillIconCatalog(root)
+    catalog.use_prebuilt(lambda relative, path, size: f"prebuilt:{relative}:{size}")
+    assert catalog.data_uri("Shield Skills", "Guardian", 64) == "prebuilt:Shield/Guardian.png:64"
+
+    class Artifact:
+        def lookup(self, relative: str, path: Path, size: int) -> str:
+            return "artifact"
+
+    artifact = Artifact()
+    other = SkillIconCatalog(root)
+    other.use_prebuilt(artifact.lookup)
+    del artifact
+    assert _decoded_size(other.data_uri("Shield Skills", "Guardian", 64)) == (64, 32)
@@ -0,0 +1,160 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from tests.source_factory import create_sources, source_arguments
+from toram_search.autocomplete import build_autocomplete_index
+from toram_search.cli import main
+from toram_search.food.data import _load_uncached as parse_food
+from toram_search.food.data import load_food_dataset
+from toram_search.registlets.data import _load_uncached as parse_registlets
+from toram_search.registlets.data import load_registlet_dataset
+from toram_search.snapshot import SearchSnapshot, SnapshotError, compile_snapshot, load_current_snapshot
+
+_ALL = frozenset({'Items', 'Skills', 'Food', 'Registlets'})
+
+
+def _compile(tmp_path: Path) -> tuple[dict[str, Path], Path]:
+    paths = create_sources(tmp_path)
+    output = tmp_path / 'search.toramidx'
+    compile_snapshot(output, **paths, available_domains=_ALL)
+    return paths, output
+
+
+def test_snapshot_sections_match_live_builds(tmp_path: Path) -> None:
+    paths, output = _compile(tmp_path)
+
+    snapshot = load_current_snapshot(output, **paths)
+
+    assert snapshot is not None
+    try:
+        for mode in ('Universal', 'Items', 'Skills', 'Food', 'Registlets'):
+            live = build_autocomplete_index(mode, **paths, available_domains=_ALL)
+            assert build_autocomplete_index(mode, **paths, available_domains=_ALL, snapshot=snapshot) == live
+        assert snapshot.section('food') == parse_food(paths['food_entries_path'], paths['food_aliases_path'])
+        assert snapshot.section('registlets') == parse_registlets(paths['registlets_path'])
+        assert load_food_dataset(paths['food_entries_path'], paths['food_aliases_path']) is snapshot.section('food')
+        assert load_registlet_dataset(paths['registlets_path']) is snapshot.section('registlets')
+    finally:
+        snapshot.close()
+
+
+def test_sections_decode_lazily(tmp_path: Path) -> None:
+    _, output = _compile(tmp_path)
+
+    snapshot = SearchSnapshot(output)
+    try:
+        assert snapshot._decoded == {}
+        snapshot.section('registlets')
+        assert set(snapshot._decoded) == {'registlets'}
+    finally:
+        snapshot.close()
+
+
+def test_autocomplete_ignores_a_snapshot_whose_sources_changed(tmp_path: Path) -> None:
+    paths, output = _compile(tmp_path)
+    snapshot = load_current_snapshot(output, **paths)
+    assert snapshot is not None
+    try:
+        paths['food_aliases_path'].write_text(
+            '{"stats": [{"key": "maxmp", "display": "Max MP", "aliases": ["mmp"]}]}', encoding='utf-8'
+        )
+
+        live = build_autocomplete_index('Food', **paths, available_domains=_ALL)
+        assert build_autocomplete_index('Food', **paths, available_domains=_ALL, snapshot=snapshot) == live
+        assert live != snapshot.autocomplete_index('Food', _ALL)
+    finally:
+        snapshot.close()
+
+
+def test_changed_source_falls_back_to_live_build(tmp_path: Path) -> None:
+    paths, output = _compile(tmp_path)
+    paths['food_entries_path'].write_text('code,stat,level\n111,maxmp,10\n222,maxmp,20\n', encoding='utf-8')
+
+    assert load_current_snapshot(output, **paths) is None
+    assert len(load_food_dataset(paths['food_entries_path'], paths['food_aliases_path']).entries) == 2
+
+
+def test_touched_but_identical_source_still_matches(tmp_path: Path) -> None:
+    paths, output = _compile(tmp_path)
+    stat = paths['items_path'].stat()
+    os.utime(paths['items_path'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    snapshot = load_current_snapshot(output, **paths)
+
+    assert snapshot is not None
+    snapshot.close()
+
+
+def test_unavailable_domains_bypass_snapshot_autocomplete(tmp_path: Path) -> None:
+    paths, output = _compile(tmp_path)
+    snapshot = load_current_snapshot(output, **paths)
+    assert snapshot is not None
+    try:
+        items_only = frozenset({'Items'})
+        assert snapshot.autocomplete_index('Universal', items_only) is None
+        assert build_autocomplete_index(
+            'Universal', **paths, available_domains=items_only, snapshot=snapshot
+        ) == build_autocomplete_index('Universal', **paths, available_domains=items_only)
+    finally:
+        snapshot.close()
+
+
+def test_corrupt_snapshots_are_rejected(tmp_path: Path) -> None:
+    paths, output = _compile(tmp_path)
+    data = bytearray(output.read_bytes())
+
+    data[-1] ^= 0xFF
+    output.write_bytes(bytes(data))
+    snapshot = SearchSnapshot(output)
+    try:
+        with pytest.raises(SnapshotError):
+            snapshot.section('registlets')
+    finally:
+        snapshot.close()
+    assert load_current_snapshot(output, **paths) is None
+
+    output.write_bytes(b'NOTASNAP' + bytes(data[8:]))
+    assert load_current_snapshot(output, **paths) is None
+    assert load_current_snapshot(tmp_path / 'missing.toramidx', **paths) is None
+
+
+def test_compile_cli_writes_snapshot(tmp_path: Path, capsys) -> None:
+    paths = create_sources(tmp_path)
+    output = tmp_path / 'out.toramidx'
+
+    exit_code = main(['compile', *source_arguments(paths), '--output', str(output)])
+
+    assert exit_code == 0
+    assert 'autocomplete' in capsys.readouterr().out
+    snapshot = load_current_snapshot(output, **paths)
+    assert snapshot is not None
+    snapshot.close()
+
+
+def test_snapshot_serves_prebuilt_skill_icons_until_an_icon_changes(tmp_path: Path, monkeypatch) -> None:
+    import toram_search.skill_icons as skill_icons
+    from toram_search.skill_icons import SkillIconCatalog
+
+    root = tmp_path / 'icons'
+    (root / 'Shield').mkdir(parents=True)
+    icon = root / 'Shield' / 'Guardian.png'
+    icon.write_bytes(b'png')
+    paths = create_sources(tmp_path)
+    output = tmp_path / 'search.toramidx'
+    compile_snapshot(output, **paths, available_domains=_ALL, skill_icons=SkillIconCatalog(root))
+
+    catalog = SkillIconCatalog(root)
+    snapshot = load_current_snapshot(output, **paths, skill_icons=catalog)
+    assert snapshot is not None
+    try:
+        monkeypatch.setattr(skill_icons, 'resize_icon', lambda data, size: pytest.fail('icon was resized live'))
+        assert catalog.data_uri('Shield Skills', 'Guardian', 64) == 'data:image/png;base64,cG5n'
+        monkeypatch.undo()
+
+        icon.write_bytes(b'changed')
+        os.utime(icon, ns=(1, 1))
+        assert catalog.data_uri('Shield Skills', 'Guardian', 96) == 'data:image/png;base64,Y2hhbmdlZA=='
+    finally:
+        snapshot.close()
@@ -5,12 +5,14 @@ def text(path:str)->str:return Path(path).read_text(encoding='utf-8')
 def test_search_wrapper_declares_custom_component()->None:
     source=text('ui/search.py');assert 'declare_component' in source;assert 'SearchSubmission' in source;assert 'nonce' in source
 def test_item_and_skill_details_use_streamlit_dialogs()->None:assert '@st.dialog' in text('ui/item_dialog.py');assert '@st.dialog' in text('ui/skill_dialog.py')
-def test_main_keeps_independent_show_more_limits()->None:
-    source=text('main.py')
-    for key in ('item_limit','skill_limit','food_limit','registlet_limit','last_outcome'):
-        assert key in source
+def test_results_page_each_domain_inside_its_own_fragment()->None:
+    source=text('ui/results.py')
+    assert '@st.fragment' in source
+    assert 'handle.show_more(domain)' in source
+    assert 'on_click=_show_more' in source
+    assert 'render_domain_results(domain,engine=search_engine)' in text('main.py')
 def test_main_uses_universal_coordinator_and_custom_search()->None:
-    source=text('main.py');assert 'search_database' in source;assert 'render_search_box' in source;assert 'build_autocomplete_index' in source
+    source=text('main.py');assert 'search_engine.search_handle(' in source;assert 'render_search_box' in source;assert 'search_engine.autocomplete_index()' in source
 def test_result_cards_have_view_details_actions()->None:assert 'View details' in text('ui/item_cards.py');assert 'View details' in text('ui/skill_cards.py')
 
 
@@ -56,7 +58,7 @@ def test_query_interpretation_renders_after_search_box_before_results() -> None:
 def test_chip_removal_clears_outcome_instead_of_submitting() -> None:
     source = text('main.py')
     block = source[source.index('chip_fill='):source.index('st.divider()')]
-    assert 'st.session_state.last_outcome=None' in block
+    assert 'st.session_state.last_search=None' in block
     assert 'query_to_run=chip_fill' not in block
     assert 'search_database(' not in block
 
@@ -88,24 +90,27 @@ def test_help_names_registlet_json_as_source_of_truth() -> None:
 
 def test_main_uses_independent_four_source_health() -> None:
     source = text('main.py')
-    assert 'validate_sources' in source
+    assert 'search_engine.health_by_domain' in source
     assert 'available_domains' in source
+    source = text('toram_search/engine.py')
+    assert 'validate_sources' in source
     assert 'FOOD_ENTRIES' in source
     assert 'FOOD_ALIASES' in source
     assert 'REGISTLET_DATA' in source
 
 
 def test_suggested_search_density_is_small_and_static() -> None:
-    source = text('main.py')
-    assert "'Universal':('critical rate','food maxmp','physical pierce')" in source
-    assert "'Items':('cr bow','hp >= 5000 armor','highest cr')" in source
-    assert "'Skills':('Guardian','Shield Skills','skills that inflict stun')" in source
-    assert "'Food':('food maxmp','code ampr','food dt fire')" in source
-    assert "'Registlets':('std 220','Arrow Rain Enhancer','physical pierce')" in source
+    assert 'examples=EXAMPLE_QUERIES[mode]' in text('main.py')
+    source = text('toram_search/warmup.py')
+    assert "'Universal': ('critical rate', 'food maxmp', 'physical pierce')" in source
+    assert "'Items': ('cr bow', 'hp >= 5000 armor', 'highest cr')" in source
+    assert "'Skills': ('Guardian', 'Shield Skills', 'skills that inflict stun')" in source
+    assert "'Food': ('food maxmp', 'code ampr', 'food dt fire')" in source
+    assert "'Registlets': ('std 220', 'Arrow Rain Enhancer', 'physical pierce')" in source
 
 
 def test_main_has_new_domain_suggested_searches() -> None:
-    source = text('main.py')
+    source = text('toram_search/warmup.py')
     assert 'food maxmp' in source
     assert 'std 220' in source
     assert 'physical pierce' in source
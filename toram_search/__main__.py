@@ -0,0 +1,3 @@
+from toram_search.cli import main
+
+raise SystemExit(main())
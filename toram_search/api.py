@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, get_args
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from toram_search.autocomplete import AutocompleteIndex, build_autocomplete_index
+from toram_search.database import data_fingerprint
+from toram_search.interpretation import SearchDomain
+from toram_search.models import DatabaseMode
+from toram_search.router import DomainServices, SingleFlight, search_database, search_key
+from toram_search.serialization import outcome_payload, to_payload
+
+DATABASE_MODES: tuple[str, ...] = get_args(DatabaseMode)
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+IDLE_TIMEOUT = 15.0
+GZIP_MIN_BYTES = 1024
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+_REASONS = {
+    200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass(frozen=True)
+class Request:
+    method: str
+    target: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+    version: str = 'HTTP/1.1'
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get('connection', '').casefold()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    def accepts_gzip(self) -> bool:
+        return any(
+            part.split(';', 1)[0].strip() == 'gzip'
+            for part in self.headers.get('accept-encoding', '').casefold().split(',')
+        )
+
+
+@dataclass(frozen=True)
+class Response:
+    status: int
+    body: bytes = b''
+    content_type: str = 'application/json'
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return Response(status, body)
+
+
+def error_response(status: int, message: str) -> Response:
+    return json_response({'error': message}, status)
+
+
+async def read_request(reader: asyncio.StreamReader) -> Request | None:
+    """Parse one request head (and discard any body); ``None`` when the peer closed cleanly."""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as exc:
+        if not exc.partial.strip():
+            return None
+        raise HTTPError(400, 'incomplete request') from exc
+    except asyncio.LimitOverrunError as exc:
+        raise HTTPError(413, 'request head too large') from exc
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ')
+    except ValueError as exc:
+        raise HTTPError(400, 'malformed request line') from exc
+    headers: dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, separator, value = line.partition(':')
+        if not separator:
+            raise HTTPError(400, 'malformed header')
+        headers[name.strip().casefold()] = value.strip()
+    declared = headers.get('content-length', '0')
+    # int() alone would accept signs, underscores and non-ASCII digits.
+    if not (declared.isascii() and declared.isdigit()):
+        raise HTTPError(400, 'invalid content-length')
+    length = int(declared)
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, 'request body too large')
+    if length:
+        try:
+            await reader.readexactly(length)
+        except asyncio.IncompleteReadError as exc:
+            raise HTTPError(400, 'incomplete request body') from exc
+    parts = urlsplit(target)
+    return Request(
+        method.upper(),
+        target,
+        parts.path,
+        dict(parse_qsl(parts.query, keep_blank_values=True)),
+        headers,
+        version,
+    )
+
+
+def encode_response(response: Response, request: Request | None, *, keep_alive: bool) -> bytes:
+    body = response.body
+    headers = {'Content-Type': f'{response.content_type}; charset=utf-8', **response.headers}
+    if response.status != 304 and request is not None and len(body) >= GZIP_MIN_BYTES:
+        headers['Vary'] = 'Accept-Encoding'
+        if request.accepts_gzip():
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+    headers['Content-Length'] = str(len(body))
+    if request is not None and request.method == 'HEAD':
+        body = b''
+    headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+    head = [f'HTTP/1.1 {response.status} {_REASONS.get(response.status, "Unknown")}']
+    head.extend(f'{name}: {value}' for name, value in headers.items())
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+
+class APIMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests: dict[tuple[str, int], int] = {}
+        self.latency: dict[str, tuple[int, float]] = {}
+        self.connections = 0
+        self.bytes_sent = 0
+        self.in_flight = 0
+
+    def observe(self, route: str, status: int, seconds: float, sent: int) -> None:
+        with self._lock:
+            key = (route, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            count, total = self.latency.get(route, (0, 0.0))
+            self.latency[route] = (count + 1, total + seconds)
+            self.bytes_sent += sent
+
+    def render(self, extra: dict[str, float] | None = None) -> str:
+        with self._lock:
+            lines = [
+                '# TYPE toram_api_requests_total counter',
+                *(
+                    f'toram_api_requests_total{{route="{route}",status="{status}"}} {count}'
+                    for (route, status), count in sorted(self.requests.items())
+                ),
+                '# TYPE toram_api_request_seconds summary',
+            ]
+            for route, (count, total) in sorted(self.latency.items()):
+                lines.append(f'toram_api_request_seconds_count{{route="{route}"}} {count}')
+                lines.append(f'toram_api_request_seconds_sum{{route="{route}"}} {total:.6f}')
+            gauges = {
+                'toram_api_connections_total': self.connections,
+                'toram_api_in_flight': self.in_flight,
+                'toram_api_response_bytes_total': self.bytes_sent,
+                'toram_api_uptime_seconds': round(time.time() - self.started, 3),
+                **(extra or {}),
+            }
+        lines.extend(f'{name} {value}' for name, value in gauges.items())
+        return '\n'.join(lines) + '\n'
+
+
+class SearchAPI:
+    """Route JSON requests to the search services, running the search work on a bounded thread pool."""
+
+    def __init__(
+        self,
+        paths: dict[str, Path],
+        available_domains: frozenset[SearchDomain],
+        *,
+        max_workers: int = 4,
+    ) -> None:
+        self.paths = paths
+        self.available_domains = available_domains
+        self.metrics = APIMetrics()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='toram-api')
+        self.max_workers = max_workers
+        self._local = threading.local()
+        self.flights: SingleFlight[Any] = SingleFlight()
+        self._autocomplete: AutocompleteIndex | None = None
+        self._autocomplete_lock = threading.Lock()
+        self._routes: dict[str, Callable[[Request, list[str]], Awaitable[Response]]] = {
+            'search': self._search,
+            'items': self._item,
+            'skills': self._skill,
+            'autocomplete': self._suggest,
+            'metrics': self._metrics,
+            'healthz': self._health,
+        }
+
+    def fingerprint(self) -> str:
+        return data_fingerprint(**self.paths)
+
+    def etag(self, request: Request) -> str:
+        digest = hashlib.sha256(f'{self.fingerprint()}\0{request.target}'.encode('utf-8'))
+        return f'"{digest.hexdigest()[:32]}"'
+
+    def services(self) -> DomainServices:
+        # sqlite connections stay on the thread that opened them, so each pool thread keeps its own.
+        services = getattr(self._local, 'services', None)
+        if services is None:
+            services = DomainServices(**self.paths)
+            self._local.services = services
+        return services
+
+    def autocomplete_index(self) -> AutocompleteIndex:
+        fingerprint = self.fingerprint()
+        with self._autocomplete_lock:
+            index = self._autocomplete
+            if index is None or index.fingerprint != fingerprint:
+                index = AutocompleteIndex(
+                    build_autocomplete_index('Universal', **self.paths, available_domains=self.available_domains),
+                    fingerprint,
+                )
+                self._autocomplete = index
+            return index
+
+    def _on_every_thread(self, function: Callable[[], None]) -> None:
+        # Each task waits at the barrier, so every pool thread runs exactly one of them.
+        barrier = threading.Barrier(self.max_workers)
+
+        def task() -> None:
+            function()
+            barrier.wait(timeout=30)
+
+        for future in [self.executor.submit(task) for _ in range(self.max_workers)]:
+            future.result()
+
+    def _warm_thread(self) -> None:
+        services = self.services()
+        if 'Items' in self.available_domains:
+            services.items()
+        if 'Skills' in self.available_domains:
+            services.skills()
+
+    def _close_thread(self) -> None:
+        services = getattr(self._local, 'services', None)
+        if services is not None:
+            services.close()
+            self._local.services = None
+
+    def warm(self) -> None:
+        self._on_every_thread(self._warm_thread)
+        self.autocomplete_index()
+
+    def close(self) -> None:
+        self._on_every_thread(self._close_thread)
+        self.executor.shutdown(wait=True)
+
+    async def _run(self, function: Callable[[], Any]) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function)
+
+    def _mode(self, request: Request) -> str:
+        mode = request.query.get('mode', 'Universal')
+        if mode not in DATABASE_MODES:
+            raise HTTPError(400, f'unknown mode: {mode}')
+        return mode
+
+    async def _search(self, request: Request, parts: list[str]) -> Response:
+        query = ' '.join(request.query.get('q', '').split())
+        if parts or not query:
+            raise HTTPError(400 if not parts else 404, 'expected /search?q=<query>[&mode=<mode>]')
+        mode = self._mode(request)
+        outcome = await self._run(lambda: self.flights.do(
+            search_key(mode, query, self.fingerprint()),
+            lambda: search_database(
+                mode,
+                query,
+                **self.paths,
+                available_domains=self.available_domains,
+                services=self.services(),
+            ),
+        ))
+        return json_response(outcome_payload(outcome, mode=mode))
+
+    async def _item(self, request: Request, parts: list[str]) -> Response:
+        if len(parts) != 1 or not parts[0].isdigit() or 'Items' not in self.available_domains:
+            raise HTTPError(404, 'expected /items/<id>')
+        try:
+            detail = await self._run(lambda: self.services().items().get_item(int(parts[0])))
+        except KeyError:
+            raise HTTPError(404, f'item not found: {parts[0]}') from None
+        return json_response(to_payload(detail, detail=True))
+
+    async def _skill(self, request: Request, parts: list[str]) -> Response:
+        skill_id = '/'.join(parts)
+        if not skill_id or 'Skills' not in self.available_domains:
+            raise HTTPError(404, 'expected /skills/<id>')
+        try:
+            card = await self._run(lambda: self.services().skills().get_skill(skill_id))
+        except KeyError:
+            raise HTTPError(404, f'skill not found: {skill_id}') from None
+        return json_response(to_payload(card, detail=True))
+
+    async def _suggest(self, request: Request, parts: list[str]) -> Response:
+        if parts:
+            raise HTTPError(404, 'expected /autocomplete?q=<prefix>')
+        mode = self._mode(request)
+        try:
+            limit = min(max(int(request.query.get('limit', AUTOCOMPLETE_LIMIT)), 1), AUTOCOMPLETE_MAX_LIMIT)
+        except ValueError:
+            raise HTTPError(400, 'limit must be an integer') from None
+        rows = await self._run(
+            lambda: self.autocomplete_index().engine(mode).matches(request.query.get('q', ''), limit)
+        )
+        return json_response({'mode': mode, 'query': request.query.get('q', ''), 'suggestions': to_payload(rows)})
+
+    async def _metrics(self, request: Request, parts: list[str]) -> Response:
+        extra = {
+            'toram_api_executor_workers': self.max_workers,
+            'toram_api_coalesced_searches_total': self.flights.coalesced,
+        }
+        return Response(200, self.metrics.render(extra).encode('utf-8'), 'text/plain; version=0.0.4')
+
+    async def _health(self, request: Request, parts: list[str]) -> Response:
+        return json_response({'ok': True, 'domains': sorted(self.available_domains), 'fingerprint': self.fingerprint()})
+
+    async def dispatch(self, request: Request) -> tuple[str, Response]:
+        segments = [unquote(segment) for segment in request.path.split('/') if segment]
+        route = segments[0] if segments else ''
+        handler = self._routes.get(route)
+        if handler is None:
+            return 'unknown', error_response(404, f'no route for {request.path}')
+        if request.method not in {'GET', 'HEAD'}:
+            return route, error_response(405, 'only GET and HEAD are supported')
+        cacheable = route not in {'metrics', 'healthz'}
+        etag = self.etag(request) if cacheable else None
+        if etag is not None and etag in {tag.strip() for tag in request.headers.get('if-none-match', '').split(',')}:
+            return route, Response(304, headers={'ETag': etag})
+        try:
+            response = await handler(request, segments[1:])
+        except HTTPError as exc:
+            return route, error_response(exc.status, exc.message)
+        except Exception as exc:
+            return route, error_response(500, f'{type(exc).__name__}: {exc}')
+        if etag is not None and response.status == 200:
+            response = Response(response.status, response.body, response.content_type, {**response.headers, 'ETag': etag})
+        return route, response
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.metrics.connections += 1
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), IDLE_TIMEOUT)
+                except HTTPError as exc:
+                    writer.write(encode_response(error_response(exc.status, exc.message), None, keep_alive=False))
+                    await writer.drain()
+                    break
+                except (asyncio.TimeoutError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                started = time.perf_counter()
+                self.metrics.in_flight += 1
+                try:
+                    route, response = await self.dispatch(request)
+                finally:
+                    self.metrics.in_flight -= 1
+                payload = encode_response(response, request, keep_alive=request.keep_alive)
+                writer.write(payload)
+                await writer.drain()
+                self.metrics.observe(route, response.status, time.perf_counter() - started, len(payload))
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            # A server shutting down cancels idle keep-alive readers; that just ends the connection.
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+async def start_server(api: SearchAPI, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.Server:
+    return await asyncio.start_server(api.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+
+
+def serve(
+    paths: dict[str, Path],
+    available_domains: frozenset[SearchDomain],
+    *,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_workers: int = 4,
+) -> None:
+    api = SearchAPI(paths, available_domains, max_workers=max_workers)
+    api.warm()
+
+    async def main() -> None:
+        server = await start_server(api, host, port)
+        address = server.sockets[0].getsockname()
+        print(f'Serving toram_search API on http://{address[0]}:{address[1]}', flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import hashlib
+import heapq
+import json
+import re
+import threading
+from bisect import bisect_left
+from functools import cached_property
 from pathlib import Path
+from typing import TYPE_CHECKING, get_args
 
 from toram_search.database import FOOD_ALIASES, FOOD_ENTRIES, REGISTLET_DATA
-from toram_search.food.service import FoodSearchService
 from toram_search.interpretation import SearchDomain
-from toram_search.items.aliases import STAT_ALIASES, normalize_stat_text
-from toram_search.items.service import ItemSearchService
-from toram_search.models import AutocompleteSuggestion, DatabaseMode
-from toram_search.registlets.service import RegistletSearchService
-from toram_search.skills.service import SkillSearchService
+from toram_search.models import AutocompleteSuggestion, DatabaseMode, SuggestionKind
+
+if TYPE_CHECKING:
+    from toram_search.snapshot import SearchSnapshot
 
 _ALLOWED_BY_MODE = {
     'Universal': frozenset({
@@ -23,6 +29,10 @@ _ALLOWED_BY_MODE = {
 }
 
 _ALL_DOMAINS: frozenset[SearchDomain] = frozenset({'Items', 'Skills', 'Food', 'Registlets'})
+_KIND_BITS: dict[str, int] = {kind: 1 << bit for bit, kind in enumerate(get_args(SuggestionKind))}
+_MODE_MASKS: dict[str, int] = {
+    mode: sum(_KIND_BITS[kind] for kind in kinds) for mode, kinds in _ALLOWED_BY_MODE.items()
+}
 
 
 def _dedupe(rows: list[AutocompleteSuggestion]) -> tuple[AutocompleteSuggestion, ...]:
@@ -38,6 +48,9 @@ def _dedupe(rows: list[AutocompleteSuggestion]) -> tuple[AutocompleteSuggestion,
 
 
 def _item_values(path: Path) -> list[AutocompleteSuggestion]:
+    from toram_search.items.aliases import STAT_ALIASES, normalize_stat_text
+    from toram_search.items.service import ItemSearchService
+
     service = ItemSearchService(path)
     try:
         raw_values = service.list_autocomplete_values()
@@ -52,6 +65,8 @@ def _item_values(path: Path) -> list[AutocompleteSuggestion]:
 
 
 def _skill_values(path: Path) -> list[AutocompleteSuggestion]:
+    from toram_search.skills.service import SkillSearchService
+
     service = SkillSearchService(path)
     try:
         return [AutocompleteSuggestion(value, value, kind) for value, kind in service.list_autocomplete_values()]
@@ -60,6 +75,8 @@ def _skill_values(path: Path) -> list[AutocompleteSuggestion]:
 
 
 def _food_values(entries_path: Path, aliases_path: Path) -> list[AutocompleteSuggestion]:
+    from toram_search.food.service import FoodSearchService
+
     service = FoodSearchService(entries_path, aliases_path)
     return [
         AutocompleteSuggestion(value, value, kind)
@@ -68,6 +85,8 @@ def _food_values(entries_path: Path, aliases_path: Path) -> list[AutocompleteSug
 
 
 def _registlet_values(path: Path) -> list[AutocompleteSuggestion]:
+    from toram_search.registlets.service import RegistletSearchService
+
     service = RegistletSearchService(path)
     values = [
         AutocompleteSuggestion(value, value, kind)
@@ -89,8 +108,21 @@ def build_autocomplete_index(
     food_aliases_path: Path = FOOD_ALIASES,
     registlets_path: Path = REGISTLET_DATA,
     available_domains: frozenset[SearchDomain] | None = None,
+    snapshot: SearchSnapshot | None = None,
 ) -> tuple[AutocompleteSuggestion, ...]:
     available = available_domains if available_domains is not None else _ALL_DOMAINS
+    sources = {
+        'items_path': items_path,
+        'skills_path': skills_path,
+        'food_entries_path': food_entries_path,
+        'food_aliases_path': food_aliases_path,
+        'registlets_path': registlets_path,
+    }
+    # A snapshot outlives edits to its sources; only its index for the current files is usable.
+    if snapshot is not None and snapshot.matches(sources):
+        cached = snapshot.autocomplete_index(mode, available)
+        if cached is not None:
+            return cached
     rows: list[AutocompleteSuggestion] = []
     if mode in {'Universal', 'Items'} and 'Items' in available:
         rows.extend(_item_values(items_path))
@@ -109,3 +141,164 @@ def suggestions_for_mode(
 ) -> tuple[AutocompleteSuggestion, ...]:
     allowed = _ALLOWED_BY_MODE[mode]
     return tuple(row for row in suggestions if row.kind in allowed)
+
+
+_NON_SEARCH_CHARS = re.compile(r'[^a-z0-9%:+-]+')
+_PREFIX_END = '\x7f'
+
+
+def normalize_suggestion_text(value: str) -> str:
+    """Python twin of ``normalize`` in components/autocomplete_search."""
+    return _NON_SEARCH_CHARS.sub(' ', str(value or '').lower()).strip()
+
+
+def fuzzy_score(query: str, candidate: str) -> float:
+    """Python twin of ``fuzzyScore``; both arguments must already be normalized."""
+    if not query or not candidate:
+        return 0
+    if candidate == query:
+        return 10000
+    if candidate.startswith(query):
+        return 9000 - min(len(candidate), 500)
+    position = candidate.find(query)
+    if position >= 0:
+        return 7500 - position
+    score = 0
+    last_index = -1
+    streak = 0
+    for char in query:
+        index = candidate.find(char, last_index + 1)
+        if index == -1:
+            return 0
+        streak = streak + 1 if index == last_index + 1 else 1
+        score += 10 + streak * 4 - min(index - last_index, 8)
+        last_index = index
+    return score - abs(len(candidate) - len(query)) * 0.2
+
+
+def _fuzzy_bound(length: int) -> int:
+    # Every character scores at most 9 + 4 * streak, and the streak can grow by one per character.
+    return 9 * length + 2 * length * (length + 1)
+
+
+def _utf16_length(text: str) -> int:
+    return len(text.encode('utf-16-le')) // 2
+
+
+def encode_suggestions(suggestions: tuple[AutocompleteSuggestion, ...]) -> dict[str, object]:
+    """Columnar component payload: a kind dictionary, front-coded sorted values, and sparse labels.
+
+    Prefix lengths count UTF-16 code units so the browser can rebuild values with ``slice``.
+    """
+    rows = sorted(suggestions, key=lambda row: (row.value, row.kind, row.label))
+    kinds: dict[str, int] = {}
+    prefix: list[int] = []
+    suffix: list[str] = []
+    kind: list[int] = []
+    labels: list[list[object]] = []
+    previous = ''
+    for position, row in enumerate(rows):
+        shared = 0
+        for left, right in zip(previous, row.value):
+            if left != right:
+                break
+            shared += 1
+        prefix.append(_utf16_length(row.value[:shared]))
+        suffix.append(row.value[shared:])
+        kind.append(kinds.setdefault(row.kind, len(kinds)))
+        if row.label != row.value:
+            labels.append([position, row.label])
+        previous = row.value
+    columns = {'kinds': list(kinds), 'prefix': prefix, 'suffix': suffix, 'kind': kind, 'labels': labels}
+    digest = hashlib.blake2b(
+        json.dumps(columns, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), digest_size=12
+    ).hexdigest()
+    return {'hash': digest, **columns}
+
+
+class AutocompleteEngine:
+    """Top-k suggestion ranking with the same ordering as the component's ``getMatches``."""
+
+    def __init__(self, suggestions: tuple[AutocompleteSuggestion, ...]) -> None:
+        self.suggestions = suggestions
+        self._texts = tuple(
+            normalize_suggestion_text(f'{row.value} {row.label} {row.kind}') for row in suggestions
+        )
+        self._values = tuple(normalize_suggestion_text(row.value) for row in suggestions)
+        self._label_keys = tuple((row.label.casefold(), row.label) for row in suggestions)
+        order = sorted(range(len(suggestions)), key=self._texts.__getitem__)
+        self._prefix_texts = tuple(self._texts[index] for index in order)
+        self._prefix_ids = tuple(order)
+
+    def __len__(self) -> int:
+        return len(self.suggestions)
+
+    @cached_property
+    def wire(self) -> dict[str, object]:
+        return encode_suggestions(self.suggestions)
+
+    def _top(self, scored: list[tuple[float, int]], limit: int) -> list[tuple[float, int]]:
+        # The index keeps ties in list order, like the component's stable sort.
+        return heapq.nsmallest(limit, scored, key=lambda entry: (-entry[0], self._label_keys[entry[1]], entry[1]))
+
+    def matches(self, typed: str, limit: int = 6) -> tuple[AutocompleteSuggestion, ...]:
+        query = normalize_suggestion_text(typed)
+        if not query or limit <= 0:
+            return ()
+        # Tiers never overlap: prefix scores (>= 8500) beat substring scores (<= 7500),
+        # which beat fuzzy scores whenever the k-th substring score exceeds the fuzzy bound.
+        start = bisect_left(self._prefix_texts, query)
+        end = bisect_left(self._prefix_texts, query + _PREFIX_END, start)
+        scored = [
+            (fuzzy_score(query, self._texts[index]), index)
+            for index in self._prefix_ids[start:end]
+            if self._values[index] != query
+        ]
+        if len(scored) < limit:
+            scored.extend(
+                (7500 - position, index)
+                for index, text in enumerate(self._texts)
+                if (position := text.find(query)) > 0 and self._values[index] != query
+            )
+            top = self._top(scored, limit)
+            if len(top) < limit or top[-1][0] <= _fuzzy_bound(len(query)):
+                for index, text in enumerate(self._texts):
+                    if query in text or self._values[index] == query:
+                        continue
+                    score = fuzzy_score(query, text)
+                    if score > 0:
+                        scored.append((score, index))
+        return tuple(self.suggestions[index] for _, index in self._top(scored, limit))
+
+
+class AutocompleteIndex:
+    """Immutable Universal suggestion list with per-mode views and engines derived on first use."""
+
+    def __init__(self, suggestions: tuple[AutocompleteSuggestion, ...], fingerprint: str = '') -> None:
+        self.suggestions = suggestions
+        self.fingerprint = fingerprint
+        self._kind_bits = tuple(_KIND_BITS[row.kind] for row in suggestions)
+        self._views: dict[str, tuple[AutocompleteSuggestion, ...]] = {'Universal': suggestions}
+        self._engines: dict[str, AutocompleteEngine] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.suggestions)
+
+    def view(self, mode: DatabaseMode) -> tuple[AutocompleteSuggestion, ...]:
+        with self._lock:
+            rows = self._views.get(mode)
+            if rows is None:
+                mask = _MODE_MASKS[mode]
+                rows = tuple(row for row, bit in zip(self.suggestions, self._kind_bits) if bit & mask)
+                self._views[mode] = rows
+            return rows
+
+    def engine(self, mode: DatabaseMode) -> AutocompleteEngine:
+        rows = self.view(mode)
+        with self._lock:
+            engine = self._engines.get(mode)
+            if engine is None:
+                engine = AutocompleteEngine(rows)
+                self._engines[mode] = engine
+            return engine
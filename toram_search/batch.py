@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, get_args
+
+from toram_search.interpretation import SearchDomain
+from toram_search.models import DatabaseMode
+from toram_search.router import DomainServices, search_database
+from toram_search.serialization import dumps_line, outcome_payload
+
+DATABASE_MODES: tuple[str, ...] = get_args(DatabaseMode)
+DEFAULT_CHUNK_SIZE = 256
+
+
+@dataclass(frozen=True)
+class BatchQuery:
+    mode: DatabaseMode
+    query: str
+
+
+def parse_query_line(line: str, default_mode: DatabaseMode = 'Universal') -> BatchQuery | None:
+    """Read ``query`` or ``mode<TAB>query``; blank lines and ``#`` comments are skipped."""
+    text = line.rstrip('\r\n')
+    if not text.strip() or text.lstrip().startswith('#'):
+        return None
+    head, separator, rest = text.partition('\t')
+    if separator and head.strip() in DATABASE_MODES:
+        return BatchQuery(head.strip(), ' '.join(rest.split()))
+    return BatchQuery(default_mode, ' '.join(text.split()))
+
+
+def read_queries(lines: Iterable[str], default_mode: DatabaseMode = 'Universal') -> Iterator[BatchQuery]:
+    for line in lines:
+        query = parse_query_line(line, default_mode)
+        if query is not None:
+            yield query
+
+
+class BatchRunner:
+    """Search queries against one set of warm services and render JSON lines."""
+
+    def __init__(self, paths: dict[str, Path], available_domains: frozenset[SearchDomain]) -> None:
+        self.paths = paths
+        self.available_domains = available_domains
+        self.services = DomainServices(**paths)
+
+    def warm(self) -> None:
+        from toram_search.food.data import load_food_dataset
+        from toram_search.registlets.data import load_registlet_dataset
+
+        if 'Items' in self.available_domains:
+            self.services.items()
+        if 'Skills' in self.available_domains:
+            self.services.skills()
+        if 'Food' in self.available_domains:
+            load_food_dataset(self.paths['food_entries_path'], self.paths['food_aliases_path'])
+        if 'Registlets' in self.available_domains:
+            load_registlet_dataset(self.paths['registlets_path'])
+            if 'Skills' in self.available_domains:
+                self.services.relationship_index()
+
+    def run(self, query: BatchQuery) -> str:
+        try:
+            outcome = search_database(
+                query.mode,
+                query.query,
+                **self.paths,
+                available_domains=self.available_domains,
+                services=self.services,
+            )
+        except Exception as exc:
+            return dumps_line({'mode': query.mode, 'query': query.query, 'error': f'{type(exc).__name__}: {exc}'})
+        return dumps_line(outcome_payload(outcome, mode=query.mode))
+
+    def close(self) -> None:
+        self.services.close()
+
+
+_worker_runner: BatchRunner | None = None
+
+
+def _init_worker(paths: dict[str, Path], available_domains: frozenset[SearchDomain]) -> None:
+    global _worker_runner
+    _worker_runner = BatchRunner(paths, available_domains)
+    _worker_runner.warm()
+
+
+def _run_chunk(chunk: list[BatchQuery]) -> list[str]:
+    assert _worker_runner is not None, 'worker was not initialized'
+    return [_worker_runner.run(query) for query in chunk]
+
+
+def _chunks(queries: Iterable[BatchQuery], size: int) -> Iterator[list[BatchQuery]]:
+    iterator = iter(queries)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def run_batch(
+    queries: Iterable[BatchQuery],
+    *,
+    paths: dict[str, Path],
+    available_domains: frozenset[SearchDomain],
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Yield one JSON line per query, in input order, streaming as results complete."""
+    if workers <= 1:
+        runner = BatchRunner(paths, available_domains)
+        try:
+            for query in queries:
+                yield runner.run(query)
+        finally:
+            runner.close()
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(paths, available_domains),
+    ) as executor:
+        pending: deque[Future[list[str]]] = deque()
+        for chunk in _chunks(queries, max(chunk_size, 1)):
+            pending.append(executor.submit(_run_chunk, chunk))
+            # Bound in-flight chunks so stdin streams and memory stays flat on huge shards.
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
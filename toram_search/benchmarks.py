@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from itertools import cycle
+from pathlib import Path
+from typing import Sequence
+from urllib.parse import urlencode
+
+from toram_search.interpretation import SearchDomain
+
+DEFAULT_API_QUERIES = ('critical rate', 'cr bow', 'hp >= 5000 armor', 'Guardian', 'food maxmp', 'std 220')
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    requests: int
+    errors: int
+    seconds: float
+    latencies: tuple[float, ...]
+    unit: str = 'requests'
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+    def format(self) -> str:
+        mean = statistics.fmean(self.latencies) if self.latencies else 0.0
+        return (
+            f'{self.name}: {self.requests} {self.unit}, {self.errors} errors in {self.seconds:.2f}s '
+            f'({self.rate:.1f}/s); latency mean {mean * 1000:.1f} ms, '
+            f'p50 {self.percentile(0.5) * 1000:.1f} ms, p95 {self.percentile(0.95) * 1000:.1f} ms'
+        )
+
+
+async def _fetch(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, target: str) -> int:
+    writer.write(f'GET {target} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n\r\n'.encode('latin-1'))
+    await writer.drain()
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    length = 0
+    for line in head[1:]:
+        name, _, value = line.partition(':')
+        if name.strip().casefold() == 'content-length':
+            length = int(value)
+    if length:
+        await reader.readexactly(length)
+    return int(head[0].split(' ')[1])
+
+
+async def _client(host: str, port: int, targets, remaining: list[int], latencies: list[float]) -> int:
+    errors = 0
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            started = time.perf_counter()
+            status = await _fetch(reader, writer, host, next(targets))
+            latencies.append(time.perf_counter() - started)
+            errors += status >= 400
+    finally:
+        writer.close()
+    return errors
+
+
+async def benchmark_api(
+    host: str,
+    port: int,
+    *,
+    queries: Sequence[str] = DEFAULT_API_QUERIES,
+    requests: int = 1000,
+    concurrency: int = 8,
+) -> BenchmarkResult:
+    """Drive ``/search`` over keep-alive connections and report throughput and latency."""
+    targets = cycle([f'/search?{urlencode({"q": query})}' for query in queries])
+    remaining = [requests]
+    latencies: list[float] = []
+    started = time.perf_counter()
+    errors = await asyncio.gather(*(
+        _client(host, port, targets, remaining, latencies) for _ in range(max(concurrency, 1))
+    ))
+    return BenchmarkResult('api /search', len(latencies), sum(errors), time.perf_counter() - started, tuple(latencies))
+
+
+async def benchmark_local_api(
+    paths: dict[str, Path],
+    available_domains: frozenset[SearchDomain],
+    *,
+    queries: Sequence[str] = DEFAULT_API_QUERIES,
+    requests: int = 1000,
+    concurrency: int = 8,
+    max_workers: int = 4,
+) -> BenchmarkResult:
+    from toram_search.api import SearchAPI, start_server
+
+    api = SearchAPI(paths, available_domains, max_workers=max_workers)
+    api.warm()
+    try:
+        server = await start_server(api, '127.0.0.1', 0)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            return await benchmark_api(
+                '127.0.0.1', port, queries=queries, requests=requests, concurrency=concurrency
+            )
+    finally:
+        api.close()
+
+
+def benchmark_sqlite_modes(
+    paths: dict[str, Path],
+    available_domains: frozenset[SearchDomain],
+    *,
+    queries: Sequence[str] = DEFAULT_API_QUERIES,
+    rounds: int = 3,
+) -> tuple[BenchmarkResult, ...]:
+    """Run the same Universal searches once per ``TORAM_SEARCH_SQLITE_MODE``, including connection setup."""
+    from toram_search.database import SQLITE_MODE_ENV, SQLITE_MODES, release_memory_databases
+    from toram_search.router import DomainServices, search_database
+
+    previous = os.environ.get(SQLITE_MODE_ENV)
+    results = []
+    try:
+        for mode in SQLITE_MODES:
+            os.environ[SQLITE_MODE_ENV] = mode
+            latencies: list[float] = []
+            errors = 0
+            started = time.perf_counter()
+            with DomainServices(**paths) as services:
+                for _ in range(max(rounds, 1)):
+                    for query in queries:
+                        began = time.perf_counter()
+                        try:
+                            search_database('Universal', query, **paths, available_domains=available_domains, services=services)
+                        except Exception:
+                            errors += 1
+                        latencies.append(time.perf_counter() - began)
+            results.append(BenchmarkResult(
+                f'sqlite {mode}', len(latencies), errors, time.perf_counter() - started, tuple(latencies), 'queries'
+            ))
+            release_memory_databases()
+    finally:
+        if previous is None:
+            os.environ.pop(SQLITE_MODE_ENV, None)
+        else:
+            os.environ[SQLITE_MODE_ENV] = previous
+    return tuple(results)
+
+
+_COLD_START_SCRIPT = (
+    'import json, sys, time\n'
+    'started = time.perf_counter()\n'
+    'from toram_search.benchmarks import cold_start_probe\n'
+    'print(json.dumps(cold_start_probe(json.loads(sys.argv[1]), started)))\n'
+)
+
+
+def cold_start_probe(config: dict, started: float) -> dict:
+    """Start a ``SearchEngine`` in a fresh interpreter, then time its first Universal search."""
+    from toram_search.engine import SearchEngine
+
+    paths = {name: Path(value) for name, value in config['paths'].items()}
+    engine = SearchEngine(**paths, snapshot_path=Path(config['snapshot']) if config.get('snapshot') else None)
+    try:
+        index = engine.autocomplete_index()
+        ready = time.perf_counter() - started
+        engine.search('Universal', config.get('query') or DEFAULT_API_QUERIES[0])
+        return {
+            'seconds': ready,
+            'first_query': engine.timings.first_query,
+            'snapshot': engine.snapshot is not None,
+            'suggestions': len(index),
+        }
+    finally:
+        engine.close()
+
+
+def measure_cold_start(
+    paths: dict[str, Path],
+    snapshot: Path | None,
+    *,
+    runs: int = 3,
+) -> tuple[BenchmarkResult, BenchmarkResult]:
+    """Time startup and the first search in fresh interpreters, with the snapshot when given and live otherwise."""
+    config = json.dumps({'paths': {name: str(path) for name, path in paths.items()}, 'snapshot': str(snapshot or '')})
+    root = Path(__file__).resolve().parents[1]
+    environment = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, (str(root), os.environ.get('PYTHONPATH'))))}
+    durations: list[float] = []
+    first_queries: list[float] = []
+    misses = 0
+    started = time.perf_counter()
+    for _ in range(max(runs, 1)):
+        completed = subprocess.run(
+            [sys.executable, '-c', _COLD_START_SCRIPT, config],
+            capture_output=True, text=True, check=True, env=environment,
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        durations.append(result['seconds'])
+        first_queries.append(result['first_query'])
+        misses += snapshot is not None and not result['snapshot']
+    label = 'snapshot' if snapshot is not None else 'live'
+    seconds = time.perf_counter() - started
+    return (
+        BenchmarkResult(f'cold start ({label})', len(durations), misses, seconds, tuple(durations), 'runs'),
+        BenchmarkResult(f'first query ({label})', len(first_queries), 0, seconds, tuple(first_queries), 'runs'),
+    )
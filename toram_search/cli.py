@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Sequence, get_args
+
+from toram_search.database import (
+    FOOD_ALIASES,
+    FOOD_ENTRIES,
+    ITEM_DATABASE,
+    ITEM_THUMBNAILS,
+    REGISTLET_DATA,
+    SKILL_DATABASE,
+    SEARCH_SNAPSHOT,
+    validate_sources,
+)
+from toram_search.models import DatabaseMode
+
+_DEFAULT_MEMORY_QUERIES = ('critical rate', 'food maxmp', 'cr bow', 'Guardian', 'std 220')
+
+
+def _add_source_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--items', type=Path, default=ITEM_DATABASE)
+    parser.add_argument('--skills', type=Path, default=SKILL_DATABASE)
+    parser.add_argument('--food-entries', type=Path, default=FOOD_ENTRIES)
+    parser.add_argument('--food-aliases', type=Path, default=FOOD_ALIASES)
+    parser.add_argument('--registlets', type=Path, default=REGISTLET_DATA)
+
+
+def _available_domains(args: argparse.Namespace) -> frozenset:
+    health = validate_sources(args.items, args.skills, args.food_entries, args.food_aliases, args.registlets)
+    return frozenset(
+        domain
+        for domain, row in zip(('Items', 'Skills', 'Food', 'Registlets'), health)
+        if row.ok
+    )
+
+
+def _source_paths(args: argparse.Namespace) -> dict[str, Path]:
+    return {
+        'items_path': args.items,
+        'skills_path': args.skills,
+        'food_entries_path': args.food_entries,
+        'food_aliases_path': args.food_aliases,
+        'registlets_path': args.registlets,
+    }
+
+
+def _run_memory(args: argparse.Namespace) -> int:
+    from toram_search.autocomplete import AutocompleteIndex, build_autocomplete_index
+    from toram_search.memory import (
+        format_report,
+        memory_report,
+        record_session_outcome,
+        register_memory_source,
+        sample_allocation,
+    )
+    from toram_search.router import search_database
+    from toram_search.skill_icons import DEFAULT_SKILL_ICON_CATALOG
+
+    tracemalloc.start()
+    try:
+        available = _available_domains(args)
+        autocomplete = AutocompleteIndex(
+            build_autocomplete_index('Universal', **_source_paths(args), available_domains=available)
+        )
+        for mode in ('Items', 'Skills', 'Food', 'Registlets'):
+            autocomplete.engine(mode)
+        register_memory_source('autocomplete.index', lambda: (len(autocomplete), autocomplete))
+        DEFAULT_SKILL_ICON_CATALOG.resolve('', '')
+        for index, query in enumerate(args.query or _DEFAULT_MEMORY_QUERIES):
+            outcome, traced = sample_allocation(
+                lambda: search_database('Universal', query, **_source_paths(args), available_domains=available)
+            )
+            record_session_outcome(f'cli-{index:03d}', query, outcome, traced_bytes=traced)
+        print(format_report(memory_report()))
+    finally:
+        tracemalloc.stop()
+    return 0
+
+
+def _run_explain(args: argparse.Namespace) -> int:
+    from toram_search.items.repository import ItemRepository
+    from toram_search.query_plan import (
+        AUDIT_QUERIES,
+        HOT_STATEMENT_PATTERNS,
+        StatementRecorder,
+        format_plans,
+        plan_violations,
+    )
+    from toram_search.router import search_database
+
+    available = _available_domains(args)
+    with StatementRecorder(hot_patterns=HOT_STATEMENT_PATTERNS + tuple(args.hot or ())) as recorder:
+        for query in args.query or AUDIT_QUERIES:
+            outcome = search_database('Universal', query, **_source_paths(args), available_domains=available)
+            if outcome.items is not None and outcome.items.results:
+                with ItemRepository(args.items) as repository:
+                    for row in outcome.items.results[:args.detail_limit]:
+                        repository.get_item(row.item.id)
+    plans = recorder.plans()
+    print(format_plans(plans))
+    return 1 if plan_violations(plans) else 0
+
+
+def _run_query(args: argparse.Namespace) -> int:
+    from toram_search.batch import BatchQuery, read_queries, run_batch
+
+    if args.text is not None:
+        queries = iter((BatchQuery(args.mode, ' '.join(args.text.split())),))
+        stream = None
+    elif args.input is None or str(args.input) == '-':
+        queries, stream = read_queries(sys.stdin, args.mode), None
+    else:
+        stream = args.input.open(encoding='utf-8')
+        queries = read_queries(stream, args.mode)
+    try:
+        for line in run_batch(
+            queries,
+            paths=_source_paths(args),
+            available_domains=_available_domains(args),
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+        ):
+            sys.stdout.write(line + '\n')
+            if args.workers <= 1:
+                sys.stdout.flush()
+    finally:
+        if stream is not None:
+            stream.close()
+    return 0
+
+
+def _run_serve(args: argparse.Namespace) -> int:
+    from toram_search.api import serve
+
+    serve(
+        _source_paths(args),
+        _available_domains(args),
+        host=args.host,
+        port=args.port,
+        max_workers=args.threads,
+    )
+    return 0
+
+
+def _run_compile(args: argparse.Namespace) -> int:
+    from toram_search.memory import format_bytes
+    from toram_search.snapshot import compile_snapshot
+
+    info = compile_snapshot(args.output, **_source_paths(args), available_domains=_available_domains(args))
+    print(f'Wrote {info.path} ({format_bytes(info.bytes)}) in {info.seconds:.2f}s')
+    for name, size in info.sections.items():
+        print(f'  {name}: {format_bytes(size)}')
+    print(f"  domains: {', '.join(info.available_domains) or 'none'}")
+    return 0
+
+
+def _run_thumbnails(args: argparse.Namespace) -> int:
+    from toram_search.item_thumbnails import build_item_thumbnails
+
+    build = build_item_thumbnails(args.output, items_path=args.items, images_root=args.images_root)
+    print(
+        f'Wrote {build.written} and kept {build.reused} thumbnails for {build.images} images '
+        f'in {build.output} in {build.seconds:.2f}s'
+    )
+    for label, paths in (('missing', build.missing), ('unreadable', build.unreadable)):
+        if paths:
+            print(f'  {len(paths)} {label}: {", ".join(paths[:5])}{" ..." if len(paths) > 5 else ""}')
+    return 0
+
+
+def _run_bench(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from toram_search.benchmarks import (
+        DEFAULT_API_QUERIES,
+        benchmark_api,
+        benchmark_local_api,
+        benchmark_sqlite_modes,
+        measure_cold_start,
+    )
+
+    if args.sqlite_modes:
+        results = benchmark_sqlite_modes(
+            _source_paths(args), _available_domains(args), queries=args.query or DEFAULT_API_QUERIES, rounds=args.runs,
+        )
+        print('\n'.join(result.format() for result in results))
+        return 1 if any(result.errors for result in results) else 0
+
+    if args.cold_start:
+        live = measure_cold_start(_source_paths(args), None, runs=args.runs)
+        print('\n'.join(result.format() for result in live))
+        if not args.snapshot.is_file():
+            print(f'No snapshot at {args.snapshot}; run `python -m toram_search compile` to compare.')
+            return 0
+        cached = measure_cold_start(_source_paths(args), args.snapshot, runs=args.runs)
+        print('\n'.join(result.format() for result in cached))
+        return 1 if cached[0].errors else 0
+
+    queries = args.query or DEFAULT_API_QUERIES
+    if args.port is not None:
+        result = asyncio.run(benchmark_api(
+            args.host, args.port, queries=queries, requests=args.requests, concurrency=args.concurrency,
+        ))
+    else:
+        result = asyncio.run(benchmark_local_api(
+            _source_paths(args),
+            _available_domains(args),
+            queries=queries,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            max_workers=args.threads,
+        ))
+    print(result.format())
+    return 1 if result.errors else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m toram_search')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    memory = commands.add_parser('memory', help='report approximate cache, index, and outcome memory')
+    _add_source_arguments(memory)
+    memory.add_argument('--query', action='append', help='sample query to search and size (repeatable)')
+    memory.set_defaults(handler=_run_memory)
+
+    explain = commands.add_parser('explain', help='audit EXPLAIN QUERY PLAN for every SQL statement template')
+    _add_source_arguments(explain)
+    explain.add_argument('--query', action='append', help='corpus query to execute (repeatable)')
+    explain.add_argument('--hot', action='append', help='extra regex marking statement templates as hot')
+    explain.add_argument('--detail-limit', type=int, default=20, help='item details to load per query')
+    explain.set_defaults(handler=_run_explain)
+
+    query = commands.add_parser('query', help='search queries headlessly and stream one JSON line per outcome')
+    _add_source_arguments(query)
+    query.add_argument('text', nargs='?', help='single query; omit to read queries from --input or stdin')
+    query.add_argument('--input', type=Path, help="file of queries, one per line as 'query' or 'mode<TAB>query' ('-' for stdin)")
+    query.add_argument('--mode', choices=get_args(DatabaseMode), default='Universal', help='mode for lines without a mode column')
+    query.add_argument('--workers', type=int, default=1, help='worker processes, each holding warm connections and indexes')
+    query.add_argument('--chunk-size', type=int, default=256, help='queries sent to a worker at a time')
+    query.set_defaults(handler=_run_query)
+
+    serve = commands.add_parser('serve', help='serve search, detail, and autocomplete as a local JSON HTTP API')
+    _add_source_arguments(serve)
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--threads', type=int, default=4, help='search executor threads')
+    serve.set_defaults(handler=_run_serve)
+
+    compile_parser = commands.add_parser('compile', help='write the precompiled startup snapshot')
+    _add_source_arguments(compile_parser)
+    compile_parser.add_argument('--output', type=Path, default=SEARCH_SNAPSHOT)
+    compile_parser.set_defaults(handler=_run_compile)
+
+    thumbnails = commands.add_parser('thumbnails', help='build local item image thumbnails from item_images.local_path')
+    thumbnails.add_argument('--items', type=Path, default=ITEM_DATABASE)
+    thumbnails.add_argument('--images-root', type=Path, help='directory local_path is relative to (default: the items database directory)')
+    thumbnails.add_argument('--output', type=Path, default=ITEM_THUMBNAILS)
+    thumbnails.set_defaults(handler=_run_thumbnails)
+
+    bench = commands.add_parser('bench', help='measure local API requests per second or cold-start time')
+    _add_source_arguments(bench)
+    bench.add_argument('--host', default='127.0.0.1')
+    bench.add_argument('--port', type=int, help='benchmark a running server; omit to start one in-process')
+    bench.add_argument('--threads', type=int, default=4, help='executor threads for the in-process server')
+    bench.add_argument('--requests', type=int, default=1000)
+    bench.add_argument('--concurrency', type=int, default=8, help='parallel keep-alive connections')
+    bench.add_argument('--query', action='append', help='query to request (repeatable)')
+    bench.add_argument('--cold-start', action='store_true', help='time startup live and from the snapshot instead')
+    bench.add_argument('--sqlite-modes', action='store_true', help='compare on-disk, immutable+mmap and in-memory SQLite reads instead')
+    bench.add_argument('--snapshot', type=Path, default=SEARCH_SNAPSHOT)
+    bench.add_argument('--runs', type=int, default=3, help='fresh interpreters per cold-start measurement, or query rounds per SQLite mode')
+    bench.set_defaults(handler=_run_bench)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+from functools import lru_cache
+import hashlib
+import os
 from pathlib import Path
 import sqlite3
+import threading
+from typing import Callable, Literal, get_args
 from urllib.parse import quote
 
-from toram_search.food.data import FoodDataError, load_food_dataset
-from toram_search.registlets.data import RegistletDataError, load_registlet_dataset
 from .models import DatabaseHealth
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -14,6 +17,14 @@ SKILL_DATABASE = ROOT / "skills.sqlite"
 FOOD_ENTRIES = ROOT / "food_entries.csv"
 FOOD_ALIASES = ROOT / "food_stat_aliases.json"
 REGISTLET_DATA = ROOT / "registlets.json"
+SEARCH_SNAPSHOT = ROOT / "search.toramidx"
+ITEM_THUMBNAILS = ROOT / "item_thumbnails"
+TOP_QUERIES = ROOT / "top_queries.txt"
+
+SQLiteMode = Literal["ro", "immutable", "memory"]
+SQLITE_MODE_ENV = "TORAM_SEARCH_SQLITE_MODE"
+SQLITE_MODES: tuple[SQLiteMode, ...] = get_args(SQLiteMode)
+MMAP_SIZE = 256 * 1024 * 1024
 
 ITEM_REQUIRED_COLUMNS: dict[str, set[str]] = {
     "items": {"id", "name", "item_type", "sell_price", "process_material", "process_amount", "badge", "note", "page_url"},
@@ -36,16 +47,123 @@ SKILL_REQUIRED_COLUMNS: dict[str, set[str]] = {
 }
 
 
-def connect_readonly(path: Path) -> sqlite3.Connection:
+ConnectionHook = Callable[[sqlite3.Connection, Path], None]
+_CONNECTION_HOOKS: list[ConnectionHook] = []
+
+
+def add_connection_hook(hook: ConnectionHook) -> None:
+    _CONNECTION_HOOKS.append(hook)
+
+
+def remove_connection_hook(hook: ConnectionHook) -> None:
+    if hook in _CONNECTION_HOOKS:
+        _CONNECTION_HOOKS.remove(hook)
+
+
+def sqlite_mode() -> SQLiteMode:
+    value = os.environ.get(SQLITE_MODE_ENV, "").strip().lower() or "ro"
+    if value not in SQLITE_MODES:
+        raise ValueError(f"{SQLITE_MODE_ENV} must be one of {', '.join(SQLITE_MODES)}, not {value!r}")
+    return value
+
+
+# One keeper connection per database file version holds its shared-cache memory copy open.
+_memory_keepers: dict[str, tuple[tuple[int, int], str, sqlite3.Connection]] = {}
+_memory_lock = threading.Lock()
+
+
+def _memory_uri(resolved: Path) -> str:
+    stat = resolved.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _memory_lock:
+        current = _memory_keepers.get(str(resolved))
+        if current is not None and current[0] == version:
+            return current[1]
+        name = hashlib.sha256(f"{resolved}\0{version}".encode("utf-8")).hexdigest()[:24]
+        uri = f"file:toram-{name}?mode=memory&cache=shared"
+        keeper = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        source = sqlite3.connect(f"file:{quote(resolved.as_posix(), safe='/:')}?mode=ro", uri=True)
+        try:
+            source.backup(keeper)
+        finally:
+            source.close()
+        # Connections already open on the previous copy keep it alive until they close.
+        if current is not None:
+            current[2].close()
+        _memory_keepers[str(resolved)] = (version, uri, keeper)
+        return uri
+
+
+def release_memory_databases() -> None:
+    with _memory_lock:
+        for _, _, keeper in _memory_keepers.values():
+            keeper.close()
+        _memory_keepers.clear()
+
+
+def connect_readonly(
+    path: Path,
+    *,
+    check_same_thread: bool = True,
+    mode: SQLiteMode | None = None,
+) -> sqlite3.Connection:
+    """Open a read-only connection in the ``TORAM_SEARCH_SQLITE_MODE`` mode unless ``mode`` is given.
+
+    ``ro`` reads the file, ``immutable`` also skips file locking and memory-maps it, and
+    ``memory`` copies the file once into a shared-cache in-memory database.
+    """
     resolved = Path(path).expanduser().resolve()
     if not resolved.is_file():
         raise FileNotFoundError(f"SQLite database not found: {resolved}")
-    uri = f"file:{quote(resolved.as_posix(), safe='/:')}?mode=ro"
-    connection = sqlite3.connect(uri, uri=True, timeout=5.0)
+    mode = mode or sqlite_mode()
+    file_uri = f"file:{quote(resolved.as_posix(), safe='/:')}"
+    if mode == "memory":
+        connection = sqlite3.connect(_memory_uri(resolved), uri=True, check_same_thread=check_same_thread)
+        connection.execute("PRAGMA query_only = ON")
+    elif mode == "immutable":
+        connection = sqlite3.connect(f"{file_uri}?mode=ro&immutable=1", uri=True, check_same_thread=check_same_thread)
+        connection.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    else:
+        connection = sqlite3.connect(f"{file_uri}?mode=ro", uri=True, timeout=5.0, check_same_thread=check_same_thread)
     connection.row_factory = sqlite3.Row
+    for hook in tuple(_CONNECTION_HOOKS):
+        hook(connection, resolved)
     return connection
 
 
+@lru_cache(maxsize=32)
+def _file_digest(path_name: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path_name, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: Path) -> str:
+    """Content digest of one source file, recomputed only when its mtime or size changes."""
+    resolved = Path(path).expanduser().resolve()
+    try:
+        stat = resolved.stat()
+    except OSError:
+        return "missing"
+    return _file_digest(str(resolved), stat.st_mtime_ns, stat.st_size)
+
+
+def data_fingerprint(
+    items_path: Path = ITEM_DATABASE,
+    skills_path: Path = SKILL_DATABASE,
+    food_entries_path: Path = FOOD_ENTRIES,
+    food_aliases_path: Path = FOOD_ALIASES,
+    registlets_path: Path = REGISTLET_DATA,
+) -> str:
+    digest = hashlib.sha256()
+    for path in (items_path, skills_path, food_entries_path, food_aliases_path, registlets_path):
+        digest.update(file_fingerprint(path).encode("ascii"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
 def _validate_schema(name: str, path: Path, required_columns: dict[str, set[str]]) -> DatabaseHealth:
     try:
         connection = connect_readonly(path)
@@ -77,6 +195,8 @@ def validate_food_sources(
     entries_path: Path = FOOD_ENTRIES,
     aliases_path: Path = FOOD_ALIASES,
 ) -> DatabaseHealth:
+    from toram_search.food.data import FoodDataError, load_food_dataset
+
     try:
         load_food_dataset(entries_path, aliases_path)
         return DatabaseHealth('Food', Path(entries_path), True)
@@ -85,6 +205,8 @@ def validate_food_sources(
 
 
 def validate_registlet_source(path: Path = REGISTLET_DATA) -> DatabaseHealth:
+    from toram_search.registlets.data import RegistletDataError, load_registlet_dataset
+
     try:
         load_registlet_dataset(path)
         return DatabaseHealth('Registlets', Path(path), True)
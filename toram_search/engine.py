@@ -0,0 +1,714 @@
+from __future__ import annotations
+
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Generic, Hashable, Iterator, TypeVar
+
+from toram_search.autocomplete import AutocompleteIndex, build_autocomplete_index
+from toram_search.database import (
+    FOOD_ALIASES,
+    FOOD_ENTRIES,
+    ITEM_DATABASE,
+    REGISTLET_DATA,
+    SEARCH_SNAPSHOT,
+    SKILL_DATABASE,
+    TOP_QUERIES,
+    DatabaseHealth,
+    data_fingerprint,
+    validate_sources,
+)
+from toram_search.interpretation import SearchDomain
+from toram_search.models import DatabaseMode, UniversalSearchOutcome
+from toram_search.outcome_store import OutcomeStore
+from toram_search.paging import (
+    PAGE_SIZE,
+    OutcomeDomain,
+    OutcomeHandle,
+    PageCursor,
+    PageRows,
+    RankedOutcome,
+    ResultPage,
+    first_page,
+    page_of,
+    rank,
+    window,
+)
+from toram_search.router import DomainServices, SingleFlight, search_database, search_key
+from toram_search.snapshot import SearchSnapshot, load_current_snapshot
+from toram_search.speculation import CpuBudget, SpeculationStats, follow_up_queries
+from toram_search.warmup import DEFAULT_WARM_TOP, warm_searches
+
+if TYPE_CHECKING:
+    from toram_search.items.models import ItemCardFace, ItemDetail
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_WATCH_INTERVAL = 2.0
+# Bound on the shared outcome cache, in ranked rows rather than entries: one broad query can rank thousands of results.
+RANKED_RESULT_ROWS = 50_000
+ITEM_DETAILS = 256
+# Rows of built result pages kept per data version, shared by every session paging through the same search.
+PAGE_ROWS = 2_000
+SPECULATED_KEYS = 256
+# How long background warm-up waits between checks for interactive searches to finish.
+_IDLE_POLL = 0.05
+_DOMAIN_ORDER: tuple[SearchDomain, ...] = ('Items', 'Skills', 'Food', 'Registlets')
+_WARM_QUERIES = ('critical rate', 'Guardian', 'food maxmp', 'std 220')
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class BoundedCache(Generic[K, V]):
+    """Thread-safe least-recently-used mapping whose entries weigh at most ``size`` in total.
+
+    Each entry weighs 1 unless ``weigh`` says otherwise; the newest entry is always kept.
+    """
+
+    def __init__(self, size: int, weigh: Callable[[V], int] | None = None) -> None:
+        self.size = size
+        self.weight = 0
+        self._weigh = weigh
+        self._entries: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def values(self) -> list[V]:
+        with self._lock:
+            return [value for value, _ in self._entries.values()]
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: K, value: V) -> None:
+        weight = self._weigh(value) if self._weigh is not None else 1
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.weight -= previous[1]
+            self._entries[key] = (value, weight)
+            self.weight += weight
+            while self.weight > self.size and len(self._entries) > 1:
+                self.weight -= self._entries.popitem(last=False)[1][1]
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self.weight -= entry[1]
+            return entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+
+
+def _result_rows(ranked: RankedOutcome) -> int:
+    return 1 + ranked.rows
+
+
+@dataclass(frozen=True)
+class EngineTimings:
+    startup: float
+    warm: float | None = None
+    first_query: float | None = None
+    reload: float | None = None
+    reloads: int = 0
+    primed: int = 0
+    prime: float | None = None
+
+    def format(self) -> str:
+        parts = [f'startup {self.startup * 1000:.1f} ms']
+        if self.warm is not None:
+            parts.append(f'warm-up {self.warm * 1000:.1f} ms')
+        if self.prime is not None:
+            parts.append(f'{self.primed} searches primed in {self.prime * 1000:.1f} ms')
+        if self.first_query is not None:
+            parts.append(f'first query {self.first_query * 1000:.1f} ms')
+        if self.reload is not None:
+            parts.append(f'{self.reloads} reloads, last {self.reload * 1000:.1f} ms')
+        return ' · '.join(parts)
+
+
+class EngineState:
+    """One generation of source data: health, pooled services, and autocomplete for one fingerprint.
+
+    A retired generation closes its connections once the last lease on it is returned; a caller
+    still holding it afterwards leases services opened for that one call.
+    """
+
+    def __init__(
+        self,
+        paths: dict[str, Path],
+        *,
+        fingerprint: str,
+        snapshot: SearchSnapshot | None,
+        pool_size: int,
+    ) -> None:
+        self.paths = paths
+        self.fingerprint = fingerprint
+        self.snapshot = snapshot
+        self.health: tuple[DatabaseHealth, ...] = validate_sources(*paths.values())
+        self.health_by_domain: dict[SearchDomain, DatabaseHealth] = dict(zip(_DOMAIN_ORDER, self.health))
+        self.available_domains: frozenset[SearchDomain] = frozenset(
+            domain for domain, health in self.health_by_domain.items() if health.ok
+        )
+        self.pool_size = max(pool_size, 1)
+        self._pool: queue.LifoQueue[DomainServices] = queue.LifoQueue()
+        self._opened = 0
+        self._leased = 0
+        self._retired = False
+        self._pool_lock = threading.Lock()
+        self._autocomplete: AutocompleteIndex | None = None
+        self._autocomplete_lock = threading.Lock()
+        self.outcomes: BoundedCache[tuple[DatabaseMode, str], RankedOutcome] = BoundedCache(
+            RANKED_RESULT_ROWS, _result_rows
+        )
+        self._item_details: BoundedCache[int, ItemDetail] = BoundedCache(ITEM_DETAILS)
+        self._pages: BoundedCache[tuple[DatabaseMode, str, OutcomeDomain, int, int], tuple] = BoundedCache(
+            PAGE_ROWS, lambda rows: max(len(rows), 1)
+        )
+
+    def ranked(self, mode: DatabaseMode, query: str) -> RankedOutcome | None:
+        """Ranked keys of a recent search, shared by every session showing part of them."""
+        return self.outcomes.get((mode, ' '.join(query.split())))
+
+    def remember_ranked(self, mode: DatabaseMode, query: str, ranked: RankedOutcome) -> None:
+        self.outcomes.put((mode, ' '.join(query.split())), ranked)
+
+    def page_rows(self, domain: OutcomeDomain, keys: tuple) -> tuple:
+        """Result rows for one page of ranked keys, read from the pooled services."""
+        with self.lease() as services:
+            return services.page_rows(domain, keys, available_domains=self.available_domains)
+
+    def page(self, mode: DatabaseMode, query: str, domain: OutcomeDomain, offset: int, keys: tuple) -> tuple:
+        """Rows of the page of ``keys`` at ``offset`` in a search, built once while the page stays cached."""
+        key = (mode, ' '.join(query.split()), domain, offset, len(keys))
+        rows = self._pages.get(key)
+        if rows is None:
+            rows = self.page_rows(domain, keys)
+            self._pages.put(key, rows)
+        return rows
+
+    def pages(self, mode: DatabaseMode, query: str) -> PageRows:
+        return lambda domain, offset, keys: self.page(mode, query, domain, offset, keys)
+
+    def item_detail(self, item_id: int) -> ItemDetail:
+        detail = self._item_details.get(item_id)
+        if detail is None:
+            with self.lease() as services:
+                detail = services.items().get_item(item_id)
+            self._item_details.put(item_id, detail)
+        return detail
+
+    def _open_services(self) -> DomainServices:
+        return DomainServices(**self.paths, check_same_thread=False)
+
+    @contextmanager
+    def lease(self) -> Iterator[DomainServices]:
+        # A caller that kept a retired state gets services of its own: the pool may already be closed.
+        with self._pool_lock:
+            self._leased += 1
+            temporary = self._retired
+            opened = temporary or (self._pool.empty() and self._opened < self.pool_size)
+            self._opened += opened and not temporary
+        try:
+            services = self._open_services() if opened else self._pool.get()
+        except BaseException:
+            self._release(None)
+            raise
+        try:
+            yield services
+        finally:
+            if temporary:
+                services.close()
+            self._release(None if temporary else services)
+
+    @property
+    def busy(self) -> bool:
+        """Whether any search or lookup currently holds a lease."""
+        return self._leased > 0
+
+    def _release(self, services: DomainServices | None) -> None:
+        if services is not None:
+            self._pool.put(services)
+        with self._pool_lock:
+            self._leased -= 1
+            idle = self._retired and self._leased == 0
+        if idle:
+            self.close()
+
+    def autocomplete_index(self) -> AutocompleteIndex:
+        if not self.available_domains:
+            return AutocompleteIndex((), self.fingerprint)
+        with self._autocomplete_lock:
+            if self._autocomplete is None:
+                self._autocomplete = AutocompleteIndex(
+                    build_autocomplete_index(
+                        'Universal', **self.paths, available_domains=self.available_domains, snapshot=self.snapshot
+                    ),
+                    self.fingerprint,
+                )
+            return self._autocomplete
+
+    def warm(self) -> None:
+        index = self.autocomplete_index()
+        for mode in _DOMAIN_ORDER:
+            if mode in self.available_domains:
+                index.engine(mode)
+        with self._pool_lock:
+            missing = self.pool_size - self._opened
+            self._opened = self.pool_size
+        for _ in range(missing):
+            services = self._open_services()
+            if 'Items' in self.available_domains:
+                services.items()
+            if 'Skills' in self.available_domains:
+                services.skills()
+                if 'Registlets' in self.available_domains:
+                    services.relationship_index()
+            self._pool.put(services)
+        with self.lease() as services:
+            for domain, query in zip(_DOMAIN_ORDER, _WARM_QUERIES):
+                if domain in self.available_domains:
+                    search_database(domain, query, **self.paths, available_domains=self.available_domains, services=services)
+
+    def retire(self) -> None:
+        with self._pool_lock:
+            self._retired = True
+            idle = self._leased == 0
+        if idle:
+            self.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+
+class SearchEngine:
+    """Process-wide owner of the startup snapshot, pooled domain services, and the autocomplete index.
+
+    All of it lives in the current ``EngineState``. When a source file changes, a new state is
+    built and warmed in the background, then swapped in with a single reference assignment:
+    searches already running finish on the old state, and new searches use the new one.
+    """
+
+    def __init__(
+        self,
+        *,
+        items_path: Path = ITEM_DATABASE,
+        skills_path: Path = SKILL_DATABASE,
+        food_entries_path: Path = FOOD_ENTRIES,
+        food_aliases_path: Path = FOOD_ALIASES,
+        registlets_path: Path = REGISTLET_DATA,
+        snapshot_path: Path | None = SEARCH_SNAPSHOT,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        top_queries_path: Path | None = TOP_QUERIES,
+        warm_top: int = DEFAULT_WARM_TOP,
+        outcome_store: OutcomeStore | None = None,
+        speculation_budget: CpuBudget | None = None,
+    ) -> None:
+        started = time.perf_counter()
+        self.paths = {
+            'items_path': Path(items_path),
+            'skills_path': Path(skills_path),
+            'food_entries_path': Path(food_entries_path),
+            'food_aliases_path': Path(food_aliases_path),
+            'registlets_path': Path(registlets_path),
+        }
+        self.snapshot_path = Path(snapshot_path) if snapshot_path is not None else None
+        self.pool_size = pool_size
+        self.top_queries_path = Path(top_queries_path) if top_queries_path is not None else None
+        self.warm_top = warm_top
+        self.outcome_store = outcome_store
+        self._reload_lock = threading.Lock()
+        self._flights: SingleFlight[UniversalSearchOutcome] = SingleFlight()
+        self._state = self._build_state(self.fingerprint())
+        if outcome_store is not None:
+            outcome_store.purge(self._state.fingerprint)
+        self._warm_thread: threading.Thread | None = None
+        self._watch_thread: threading.Thread | None = None
+        self._stop_watching = threading.Event()
+        self._closing = threading.Event()
+        self._speculation_budget = speculation_budget or CpuBudget()
+        self._speculator: ThreadPoolExecutor | None = None
+        self._speculated: BoundedCache[tuple[str, DatabaseMode, str], bool] = BoundedCache(SPECULATED_KEYS)
+        self._speculation_lock = threading.Lock()
+        self.speculation = SpeculationStats()
+        self.timings = EngineTimings(startup=time.perf_counter() - started)
+
+    def fingerprint(self) -> str:
+        return data_fingerprint(**self.paths)
+
+    def _build_state(self, fingerprint: str) -> EngineState:
+        snapshot = (
+            load_current_snapshot(self.snapshot_path, **self.paths) if self.snapshot_path is not None else None
+        )
+        return EngineState(self.paths, fingerprint=fingerprint, snapshot=snapshot, pool_size=self.pool_size)
+
+    @property
+    def state(self) -> EngineState:
+        return self._state
+
+    @property
+    def snapshot(self) -> SearchSnapshot | None:
+        return self._state.snapshot
+
+    @property
+    def health_by_domain(self) -> dict[SearchDomain, DatabaseHealth]:
+        return self._state.health_by_domain
+
+    @property
+    def available_domains(self) -> frozenset[SearchDomain]:
+        return self._state.available_domains
+
+    @contextmanager
+    def lease(self) -> Iterator[DomainServices]:
+        with self._state.lease() as services:
+            yield services
+
+    @property
+    def coalesced_searches(self) -> int:
+        """Searches answered by joining an identical search already in flight."""
+        return self._flights.coalesced
+
+    def search(self, mode: DatabaseMode, query: str, *, timeout: float | None = None) -> UniversalSearchOutcome:
+        """Search the current state; concurrent identical searches share one computation.
+
+        ``timeout`` bounds how long a search waits on an identical one already running.
+        """
+        return self._search(self._state, mode, query, timeout=timeout)
+
+    def search_page(
+        self,
+        mode: DatabaseMode,
+        query: str,
+        *,
+        page_size: int = PAGE_SIZE,
+        timeout: float | None = None,
+    ) -> UniversalSearchOutcome:
+        """Search and keep only the first page per domain, with totals and cursors for ``next_page``."""
+        state = self._state
+        ranked = self._ranked_outcome(state, mode, query, timeout=timeout)
+        self._followed(state, mode, query)
+        self.speculate(mode, ranked.outcome)
+        return first_page(
+            ranked, mode=mode, fingerprint=state.fingerprint, rows=state.pages(mode, query), page_size=page_size
+        )
+
+    def next_page(self, cursor: str, *, page_size: int = PAGE_SIZE) -> ResultPage:
+        """Return the page a ``search_page`` cursor points at.
+
+        Pages come from the ranked keys the engine kept for that search, which are rebuilt when
+        they have been evicted; only the page's own rows are read. A cursor from before a reload
+        pages through the current data.
+        """
+        position = PageCursor.decode(cursor)
+        state = self._state
+        ranked = self._ranked_outcome(state, position.mode, position.query)
+        if position.fingerprint != state.fingerprint:
+            position = replace(position, fingerprint=state.fingerprint)
+        page = page_of(ranked.keys(position.domain), position, page_size)
+        if not page.results:
+            return page
+        rows = state.page(position.mode, position.query, position.domain, position.offset, page.results)
+        return replace(page, results=rows)
+
+    def search_handle(
+        self,
+        mode: DatabaseMode,
+        query: str,
+        *,
+        page_size: int = PAGE_SIZE,
+        timeout: float | None = None,
+    ) -> OutcomeHandle:
+        """Search, or reuse a cached or primed outcome, and return the small handle a session keeps."""
+        state = self._state
+        ranked = self._ranked_outcome(state, mode, query, timeout=timeout)
+        self._followed(state, mode, query)
+        self.speculate(mode, ranked.outcome)
+        return OutcomeHandle.first_page(mode, query, state.fingerprint, page_size)
+
+    def outcome(
+        self,
+        handle: OutcomeHandle,
+        *,
+        domains: tuple[OutcomeDomain, ...] | None = None,
+        page_size: int = PAGE_SIZE,
+    ) -> UniversalSearchOutcome:
+        """The results ``handle`` shows, from the shared cache or searched again after an eviction or reload.
+
+        Rows are read only for ``domains`` (every domain by default), a ``page_size`` page at a
+        time; pages already built for this search come from the state's page cache.
+        """
+        state = self._state
+        ranked = self._ranked_outcome(state, handle.mode, handle.query)
+        return window(
+            ranked,
+            handle,
+            fingerprint=state.fingerprint,
+            rows=state.pages(handle.mode, handle.query),
+            domains=domains,
+            page_size=page_size,
+        )
+
+    def _ranked_outcome(
+        self,
+        state: EngineState,
+        mode: DatabaseMode,
+        query: str,
+        *,
+        timeout: float | None = None,
+    ) -> RankedOutcome:
+        ranked = self._cached(state, mode, query)
+        if ranked is None:
+            ranked = rank(self._search(state, mode, query, timeout=timeout))
+            self._remember(state, mode, query, ranked)
+        elif ranked.outcome.query != query:
+            ranked = replace(ranked, outcome=replace(ranked.outcome, query=query))
+        return ranked
+
+    def _cached(self, state: EngineState, mode: DatabaseMode, query: str) -> RankedOutcome | None:
+        """The ranking kept in memory, else the one kept on disk, which is then kept in memory too."""
+        ranked = state.ranked(mode, query)
+        if ranked is None and self.outcome_store is not None:
+            ranked = self.outcome_store.get(state.fingerprint, mode, query)
+            if ranked is not None:
+                state.remember_ranked(mode, query, ranked)
+        return ranked
+
+    def _remember(self, state: EngineState, mode: DatabaseMode, query: str, ranked: RankedOutcome) -> None:
+        state.remember_ranked(mode, query, ranked)
+        if self.outcome_store is not None:
+            self.outcome_store.put(state.fingerprint, mode, query, ranked)
+
+    def _search(
+        self,
+        state: EngineState,
+        mode: DatabaseMode,
+        query: str,
+        *,
+        timeout: float | None = None,
+    ) -> UniversalSearchOutcome:
+        started = time.perf_counter()
+        outcome = self._shared_search(state, mode, query, timeout=timeout)
+        if self.timings.first_query is None:
+            self.timings = replace(self.timings, first_query=time.perf_counter() - started)
+        return outcome
+
+    def _shared_search(
+        self,
+        state: EngineState,
+        mode: DatabaseMode,
+        query: str,
+        *,
+        timeout: float | None = None,
+    ) -> UniversalSearchOutcome:
+        def compute() -> UniversalSearchOutcome:
+            with state.lease() as services:
+                return search_database(
+                    mode,
+                    query,
+                    **state.paths,
+                    available_domains=state.available_domains,
+                    services=services,
+                )
+
+        outcome = self._flights.do(search_key(mode, query, state.fingerprint), compute, timeout=timeout)
+        return outcome if outcome.query == query else replace(outcome, query=query)
+
+    def _count(self, **changes: float) -> None:
+        with self._speculation_lock:
+            stats = self.speculation
+            self.speculation = replace(stats, **{name: getattr(stats, name) + value for name, value in changes.items()})
+
+    def _followed(self, state: EngineState, mode: DatabaseMode, query: str) -> None:
+        if self._speculated.pop((state.fingerprint, mode, ' '.join(query.split()))) is not None:
+            self._count(hits=1)
+
+    def speculate(self, mode: DatabaseMode, outcome: UniversalSearchOutcome) -> None:
+        """Search the suggested and clarifying follow-ups of ``outcome`` in the background.
+
+        One worker runs them after interactive searches release their leases, while the CPU
+        budget lasts, so the click that follows a suggestion is answered from the outcome cache.
+        """
+        self.speculate_queries(mode, follow_up_queries(outcome))
+
+    def speculate_queries(self, mode: DatabaseMode, queries: tuple[str, ...]) -> None:
+        """Queue ``queries`` for the speculation worker, skipping those already in memory or on disk.
+
+        Only the cache keys are checked here; a stored ranking is read by the worker when it runs.
+        """
+        if self._closing.is_set():
+            return
+        state = self._state
+        queries = tuple(query for query in queries if not self._has_cached(state, mode, query))
+        if not queries:
+            return
+        with self._speculation_lock:
+            if self._speculator is None:
+                self._speculator = ThreadPoolExecutor(max_workers=1, thread_name_prefix='toram-speculate')
+            for query in queries:
+                self._speculator.submit(self._speculate_one, state, mode, query)
+
+    def _has_cached(self, state: EngineState, mode: DatabaseMode, query: str) -> bool:
+        if state.ranked(mode, query) is not None:
+            return True
+        return self.outcome_store is not None and self.outcome_store.contains(state.fingerprint, mode, query)
+
+    def _speculate_one(self, state: EngineState, mode: DatabaseMode, query: str) -> None:
+        while state.busy:
+            if self._closing.wait(_IDLE_POLL):
+                return
+        if self._closing.is_set() or state is not self._state or self._cached(state, mode, query) is not None:
+            return
+        if not self._speculation_budget.available():
+            self._count(skipped=1)
+            return
+        started = time.thread_time()
+        try:
+            outcome = self._shared_search(state, mode, query)
+        finally:
+            spent = time.thread_time() - started
+            self._speculation_budget.charge(spent)
+            self._count(run=1, cpu=spent)
+        self._remember(state, mode, query, rank(outcome))
+        self._speculated.put((state.fingerprint, mode, ' '.join(query.split())), True)
+
+    def item_card_faces(self, item_ids: tuple[int, ...]) -> dict[int, ItemCardFace]:
+        """Name, type and first image of each item, fetched in one query for a page of cards."""
+        with self._state.lease() as services:
+            return services.items().repository.get_card_faces(item_ids)
+
+    def item_detail(self, item_id: int) -> ItemDetail:
+        """Full detail of one item, cached per data version since it is only read when a dialog opens."""
+        return self._state.item_detail(item_id)
+
+    def autocomplete_index(self) -> AutocompleteIndex:
+        return self._state.autocomplete_index()
+
+    def warm(self) -> None:
+        """Open every pooled connection, run one representative search per available domain, then prime."""
+        started = time.perf_counter()
+        state = self._state
+        state.warm()
+        self.timings = replace(self.timings, warm=time.perf_counter() - started)
+        self.prime(state)
+
+    def prime(self, state: EngineState | None = None) -> int:
+        """Fill the outcome cache with the example searches and the top searches of ``top_queries_path``.
+
+        Each search waits until no other search holds a lease, so it never delays an interactive
+        one; an identical interactive search joins it instead of running twice. Priming stops when
+        ``state`` is replaced by a reload or the engine closes, and returns how many searches ran.
+        """
+        state = state or self._state
+        started = time.perf_counter()
+        primed = 0
+        for mode, query in warm_searches(self.top_queries_path, self.warm_top):
+            if mode != 'Universal' and mode not in state.available_domains:
+                continue
+            if self._cached(state, mode, query) is not None:
+                continue
+            while state.busy:
+                if self._closing.wait(_IDLE_POLL):
+                    break
+            if self._closing.is_set() or state is not self._state:
+                break
+            self._remember(state, mode, query, rank(self._shared_search(state, mode, query)))
+            primed += 1
+        self.timings = replace(self.timings, primed=primed, prime=time.perf_counter() - started)
+        return primed
+
+    def warm_in_background(self) -> threading.Thread:
+        if self._warm_thread is None:
+            self._warm_thread = threading.Thread(target=self.warm, name='toram-engine-warm', daemon=True)
+            self._warm_thread.start()
+        return self._warm_thread
+
+    def reload(self, fingerprint: str | None = None) -> bool:
+        """Build and warm a state for changed sources, then swap it in; ``False`` when nothing changed."""
+        with self._reload_lock:
+            fingerprint = fingerprint or self.fingerprint()
+            if fingerprint == self._state.fingerprint:
+                return False
+            started = time.perf_counter()
+            state = self._build_state(fingerprint)
+            state.warm()
+            previous, self._state = self._state, state
+            previous.retire()
+            if self.outcome_store is not None:
+                self.outcome_store.purge(fingerprint)
+            self.timings = replace(
+                self.timings, reload=time.perf_counter() - started, reloads=self.timings.reloads + 1
+            )
+        self.prime(state)
+        return True
+
+    def _watch(self, interval: float) -> None:
+        # A fingerprint must be seen on two polls in a row, so a file still being copied is not loaded.
+        pending: str | None = None
+        while not self._stop_watching.wait(interval):
+            try:
+                fingerprint = self.fingerprint()
+                if fingerprint == self._state.fingerprint:
+                    pending = None
+                elif fingerprint == pending:
+                    self.reload(fingerprint)
+                    pending = None
+                else:
+                    pending = fingerprint
+            except Exception:
+                pending = None
+
+    def start_watching(self, interval: float = DEFAULT_WATCH_INTERVAL) -> threading.Thread:
+        if self._watch_thread is None:
+            self._stop_watching.clear()
+            self._watch_thread = threading.Thread(
+                target=self._watch, args=(interval,), name='toram-engine-watch', daemon=True
+            )
+            self._watch_thread.start()
+        return self._watch_thread
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join()
+            self._watch_thread = None
+
+    def close(self) -> None:
+        self._closing.set()
+        self.stop_watching()
+        if self._warm_thread is not None:
+            self._warm_thread.join()
+        if self._speculator is not None:
+            self._speculator.shutdown(wait=True, cancel_futures=True)
+        self._state.close()
+        if self.outcome_store is not None:
+            self.outcome_store.close()
+
+    def __enter__(self) -> SearchEngine:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
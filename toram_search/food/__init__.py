@@ -1,6 +1,30 @@
-from .data import FoodDataError, load_food_dataset, normalize_food_text, resolve_food_stat
-from .models import FoodDataset, FoodEntry, FoodSearchOutcome, FoodStatDefinition
-from .service import FoodSearchService, is_food_intent
+from __future__ import annotations
+
+from importlib import import_module
+
+# Names resolve on first access, so importing one submodule does not load the others.
+_EXPORTS = {
+    'FoodDataError': '.data',
+    'load_food_dataset': '.data',
+    'normalize_food_text': '.data',
+    'resolve_food_stat': '.data',
+    'FoodDataset': '.models',
+    'FoodEntry': '.models',
+    'FoodSearchOutcome': '.models',
+    'FoodStatDefinition': '.models',
+    'FoodSearchService': '.service',
+    'is_food_intent': '.service',
+}
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'FoodDataError',
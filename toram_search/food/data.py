@@ -111,7 +111,11 @@ def _cached_load(
     return _load_uncached(Path(entries_name), Path(aliases_name))
 
 
-def load_food_dataset(entries_path: Path, aliases_path: Path) -> FoodDataset:
+# One seeded dataset per pair of source paths: seeding a newer version replaces the older one.
+_seeded: dict[tuple[str, str], tuple[tuple[str, int, int, str, int, int], FoodDataset]] = {}
+
+
+def _source_key(entries_path: Path, aliases_path: Path) -> tuple[str, int, int, str, int, int]:
     entries = Path(entries_path).expanduser().resolve()
     aliases = Path(aliases_path).expanduser().resolve()
     try:
@@ -119,7 +123,7 @@ def load_food_dataset(entries_path: Path, aliases_path: Path) -> FoodDataset:
         aliases_stat = aliases.stat()
     except OSError as exc:
         raise FoodDataError(f'Unable to access Food source: {exc}') from exc
-    return _cached_load(
+    return (
         str(entries),
         entries_stat.st_mtime_ns,
         entries_stat.st_size,
@@ -129,6 +133,22 @@ def load_food_dataset(entries_path: Path, aliases_path: Path) -> FoodDataset:
     )
 
 
+def seed_food_dataset(entries_path: Path, aliases_path: Path, dataset: FoodDataset) -> None:
+    """Serve a prebuilt dataset for the current versions of both source files."""
+    key = _source_key(entries_path, aliases_path)
+    _seeded[(key[0], key[3])] = (key, dataset)
+
+
+def load_food_dataset(entries_path: Path, aliases_path: Path) -> FoodDataset:
+    key = _source_key(entries_path, aliases_path)
+    seeded = _seeded.get((key[0], key[3]))
+    if seeded is not None:
+        if seeded[0] == key:
+            return seeded[1]
+        _seeded.pop((key[0], key[3]), None)
+    return _cached_load(*key)
+
+
 def resolve_food_stat(dataset: FoodDataset, value: str) -> FoodStatDefinition | None:
     normalized = normalize_food_text(value)
     for definition in dataset.stats:
@@ -40,3 +40,5 @@ class FoodSearchOutcome:
     suggested_queries: tuple[str, ...] = ()
     interpretation: QueryInterpretation | None = None
     route_quality: RouteQuality = RouteQuality()
+    total: int | None = None
+    cursor: str | None = None
@@ -3,9 +3,7 @@ from __future__ import annotations
 import re
 from pathlib import Path
 
-from rapidfuzz import fuzz
-
-from toram_search.interpretation import QueryChip, QueryInterpretation, RouteQuality
+from toram_search.interpretation import QueryChip, QueryInterpretation, RouteProbe, RouteQuality
 from .data import load_food_dataset, normalize_food_text, resolve_food_stat
 from .models import FoodSearchOutcome
 
@@ -24,7 +22,20 @@ class FoodSearchService:
         values = [(f'food {stat.display}', 'Food Stat') for stat in self.dataset.stats]
         return tuple(sorted(values, key=lambda row: row[0].casefold()))
 
+    def probe(self, query: str) -> RouteProbe[FoodSearchOutcome]:
+        """Route quality of ``query``; the data is in memory, so the outcome is built up front."""
+        outcome = self.search(query)
+        return RouteProbe(outcome.route_quality, lambda: outcome)
+
+    def route_ceiling(self, query: str) -> RouteQuality:
+        """Best route quality ``search`` could report for ``query``, without running it."""
+        if not is_food_intent(' '.join(str(query).split())):
+            return RouteQuality()
+        return RouteQuality('structured', True, 1)
+
     def _suggestions(self, value: str, *, prefix: str = 'food') -> tuple[str, ...]:
+        from rapidfuzz import fuzz
+
         query = normalize_food_text(value)
         scored: dict[str, float] = {}
         for stat in self.dataset.stats:
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
-from typing import Literal
+from typing import Callable, Generic, Literal, TypeVar
 
 ChipKind = Literal[
     'stat', 'item_type', 'numeric_stat', 'rank',
@@ -11,6 +12,11 @@ ChipKind = Literal[
 SearchDomain = Literal['Items', 'Skills', 'Food', 'Registlets']
 RouteFamily = Literal['exact', 'structured', 'content', 'weak', 'none']
 
+# Specificity used by route ceilings when the query shape does not cap it.
+UNBOUNDED_SPECIFICITY = sys.maxsize
+
+OutcomeT = TypeVar('OutcomeT')
+
 
 @dataclass(frozen=True)
 class QueryChip:
@@ -55,3 +61,11 @@ class RouteQuality:
             result_tier = 0
         family_rank = {'exact': 3, 'structured': 2, 'content': 1, 'weak': 0, 'none': 0}[self.family]
         return result_tier, family_rank, self.specificity
+
+
+@dataclass(frozen=True)
+class RouteProbe(Generic[OutcomeT]):
+    """Route quality a search produces, with its outcome built only on demand."""
+
+    route_quality: RouteQuality
+    materialize: Callable[[], OutcomeT]
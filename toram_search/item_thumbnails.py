@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from toram_search.database import ITEM_DATABASE, ITEM_THUMBNAILS, connect_readonly
+
+MANIFEST_NAME = "manifest.json"
+# Item cards show images at 72px and the item dialog at 220px.
+THUMBNAIL_SIZES = (72, 220)
+
+
+def make_thumbnail(data: bytes, size: int) -> bytes:
+    """Re-encode any image Pillow can read as a PNG that fits in a ``size`` square, never upscaled."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGBA")
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+
+def _thumbnail_name(digest: str, size: int) -> str:
+    return f"{digest}-{size}.png"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+@dataclass(frozen=True)
+class ThumbnailBuild:
+    output: Path
+    images: int
+    written: int
+    reused: int
+    missing: tuple[str, ...]
+    unreadable: tuple[str, ...]
+    seconds: float
+
+
+def build_item_thumbnails(
+    output: Path = ITEM_THUMBNAILS,
+    *,
+    items_path: Path = ITEM_DATABASE,
+    images_root: Path | None = None,
+) -> ThumbnailBuild:
+    """Turn every locally available ``item_images.local_path`` into content-addressed thumbnails.
+
+    Thumbnails are named by the SHA-256 of the source image, so identical images are stored
+    once and unchanged images are not re-encoded on the next run. ``manifest.json`` maps each
+    ``local_path`` to its digest; thumbnails no longer referenced by it are removed.
+    """
+    started = time.perf_counter()
+    items_path = Path(items_path)
+    images_root = Path(images_root) if images_root is not None else items_path.parent
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    db = connect_readonly(items_path)
+    try:
+        local_paths = [
+            str(row["local_path"])
+            for row in db.execute(
+                "SELECT DISTINCT local_path FROM item_images WHERE COALESCE(local_path,'')<>'' ORDER BY local_path"
+            )
+        ]
+    finally:
+        db.close()
+
+    manifest: dict[str, str] = {}
+    written = reused = 0
+    missing: list[str] = []
+    unreadable: list[str] = []
+    for local_path in local_paths:
+        source = images_root / local_path
+        try:
+            data = source.read_bytes()
+        except OSError:
+            missing.append(local_path)
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            for size in THUMBNAIL_SIZES:
+                target = output / _thumbnail_name(digest, size)
+                if target.is_file():
+                    reused += 1
+                    continue
+                _write_atomic(target, make_thumbnail(data, size))
+                written += 1
+        except (OSError, ValueError):
+            unreadable.append(local_path)
+            continue
+        manifest[local_path] = digest
+
+    referenced = {_thumbnail_name(digest, size) for digest in manifest.values() for size in THUMBNAIL_SIZES}
+    for path in output.glob("*.png"):
+        if path.name not in referenced:
+            path.unlink()
+    _write_atomic(
+        output / MANIFEST_NAME,
+        json.dumps({"sizes": list(THUMBNAIL_SIZES), "images": manifest}, indent=1, sort_keys=True).encode("utf-8"),
+    )
+    return ThumbnailBuild(
+        output, len(manifest), written, reused, tuple(missing), tuple(unreadable), time.perf_counter() - started
+    )
+
+
+@lru_cache(maxsize=256)
+def _data_uri(path: Path) -> str | None:
+    # Thumbnail names are content hashes, so a cached URI can never go stale.
+    try:
+        encoded = base64.b64encode(path.read_bytes()).decode("ascii")
+    except OSError:
+        return None
+    return f"data:image/png;base64,{encoded}"
+
+
+class ItemThumbnails:
+    """Serve generated thumbnails by ``item_images.local_path``; callers fall back to ``source_url``."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root).expanduser().resolve()
+        self._manifest: dict[str, str] | None = None
+        self._lock = threading.Lock()
+
+    def _images(self) -> dict[str, str]:
+        if self._manifest is None:
+            with self._lock:
+                if self._manifest is None:
+                    try:
+                        payload = json.loads((self.root / MANIFEST_NAME).read_text(encoding="utf-8"))
+                        self._manifest = {str(key): str(value) for key, value in payload["images"].items()}
+                    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                        self._manifest = {}
+        return self._manifest
+
+    def data_uri(self, local_path: str | None, size: int) -> str | None:
+        if not local_path or size not in THUMBNAIL_SIZES:
+            return None
+        digest = self._images().get(local_path)
+        return None if digest is None else _data_uri(self.root / _thumbnail_name(digest, size))
+
+
+DEFAULT_ITEM_THUMBNAILS = ItemThumbnails(ITEM_THUMBNAILS)
+
+
+__all__ = [
+    "DEFAULT_ITEM_THUMBNAILS",
+    "ItemThumbnails",
+    "THUMBNAIL_SIZES",
+    "ThumbnailBuild",
+    "build_item_thumbnails",
+    "make_thumbnail",
+]
@@ -10,6 +10,14 @@ class ItemSummary:
     name: str
     item_type: str
 
+@dataclass(frozen=True)
+class ItemCardFace:
+    id: int
+    name: str
+    item_type: str
+    image_url: str | None = None
+    image_path: str | None = None
+
 @dataclass(frozen=True)
 class ItemDetail:
     summary: ItemSummary
@@ -51,6 +59,8 @@ class ItemSearchOutcome:
     routing_confidence: RoutingConfidence = "none"
     interpretation: QueryInterpretation | None = None
     route_quality: RouteQuality = RouteQuality()
+    total: int | None = None
+    cursor: str | None = None
 
 @dataclass(frozen=True)
 class ParsedClause:
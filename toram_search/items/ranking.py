@@ -1,7 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Iterable
-from rapidfuzz import fuzz
 from .aliases import normalize_name
 from .models import ItemSummary
 
@@ -15,6 +14,7 @@ class RankedItem:
 def rank_items(query: str, items: Iterable[ItemSummary]) -> list[RankedItem]:
     q=normalize_name(query)
     if len(q)<2:return []
+    from rapidfuzz import fuzz
     rows=[]
     for item in items:
         n=normalize_name(item.name)
@@ -1,13 +1,11 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any
-
-from rapidfuzz import fuzz
+from typing import Any, Iterator
 
 from toram_search.database import connect_readonly
 from .aliases import is_crysta_item_type, normalize_name, normalize_stat_text
-from .models import ItemDetail, ItemSummary, ItemStatMatch
+from .models import ItemCardFace, ItemDetail, ItemSummary, ItemStatMatch
 from .stat_query import compare_amount
 
 _VISIBLE_ITEM_SQL = "LOWER(TRIM(COALESCE({column}, ''))) NOT IN ('regislet', 'registlet')"
@@ -18,9 +16,9 @@ def _visible_item_sql(column: str) -> str:
 
 
 class ItemRepository:
-    def __init__(self, database_path: Path) -> None:
+    def __init__(self, database_path: Path, *, check_same_thread: bool = True) -> None:
         self.database_path = Path(database_path).expanduser().resolve()
-        self.db = connect_readonly(self.database_path)
+        self.db = connect_readonly(self.database_path, check_same_thread=check_same_thread)
 
     def close(self):
         self.db.close()
@@ -98,6 +96,8 @@ class ItemRepository:
         out = []
         if len(q) < 2:
             return []
+        from rapidfuzz import fuzz
+
         for item in self.list_items():
             n = normalize_name(item.name)
             score = max(float(fuzz.WRatio(q, n)), float(fuzz.token_set_ratio(q, n)))
@@ -172,6 +172,34 @@ class ItemRepository:
                 rows.append(ItemSummary(int(r['id']), str(r['name']), str(r['item_type'])))
         return tuple(sorted(rows, key=lambda x: (x.name.casefold(), x.id)))
 
+    def get_summaries(self, item_ids: tuple[int, ...]) -> dict[int, ItemSummary]:
+        if not item_ids:
+            return {}
+        sql = (
+            'SELECT id,name,item_type FROM items '
+            f'WHERE id IN ({",".join("?" * len(item_ids))}) AND {_visible_item_sql("item_type")}'
+        )
+        return {
+            int(r['id']): ItemSummary(int(r['id']), str(r['name']), str(r['item_type']))
+            for r in self.db.execute(sql, tuple(item_ids))
+        }
+
+    def get_card_faces(self, item_ids: tuple[int, ...]) -> dict[int, ItemCardFace]:
+        if not item_ids:
+            return {}
+        sql = (
+            'SELECT i.id,i.name,i.item_type,g.source_url,g.local_path FROM items i '
+            'LEFT JOIN item_images g ON g.id=(SELECT h.id FROM item_images h WHERE h.item_id=i.id '
+            "AND (COALESCE(h.source_url,'')<>'' OR COALESCE(h.local_path,'')<>'') ORDER BY h.position,h.id LIMIT 1) "
+            f'WHERE i.id IN ({",".join("?" * len(item_ids))}) AND {_visible_item_sql("i.item_type")}'
+        )
+        return {
+            int(r['id']): ItemCardFace(
+                int(r['id']), str(r['name']), str(r['item_type']), r['source_url'] or None, r['local_path'] or None
+            )
+            for r in self.db.execute(sql, tuple(item_ids))
+        }
+
     def get_item(self, item_id: int) -> ItemDetail:
         sql = (
             'SELECT id,name,item_type,sell_price,process_material,process_amount,badge,note,page_url '
@@ -245,12 +273,33 @@ class ItemRepository:
             for r in self.db.execute(sql, tuple(params))
         ]
 
-    def search_expression(self, expression) -> list[tuple[ItemSummary, tuple[ItemStatMatch, ...], float | None]]:
+    def has_stat_match(
+        self,
+        stat_name: str,
+        item_types: tuple[str, ...] | None = None,
+        *,
+        max_amount: float | None = None,
+    ) -> bool:
+        params: list[Any] = [stat_name]
+        sql = (
+            'SELECT 1 FROM item_stats s JOIN items i ON i.id=s.item_id '
+            'WHERE s.stat_name=? AND s.amount IS NOT NULL '
+            f'AND {_visible_item_sql("i.item_type")}'
+        )
+        if item_types:
+            ph = ','.join('?' * len(item_types))
+            sql += f' AND i.item_type IN ({ph})'
+            params.extend(item_types)
+        if max_amount is not None:
+            sql += ' AND s.amount<=?'
+            params.append(max_amount)
+        return self.db.execute(sql + ' LIMIT 1', tuple(params)).fetchone() is not None
+
+    def _expression_rows(self, expression) -> Iterator[tuple[ItemSummary, tuple[ItemStatMatch, ...], float | None]]:
         item_types = expression.item_filter.item_types if expression.item_filter is not None else None
         candidates = self.list_items()
         if item_types:
             candidates = [x for x in candidates if x.item_type in item_types]
-        results = []
         for item in candidates:
             stat_rows = {}
             for r in self.db.execute(
@@ -279,12 +328,16 @@ class ItemRepository:
                 if ok:
                     group_matches.extend(matched)
             if group_matches:
-                results.append(
-                    (
-                        item,
-                        tuple(group_matches),
-                        group_matches[0].amount if group_matches else None,
-                    )
+                yield (
+                    item,
+                    tuple(group_matches),
+                    group_matches[0].amount if group_matches else None,
                 )
+
+    def has_expression_match(self, expression) -> bool:
+        return next(self._expression_rows(expression), None) is not None
+
+    def search_expression(self, expression) -> list[tuple[ItemSummary, tuple[ItemStatMatch, ...], float | None]]:
+        results = list(self._expression_rows(expression))
         results.sort(key=lambda x: (-(x[2] or 0), x[0].name.casefold(), x[0].id))
         return results
@@ -1,10 +1,9 @@
 from __future__ import annotations
 import re
 from pathlib import Path
-from rapidfuzz import fuzz
 
-from toram_search.interpretation import RouteQuality
-from .aliases import STAT_ALIASES, normalize_stat_text
+from toram_search.interpretation import UNBOUNDED_SPECIFICITY, RouteProbe, RouteQuality
+from .aliases import STAT_ALIASES, normalize_name, normalize_stat_text
 from .filters import extract_item_filter
 from .interpretation import build_expression_item_interpretation, build_simple_item_interpretation
 from .models import ItemCardResult, ItemSearchOutcome
@@ -13,9 +12,48 @@ from .stat_query import StatQuerySyntaxError, parse_stat_expression
 
 _HELP = "Search by item name, stat, item type, numeric comparisons, AND/OR, or upgrade relationships. Examples: cr xtal; hp >= 5000 armor; hp > 5000 and cr bow."
 _SUBJECTIVE = re.compile(r"\b(?:best|strongest)\b.*\b(?:tank|dps|build|mage)\b|\b(?:tank|dps)\b.*\b(?:xtal|crysta|item|build)\b",re.I)
+_HELP_QUERIES = frozenset({'help','how to search','search help','how do i search','how to use'})
+_STAT_LIST_QUERIES = frozenset({'list stats','what stats are in the database','what stats can i search'})
+_TYPE_LIST_QUERIES = frozenset({'list item types','what item types are in the database'})
+_COUNT_QUERIES = frozenset({'how many items are there','how many items are in the database','total item count'})
+_EXPRESSION = re.compile(r"(>=|<=|==|>|<|=)|\b(and|or)\b", re.I)
+_RANK = re.compile(r'^(highest|best|lowest|least)\s+(.+)$', re.I)
+
+
+def _stat_subject(raw:str,item_types:set[str]):
+    """Split an item query into its type filter, remaining stat text and rank direction."""
+    item_filter, remaining = extract_item_filter(raw,item_types)
+    remaining_norm=normalize_stat_text(remaining)
+    rank_direction: str | None = None
+    rank_match = _RANK.match(remaining_norm)
+    if rank_match:
+        rank_direction = 'asc' if rank_match.group(1).casefold() in {'lowest', 'least'} else 'desc'
+        remaining_norm = rank_match.group(2).strip()
+    return item_filter, remaining_norm, rank_direction
+
+
+def _resolve_stat(text:str,stat_names:list[str])->tuple[str|None,tuple[str,...]]:
+    from rapidfuzz import fuzz
+    q=normalize_stat_text(text)
+    expanded=STAT_ALIASES.get(q,q)
+    by_norm={normalize_stat_text(x):x for x in stat_names}
+    exact=by_norm.get(normalize_stat_text(expanded))
+    if exact:return exact,()
+    if q in {'crit','crt'}:
+        choices=tuple(x for x in ('Critical Rate','Critical Damage') if normalize_stat_text(x) in by_norm)
+        return None,choices
+    best=None; score=0
+    for name in stat_names:
+        s=float(fuzz.ratio(expanded,normalize_stat_text(name)))
+        if s>score: best,score=name,s
+    return (best,()) if best and score>=88 else (None,())
 
 class ItemSearchService:
-    def __init__(self,database_path:Path): self.repository=ItemRepository(database_path)
+    def __init__(self,database_path:Path,*,check_same_thread:bool=True):
+        self.repository=ItemRepository(database_path,check_same_thread=check_same_thread)
+        self._names:frozenset[str]|None=None
+        self._types:set[str]|None=None
+        self._stats:list[str]|None=None
     def close(self): self.repository.close()
     def get_item(self,item_id:int): return self.repository.get_item(item_id)
     def list_autocomplete_values(self):
@@ -24,19 +62,32 @@ class ItemSearchService:
         rows += [(x,'Item Type') for x in sorted(self.repository.list_item_types())]
         return tuple(rows)
     def _resolve_stat(self,text:str)->tuple[str|None,tuple[str,...]]:
-        q=normalize_stat_text(text)
-        expanded=STAT_ALIASES.get(q,q)
-        by_norm={normalize_stat_text(x):x for x in self.repository.list_stat_names()}
-        exact=by_norm.get(normalize_stat_text(expanded))
-        if exact:return exact,()
-        if q in {'crit','crt'}:
-            choices=tuple(x for x in ('Critical Rate','Critical Damage') if normalize_stat_text(x) in by_norm)
-            return None,choices
-        best=None; score=0
-        for name in self.repository.list_stat_names():
-            s=float(fuzz.ratio(expanded,normalize_stat_text(name)))
-            if s>score: best,score=name,s
-        return (best,()) if best and score>=88 else (None,())
+        return _resolve_stat(text,self.repository.list_stat_names())
+    def route_ceiling(self,query:str)->RouteQuality:
+        """Best route quality ``search`` could report for ``query``, without running it."""
+        raw=' '.join(str(query).split())
+        if not raw:return RouteQuality()
+        q=raw.casefold().strip(' ?!.')
+        if q in _HELP_QUERIES|_STAT_LIST_QUERIES|_TYPE_LIST_QUERIES|_COUNT_QUERIES or _SUBJECTIVE.search(raw):
+            return RouteQuality('structured',False,0)
+        if q.startswith('upgrade ') or normalize_name(raw) in self._item_names():
+            return RouteQuality('exact',True,1)
+        if _EXPRESSION.search(raw):
+            return RouteQuality('structured',True,UNBOUNDED_SPECIFICITY)
+        item_filter, remaining_norm, rank_direction = _stat_subject(raw,self._item_types())
+        stat, _choices=_resolve_stat(remaining_norm,self._stat_names())
+        if stat:
+            return RouteQuality('structured',True,1 + int(item_filter is not None) + int(rank_direction is not None))
+        return RouteQuality('structured',False,UNBOUNDED_SPECIFICITY)
+    def _item_names(self)->frozenset[str]:
+        if self._names is None:self._names=frozenset(normalize_name(x.name) for x in self.repository.list_items())
+        return self._names
+    def _item_types(self)->set[str]:
+        if self._types is None:self._types=self.repository.list_item_types()
+        return self._types
+    def _stat_names(self)->list[str]:
+        if self._stats is None:self._stats=self.repository.list_stat_names()
+        return self._stats
     @staticmethod
     def _group_stat_rows(rows):
         grouped={}
@@ -48,6 +99,9 @@ class ItemSearchService:
             grouped[item.id][1].append(match)
         return tuple(ItemCardResult(grouped[item_id][0],tuple(grouped[item_id][1])) for item_id in order)
     def search(self,query:str)->ItemSearchOutcome:
+        return self.probe(query).materialize()
+    def probe(self,query:str)->RouteProbe[ItemSearchOutcome]:
+        """Route quality of ``query``; result cards are built only when materialized."""
         raw=' '.join(str(query).split())
 
         def finish(
@@ -59,29 +113,34 @@ class ItemSearchService:
             family='none',
             specificity=0,
             interpretation=None,
+            *,
+            found=None,
         ):
-            return ItemSearchOutcome(
-                kind,
-                raw,
-                results,
-                message,
-                suggested_queries,
-                routing_confidence,
-                interpretation,
-                RouteQuality(family, bool(results), specificity),
-            )
+            def materialize():
+                cards=results() if callable(results) else results
+                return ItemSearchOutcome(
+                    kind,
+                    raw,
+                    cards,
+                    message,
+                    suggested_queries,
+                    routing_confidence,
+                    interpretation,
+                    RouteQuality(family, bool(cards), specificity),
+                )
+            return RouteProbe(RouteQuality(family, bool(results) if found is None else found, specificity), materialize)
 
         if not raw:return finish('not_found',message='Enter an item name or stat query.')
         q=raw.casefold().strip(' ?!.')
-        if q in {'help','how to search','search help','how do i search','how to use'}:
+        if q in _HELP_QUERIES:
             return finish('help',message=_HELP,routing_confidence='strong',family='structured')
         if _SUBJECTIVE.search(raw):
             return finish('refuse',message='This search only compares objective database fields; subjective build/tank/DPS recommendations are not supported.',routing_confidence='strong',family='structured')
-        if q in {'list stats','what stats are in the database','what stats can i search'}:
+        if q in _STAT_LIST_QUERIES:
             stats=self.repository.list_stat_names(); return finish('meta',message='Stats in the database: '+', '.join(stats),routing_confidence='strong',family='structured')
-        if q in {'list item types','what item types are in the database'}:
+        if q in _TYPE_LIST_QUERIES:
             return finish('meta',message='Item types: '+', '.join(sorted(self.repository.list_item_types())),routing_confidence='strong',family='structured')
-        if q in {'how many items are there','how many items are in the database','total item count'}:
+        if q in _COUNT_QUERIES:
             return finish('meta',message=f'{self.repository.count_items_total()} items are in the database.',routing_confidence='strong',family='structured')
         if q.startswith('upgrade '):
             target=raw[8:].strip(); exact=self.repository.exact_upgrade_name_matches(target)
@@ -93,27 +152,21 @@ class ItemSearchService:
         exact=self.repository.exact_name_matches(raw)
         if exact:return finish('results',tuple(ItemCardResult(x,score=100,match_kind='exact') for x in exact),routing_confidence='strong',family='exact',specificity=1)
 
-        item_filter, remaining = extract_item_filter(raw,self.repository.list_item_types())
-        remaining_norm=normalize_stat_text(remaining)
+        item_filter, remaining_norm, rank_direction = _stat_subject(raw,self.repository.list_item_types())
         negative_stat = bool(re.search(r'(^|\s)-\s*[A-Za-z_]', raw))
-        rank_direction: str | None = None
-        rank_match = re.match(r'^(highest|best|lowest|least)\s+(.+)$', remaining_norm, flags=re.I)
-        if rank_match:
-            rank_direction = 'asc' if rank_match.group(1).casefold() in {'lowest', 'least'} else 'desc'
-            remaining_norm = rank_match.group(2).strip()
         stat_hits=[]
         tokens=remaining_norm.split()
         search_terms = tuple(STAT_ALIASES) + ('crit', 'crt')
         for alias in sorted(search_terms, key=lambda x: len(x.split()), reverse=True):
             if all(t in tokens for t in alias.split()):
                 stat_hits.append(alias)
-        if len(stat_hits)>=2 and not re.search(r"(>=|<=|==|>|<|=)|\b(and|or)\b",remaining_norm):
+        if len(stat_hits)>=2 and not _EXPRESSION.search(remaining_norm):
             filter_text=item_filter.consumed_text if item_filter else ''
             suggested=' and '.join(dict.fromkeys(stat_hits)) + (f' {filter_text}' if filter_text else '')
             specificity=max(1,len(tuple(dict.fromkeys(stat_hits))) + int(item_filter is not None))
             return finish('suggest',message=f'I could not safely parse "{raw}".',suggested_queries=(suggested.strip(),),routing_confidence='strong',family='structured',specificity=specificity)
 
-        looks_expression=bool(re.search(r"(>=|<=|==|>|<|=)|\b(and|or)\b",raw, re.I))
+        looks_expression=bool(_EXPRESSION.search(raw))
         stat, choices=self._resolve_stat(remaining_norm)
         recognized_structured_intent=bool(item_filter is not None or rank_direction is not None or looks_expression or stat is not None or choices or stat_hits)
         if choices:
@@ -126,23 +179,27 @@ class ItemSearchService:
                 specificity=1 + int(item_filter is not None),
             )
         if stat and not looks_expression:
-            rows=self.repository.search_stat(stat,item_filter.item_types if item_filter else None)
-            if negative_stat:
-                rows=[row for row in rows if row[1].amount <= -1]
-                rows.sort(key=lambda row: (row[1].amount, row[0].name.casefold(), row[0].id))
-            elif rank_direction == 'asc':
-                rows.sort(key=lambda row: (row[1].amount, row[0].name.casefold(), row[0].id))
-            cards=self._group_stat_rows(rows)
+            item_types=item_filter.item_types if item_filter else None
+            found=self.repository.has_stat_match(stat,item_types,max_amount=-1 if negative_stat else None)
+            def stat_cards():
+                rows=self.repository.search_stat(stat,item_types)
+                if negative_stat:
+                    rows=[row for row in rows if row[1].amount <= -1]
+                    rows.sort(key=lambda row: (row[1].amount, row[0].name.casefold(), row[0].id))
+                elif rank_direction == 'asc':
+                    rows.sort(key=lambda row: (row[1].amount, row[0].name.casefold(), row[0].id))
+                return self._group_stat_rows(rows)
             interpretation=build_simple_item_interpretation(stat,item_filter,rank_direction,negative_stat)
             specificity=1 + int(item_filter is not None) + int(rank_direction is not None)
             return finish(
-                'results' if cards else 'not_found',
-                cards,
-                None if cards else 'No matching items found.',
+                'results' if found else 'not_found',
+                stat_cards,
+                None if found else 'No matching items found.',
                 routing_confidence='strong',
                 family='structured',
                 specificity=specificity,
                 interpretation=interpretation,
+                found=found,
             )
         if looks_expression:
             try: expr=parse_stat_expression(raw,self.repository.list_item_types(),self.repository.list_stat_names())
@@ -152,18 +209,18 @@ class ItemSearchService:
             unknown=[c.typed_stat for g in expr.groups for c in g.clauses if normalize_stat_text(c.typed_stat) not in known]
             if unknown:
                 return finish('suggest',message='Unknown stat: '+unknown[0],routing_confidence='strong',family='structured',specificity=max(1,sum(len(g.clauses) for g in expr.groups) + int(expr.item_filter is not None)))
-            rows=self.repository.search_expression(expr)
-            cards=tuple(ItemCardResult(i,m) for i,m,_score in rows)
+            found=self.repository.has_expression_match(expr)
             clause_count=sum(len(group.clauses) for group in expr.groups)
             specificity=clause_count + int(expr.item_filter is not None)
             return finish(
-                'results' if cards else 'not_found',
-                cards,
-                None if cards else 'No matching items found.',
+                'results' if found else 'not_found',
+                lambda: tuple(ItemCardResult(i,m) for i,m,_score in self.repository.search_expression(expr)),
+                None if found else 'No matching items found.',
                 routing_confidence='strong',
                 family='structured',
                 specificity=specificity,
                 interpretation=build_expression_item_interpretation(expr),
+                found=found,
             )
         if recognized_structured_intent:
             specificity=max(1,int(item_filter is not None) + int(rank_direction is not None) + int(stat is not None) + len(stat_hits))
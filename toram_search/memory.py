@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import gc
+import sys
+import threading
+import tracemalloc
+import types
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+T = TypeVar('T')
+MemorySource = Callable[[], tuple[int, object]]
+
+_OPAQUE_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    types.CodeType,
+    types.FrameType,
+)
+_MAX_SESSION_SAMPLES = 512
+
+
+@dataclass(frozen=True)
+class MemoryFootprint:
+    name: str
+    entries: int
+    bytes: int
+
+
+@dataclass(frozen=True)
+class SessionSample:
+    session_id: str
+    query: str
+    outcome_bytes: int
+    traced_bytes: int | None = None
+
+
+@dataclass(frozen=True)
+class MemoryReport:
+    caches: tuple[MemoryFootprint, ...]
+    sessions: tuple[SessionSample, ...]
+    traced_current: int | None = None
+    traced_peak: int | None = None
+
+    @property
+    def cache_bytes(self) -> int:
+        return sum(row.bytes for row in self.caches)
+
+    @property
+    def session_bytes(self) -> int:
+        return sum(row.outcome_bytes for row in self.sessions)
+
+
+def deep_sizeof(value: object) -> int:
+    """Approximate retained size of ``value`` by walking its GC referents once."""
+    seen: set[int] = set()
+    pending = [value]
+    total = 0
+    while pending:
+        current = pending.pop()
+        if isinstance(current, _OPAQUE_TYPES) or id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        pending.extend(gc.get_referents(current))
+    return total
+
+
+_sources: dict[str, MemorySource] = {}
+_sources_lock = threading.Lock()
+_sessions: OrderedDict[str, SessionSample] = OrderedDict()
+_sessions_lock = threading.Lock()
+_tracing_session: str | None = None
+
+
+def register_memory_source(name: str, source: MemorySource) -> None:
+    with _sources_lock:
+        _sources[name] = source
+
+
+def unregister_memory_source(name: str) -> None:
+    with _sources_lock:
+        _sources.pop(name, None)
+
+
+def lru_cache_source(function) -> MemorySource:
+    return lambda: (function.cache_info().currsize, function)
+
+
+def _food_source() -> tuple[int, object]:
+    from toram_search.food.data import _cached_load, _seeded
+
+    entries, cache = lru_cache_source(_cached_load)()
+    return entries + len(_seeded), (cache, _seeded)
+
+
+def _registlet_source() -> tuple[int, object]:
+    from toram_search.registlets.data import _cached_load, _seeded
+
+    entries, cache = lru_cache_source(_cached_load)()
+    return entries + len(_seeded), (cache, _seeded)
+
+
+def _skill_icon_source() -> tuple[int, object]:
+    from toram_search.skill_icons import DEFAULT_SKILL_ICON_CATALOG
+
+    index = DEFAULT_SKILL_ICON_CATALOG._global_index or {}
+    return sum(len(paths) for paths in index.values()), DEFAULT_SKILL_ICON_CATALOG
+
+
+register_memory_source('food.datasets', _food_source)
+register_memory_source('registlets.datasets', _registlet_source)
+register_memory_source('skill_icons.catalog', _skill_icon_source)
+
+
+def measure_sources() -> tuple[MemoryFootprint, ...]:
+    with _sources_lock:
+        sources = sorted(_sources.items())
+    rows = []
+    for name, source in sources:
+        entries, payload = source()
+        rows.append(MemoryFootprint(name, entries, deep_sizeof(payload)))
+    return tuple(rows)
+
+
+def start_tracing(session_id: str) -> None:
+    """Start tracemalloc for ``session_id``: only that session's searches are then sampled."""
+    global _tracing_session
+    with _sessions_lock:
+        _tracing_session = session_id
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def stop_tracing() -> None:
+    global _tracing_session
+    with _sessions_lock:
+        _tracing_session = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def tracing_session() -> str | None:
+    """The session that started tracing, or ``None`` when tracing is off or was started directly."""
+    return _tracing_session
+
+
+def sample_allocation(function: Callable[[], T], session_id: str | None = None) -> tuple[T, int | None]:
+    """Run ``function`` and report the bytes it left allocated when tracemalloc is tracing.
+
+    Tracing started with ``start_tracing`` samples only the searches of the session that
+    started it; two snapshots per search are too costly to take for every other visitor.
+    """
+    owner = _tracing_session
+    if not tracemalloc.is_tracing() or (owner is not None and owner != session_id):
+        return function(), None
+    before = tracemalloc.take_snapshot()
+    result = function()
+    after = tracemalloc.take_snapshot()
+    retained = sum(row.size_diff for row in after.compare_to(before, 'filename'))
+    return result, max(retained, 0)
+
+
+def record_session_outcome(
+    session_id: str,
+    query: str,
+    outcome: object,
+    *,
+    traced_bytes: int | None = None,
+) -> SessionSample:
+    sample = SessionSample(session_id, query, deep_sizeof(outcome), traced_bytes)
+    with _sessions_lock:
+        _sessions[session_id] = sample
+        _sessions.move_to_end(session_id)
+        while len(_sessions) > _MAX_SESSION_SAMPLES:
+            _sessions.popitem(last=False)
+    return sample
+
+
+def forget_session(session_id: str) -> None:
+    with _sessions_lock:
+        _sessions.pop(session_id, None)
+
+
+def memory_report() -> MemoryReport:
+    with _sessions_lock:
+        sessions = tuple(_sessions.values())
+    traced_current = traced_peak = None
+    if tracemalloc.is_tracing():
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+    return MemoryReport(measure_sources(), sessions, traced_current, traced_peak)
+
+
+def format_bytes(value: int | None) -> str:
+    if value is None:
+        return '—'
+    size = float(value)
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GiB'
+
+
+def format_report(report: MemoryReport) -> str:
+    lines = ['Caches and indexes']
+    width = max((len(row.name) for row in report.caches), default=0)
+    for row in report.caches:
+        lines.append(f'  {row.name:<{width}}  {row.entries:>7} entries  {format_bytes(row.bytes):>10}')
+    lines.append(f'  total: {format_bytes(report.cache_bytes)}')
+    lines.append(f'Session outcomes ({len(report.sessions)})')
+    for row in report.sessions:
+        traced = f' traced {format_bytes(row.traced_bytes)}' if row.traced_bytes is not None else ''
+        lines.append(f'  {row.session_id[:8]}  {format_bytes(row.outcome_bytes):>10}{traced}  {row.query!r}')
+    lines.append(f'  total: {format_bytes(report.session_bytes)}')
+    if report.traced_current is not None:
+        lines.append(
+            f'tracemalloc: current {format_bytes(report.traced_current)}, '
+            f'peak {format_bytes(report.traced_peak)}'
+        )
+    return '\n'.join(lines)
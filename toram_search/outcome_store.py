@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from toram_search.models import DatabaseMode
+from toram_search.paging import RankedOutcome
+
+OUTCOME_STORE_ENV = 'TORAM_SEARCH_OUTCOME_CACHE'
+DEFAULT_OUTCOME_STORE_BYTES = 64 * 1024 * 1024
+# Bumped whenever outcome dataclasses change shape, so pickles from an older release are dropped.
+FORMAT_VERSION = 2
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS outcomes (
+    fingerprint TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    query TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (fingerprint, mode, query)
+);
+CREATE INDEX IF NOT EXISTS outcomes_used ON outcomes (used);
+'''
+
+
+class OutcomeStore:
+    """SQLite file of compressed, pickled search rankings that outlives the process.
+
+    Entries are keyed by data fingerprint, mode and whitespace-normalized query, and the least
+    recently used ones are evicted once the payloads exceed ``max_bytes``. The file is a cache
+    written only by this process's engine: a failed read or write counts as a miss.
+    """
+
+    def __init__(self, path: Path, *, max_bytes: int = DEFAULT_OUTCOME_STORE_BYTES) -> None:
+        self.path = Path(path).expanduser()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.executescript(_SCHEMA)
+        stored = self._connection.execute("SELECT value FROM meta WHERE key = 'format'").fetchone()
+        if stored is None or stored[0] != str(FORMAT_VERSION):
+            self._connection.execute('DELETE FROM outcomes')
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('format', ?)", (str(FORMAT_VERSION),)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM outcomes').fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Total compressed bytes held."""
+        with self._lock:
+            return self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM outcomes').fetchone()[0]
+
+    def contains(self, fingerprint: str, mode: DatabaseMode, query: str) -> bool:
+        """Whether an entry is stored, without reading its payload or marking it used."""
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    'SELECT 1 FROM outcomes WHERE fingerprint = ? AND mode = ? AND query = ?',
+                    (fingerprint, mode, ' '.join(query.split())),
+                ).fetchone()
+        except sqlite3.Error:
+            return False
+        return row is not None
+
+    def get(self, fingerprint: str, mode: DatabaseMode, query: str) -> RankedOutcome | None:
+        key = (fingerprint, mode, ' '.join(query.split()))
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    'SELECT payload FROM outcomes WHERE fingerprint = ? AND mode = ? AND query = ?', key
+                ).fetchone()
+                if row is None:
+                    return None
+                self._connection.execute(
+                    'UPDATE outcomes SET used = ? WHERE fingerprint = ? AND mode = ? AND query = ?', (time.time(), *key)
+                )
+        except sqlite3.Error:
+            return None
+        try:
+            outcome = pickle.loads(zlib.decompress(row[0]))
+        except Exception:
+            outcome = None
+        if not isinstance(outcome, RankedOutcome):
+            self._delete(key)
+            return None
+        return outcome
+
+    def put(self, fingerprint: str, mode: DatabaseMode, query: str, outcome: RankedOutcome) -> None:
+        payload = zlib.compress(pickle.dumps(outcome, protocol=pickle.HIGHEST_PROTOCOL), 6)
+        try:
+            with self._lock:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO outcomes (fingerprint, mode, query, payload, size, used) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (fingerprint, mode, ' '.join(query.split()), payload, len(payload), time.time()),
+                )
+                self._evict()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self) -> None:
+        total = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM outcomes').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._connection.execute('SELECT rowid, size FROM outcomes ORDER BY used').fetchall()
+        doomed = []
+        # The newest entry is always kept, even when it alone is over budget.
+        for rowid, size in rows[:-1]:
+            if total <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            total -= size
+        self._connection.executemany('DELETE FROM outcomes WHERE rowid = ?', doomed)
+
+    def _delete(self, key: tuple[str, str, str]) -> None:
+        try:
+            with self._lock:
+                self._connection.execute('DELETE FROM outcomes WHERE fingerprint = ? AND mode = ? AND query = ?', key)
+        except sqlite3.Error:
+            pass
+
+    def purge(self, fingerprint: str) -> int:
+        """Drop every entry computed from data other than ``fingerprint``; returns how many."""
+        try:
+            with self._lock:
+                return self._connection.execute('DELETE FROM outcomes WHERE fingerprint <> ?', (fingerprint,)).rowcount
+        except sqlite3.Error:
+            return 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def configured_outcome_store() -> OutcomeStore | None:
+    """The store at ``TORAM_SEARCH_OUTCOME_CACHE``, or ``None`` when the variable is unset."""
+    value = os.environ.get(OUTCOME_STORE_ENV, '').strip()
+    return OutcomeStore(Path(value)) if value else None
+
+
+__all__ = [
+    'DEFAULT_OUTCOME_STORE_BYTES',
+    'OUTCOME_STORE_ENV',
+    'OutcomeStore',
+    'configured_outcome_store',
+]
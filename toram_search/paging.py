@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Literal, get_args
+
+from toram_search.models import DatabaseMode, UniversalSearchOutcome
+
+PAGE_SIZE = 20
+
+OutcomeDomain = Literal['items', 'skills', 'food', 'registlets']
+_DOMAINS: tuple[OutcomeDomain, ...] = get_args(OutcomeDomain)
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    """Where the next page of one domain's results starts, for one search on one data version."""
+
+    mode: DatabaseMode
+    query: str
+    fingerprint: str
+    domain: OutcomeDomain
+    offset: int
+
+    def encode(self) -> str:
+        raw = json.dumps(
+            [self.mode, self.query, self.fingerprint, self.domain, self.offset],
+            ensure_ascii=False,
+            separators=(',', ':'),
+        )
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @classmethod
+    def decode(cls, token: str) -> PageCursor:
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            mode, query, fingerprint, domain, offset = json.loads(raw)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise ValueError('invalid page cursor') from None
+        if domain not in _DOMAINS or not isinstance(offset, int) or offset < 0:
+            raise ValueError('invalid page cursor')
+        return cls(mode, str(query), str(fingerprint), domain, offset)
+
+
+@dataclass(frozen=True)
+class ResultPage:
+    """One page of a domain's ranked results, the total match count, and the cursor after it."""
+
+    results: tuple[Any, ...]
+    total: int
+    cursor: str | None = None
+
+
+def page_of(results: tuple[Any, ...], position: PageCursor, page_size: int = PAGE_SIZE) -> ResultPage:
+    end = position.offset + page_size
+    cursor = replace(position, offset=end).encode() if end < len(results) else None
+    return ResultPage(tuple(results[position.offset:end]), len(results), cursor)
+
+
+@dataclass(frozen=True)
+class OutcomeHandle:
+    """What a session keeps of a search: the query, its data version, and how much of each domain it shows.
+
+    The outcome itself lives in the engine's shared cache and is rebuilt from the handle on a miss.
+    """
+
+    mode: DatabaseMode
+    query: str
+    fingerprint: str
+    shown: tuple[int, ...] = (PAGE_SIZE,) * len(_DOMAINS)
+
+    @classmethod
+    def first_page(cls, mode: DatabaseMode, query: str, fingerprint: str, page_size: int = PAGE_SIZE) -> OutcomeHandle:
+        return cls(mode, query, fingerprint, (page_size,) * len(_DOMAINS))
+
+    def show_more(self, domain: OutcomeDomain, page_size: int = PAGE_SIZE) -> OutcomeHandle:
+        shown = list(self.shown)
+        shown[_DOMAINS.index(domain)] += page_size
+        return replace(self, shown=tuple(shown))
+
+
+@dataclass(frozen=True)
+class RankedOutcome:
+    """What the engine keeps of a search: the outcome without its rows, and each domain's ranked keys.
+
+    Item and skill rows are reduced to their ids and what ranked them (scores, matched stats,
+    matched field); Food codes and Registlets are already the shared dataset records. Rows
+    are rebuilt from the keys one page at a time.
+    """
+
+    outcome: UniversalSearchOutcome
+    ranked: tuple[tuple[Any, ...], ...] = ((),) * len(_DOMAINS)
+
+    def keys(self, domain: OutcomeDomain) -> tuple[Any, ...]:
+        return self.ranked[_DOMAINS.index(domain)]
+
+    @property
+    def rows(self) -> int:
+        return sum(len(keys) for keys in self.ranked)
+
+
+def _row_key(domain: OutcomeDomain, row: Any) -> Any:
+    if domain == 'items':
+        return (row.item.id, row.matched_stats, row.score, row.match_kind)
+    if domain == 'skills':
+        return (row.skill.id, row.matched_field)
+    return row
+
+
+def rank(outcome: UniversalSearchOutcome) -> RankedOutcome:
+    """Reduce a full outcome to its ranked keys, keeping every domain's total."""
+    emptied = {}
+    ranked = []
+    for domain in _DOMAINS:
+        domain_outcome = getattr(outcome, domain)
+        results = domain_outcome.results if domain_outcome is not None else ()
+        ranked.append(tuple(_row_key(domain, row) for row in results))
+        if domain_outcome is not None:
+            emptied[domain] = replace(domain_outcome, results=(), total=len(results))
+    return RankedOutcome(replace(outcome, **emptied), tuple(ranked))
+
+
+# Builds the rows of one page from its ranked keys, given the domain and the page's offset.
+PageRows = Callable[[OutcomeDomain, int, tuple[Any, ...]], tuple[Any, ...]]
+
+
+def window(
+    ranked: RankedOutcome,
+    handle: OutcomeHandle,
+    *,
+    fingerprint: str,
+    rows: PageRows,
+    domains: tuple[OutcomeDomain, ...] | None = None,
+    page_size: int = PAGE_SIZE,
+) -> UniversalSearchOutcome:
+    """The results ``handle`` shows, with totals and cursors for the rest.
+
+    Only the shown keys of ``domains`` (every domain by default) are turned into rows, one
+    ``page_size`` page at a time through ``rows``, so a caller that keeps built pages only
+    builds the page that "show more" added. The other domains keep their total without rows.
+    """
+    pages = {}
+    for domain, count in zip(_DOMAINS, handle.shown):
+        domain_outcome = getattr(ranked.outcome, domain)
+        if domain_outcome is None or (domains is not None and domain not in domains):
+            continue
+        page = page_of(ranked.keys(domain), PageCursor(handle.mode, handle.query, fingerprint, domain, 0), count)
+        shown = page.results
+        results = tuple(
+            row for start in range(0, len(shown), page_size) for row in rows(domain, start, shown[start:start + page_size])
+        )
+        pages[domain] = replace(domain_outcome, results=results, total=page.total, cursor=page.cursor)
+    return replace(ranked.outcome, query=handle.query, **pages)
+
+
+def first_page(
+    ranked: RankedOutcome,
+    *,
+    mode: DatabaseMode,
+    fingerprint: str,
+    rows: PageRows,
+    page_size: int = PAGE_SIZE,
+) -> UniversalSearchOutcome:
+    """Keep only the first page of every domain, with its total and a cursor for the rest."""
+    handle = OutcomeHandle.first_page(mode, ranked.outcome.query, fingerprint, page_size)
+    return window(ranked, handle, fingerprint=fingerprint, rows=rows, page_size=page_size)
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Literal
+from urllib.parse import quote
+
+from toram_search.database import add_connection_hook, remove_connection_hook
+
+PlanOperation = Literal['SCAN', 'SEARCH', 'OTHER']
+
+HOT_TABLES = frozenset({'item_stats', 'skills', 'skill_search_documents'})
+HOT_STATEMENT_PATTERNS: tuple[str, ...] = (
+    r'FROM item_stats WHERE item_id=\?',
+    r'FROM item_stats s JOIN items i ON i\.id=s\.item_id WHERE s\.stat_name=\?',
+    r'FROM items WHERE id=\?',
+    r'FROM skills WHERE id=\?',
+    r'FROM skills WHERE tree_id=\?',
+    r'FROM skill_sections WHERE skill_id=\?',
+    r'FROM skill_search_documents WHERE',
+    r'FROM skills s LEFT JOIN skill_aliases a ON a\.skill_id=s\.id WHERE',
+)
+AUDIT_QUERIES: tuple[str, ...] = (
+    'critical rate', 'cr bow', 'hp >= 5000 armor', 'hp > 5000 and cr bow',
+    'highest cr', '-aggro xtal', 'aggro xtal wp', 'upgrade New Crystal',
+    'Test Bow', 'tset bwo', 'Guardian', 'Shield Skills', 'skills that inflict stun',
+    'lowest mp shield skills', 'mp cost <= 300', 'what tier is Guardian',
+    'protects party members', 'food maxmp', 'std 220', 'physical pierce',
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])')
+_PARAMETER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_TABLE_REFERENCE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_PLAN_STEP = re.compile(r'^(SCAN|SEARCH)\s+(\w+)')
+_SHADOW_TABLE = re.compile(r"""\bFROM\s+['"]\w+['"]\.""", re.IGNORECASE)
+_NOT_ALIASES = frozenset({
+    'where', 'join', 'left', 'inner', 'cross', 'outer', 'on', 'order', 'group',
+    'limit', 'using', 'natural', 'union', 'having', 'window',
+})
+
+
+def statement_template(sql: str) -> str:
+    text = _STRING_LITERAL.sub('?', sql)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _PARAMETER_LIST.sub('(?)', text)
+    return ' '.join(text.split())
+
+
+def table_aliases(sql: str) -> dict[str, str]:
+    aliases: dict[str, str] = {}
+    for match in _TABLE_REFERENCE.finditer(sql):
+        table, alias = match.group(1), match.group(2)
+        aliases[table] = table
+        if alias and alias.casefold() not in _NOT_ALIASES:
+            aliases[alias] = table
+    return aliases
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    operation: PlanOperation
+    table: str | None
+    detail: str
+
+
+@dataclass(frozen=True)
+class StatementPlan:
+    template: str
+    database: str
+    executions: int
+    steps: tuple[PlanStep, ...]
+    hot: bool = False
+    error: str | None = None
+
+    @property
+    def scanned_tables(self) -> tuple[str, ...]:
+        return tuple(dict.fromkeys(
+            step.table for step in self.steps if step.operation == 'SCAN' and step.table
+        ))
+
+    @property
+    def violations(self) -> tuple[str, ...]:
+        if not self.hot:
+            return ()
+        return tuple(table for table in self.scanned_tables if table in HOT_TABLES)
+
+
+def explain(connection: sqlite3.Connection, sql: str) -> tuple[PlanStep, ...]:
+    aliases = table_aliases(sql)
+    steps = []
+    for row in connection.execute(f'EXPLAIN QUERY PLAN {sql}'):
+        detail = str(row[3])
+        match = _PLAN_STEP.match(detail)
+        if match is None or match.group(2) == 'CONSTANT':
+            steps.append(PlanStep('OTHER', None, detail))
+            continue
+        operation = 'SCAN' if match.group(1) == 'SCAN' else 'SEARCH'
+        steps.append(PlanStep(operation, aliases.get(match.group(2), match.group(2)), detail))
+    return tuple(steps)
+
+
+def _explain_file(path: Path, sql: str) -> tuple[tuple[PlanStep, ...], str | None]:
+    uri = f"file:{quote(path.as_posix(), safe='/:')}?mode=ro"
+    try:
+        connection = sqlite3.connect(uri, uri=True)
+        try:
+            return explain(connection, sql), None
+        finally:
+            connection.close()
+    except sqlite3.Error as exc:
+        return (), str(exc)
+
+
+class StatementRecorder:
+    """Capture distinct read statements issued through connect_readonly and explain each once."""
+
+    def __init__(self, *, hot_patterns: Iterable[str] = HOT_STATEMENT_PATTERNS) -> None:
+        self.hot_patterns = tuple(re.compile(pattern, re.IGNORECASE) for pattern in hot_patterns)
+        self._lock = threading.Lock()
+        self._executions: dict[tuple[str, str], int] = {}
+        self._plans: dict[tuple[str, str], tuple[tuple[PlanStep, ...], str | None]] = {}
+
+    def __enter__(self) -> StatementRecorder:
+        add_connection_hook(self._attach)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        remove_connection_hook(self._attach)
+
+    def _attach(self, connection: sqlite3.Connection, path: Path) -> None:
+        connection.set_trace_callback(lambda sql: self.record(path, sql))
+
+    def is_hot(self, template: str) -> bool:
+        return any(pattern.search(template) for pattern in self.hot_patterns)
+
+    def record(self, path: Path, sql: str) -> None:
+        if not sql.lstrip().upper().startswith(('SELECT', 'WITH')) or _SHADOW_TABLE.search(sql):
+            return
+        # Copies of one database (one per test, say) share a file name and report as one.
+        key = (statement_template(sql), Path(path).name)
+        with self._lock:
+            self._executions[key] = self._executions.get(key, 0) + 1
+            known = key in self._plans
+        if not known:
+            plan = _explain_file(path, sql)
+            with self._lock:
+                self._plans.setdefault(key, plan)
+
+    def plans(self) -> tuple[StatementPlan, ...]:
+        with self._lock:
+            rows = [
+                StatementPlan(
+                    template,
+                    database,
+                    self._executions[(template, database)],
+                    steps,
+                    self.is_hot(template),
+                    error,
+                )
+                for (template, database), (steps, error) in self._plans.items()
+            ]
+        return tuple(sorted(rows, key=lambda row: (row.database, -row.executions, row.template)))
+
+
+def plan_violations(plans: Iterable[StatementPlan]) -> tuple[StatementPlan, ...]:
+    return tuple(plan for plan in plans if plan.violations)
+
+
+def format_plans(plans: Iterable[StatementPlan]) -> str:
+    rows = tuple(plans)
+    lines = []
+    for plan in rows:
+        marker = 'HOT ' if plan.hot else ''
+        lines.append(f'[{plan.database}] {marker}x{plan.executions}: {plan.template}')
+        if plan.error:
+            lines.append(f'    ERROR {plan.error}')
+        for step in plan.steps:
+            flag = '!!' if step.table in plan.violations else '  '
+            lines.append(f'  {flag}{step.detail}')
+    violations = plan_violations(rows)
+    lines.append(
+        f'{len(rows)} statement templates, '
+        f'{sum(1 for plan in rows if plan.scanned_tables)} with full scans, '
+        f'{len(violations)} hot full-scan violations'
+    )
+    return '\n'.join(lines)
@@ -1,6 +1,27 @@
-from .data import RegistletDataError, load_registlet_dataset
-from .models import RegistletDataset, RegistletRecord, RegistletSearchOutcome
-from .service import RegistletSearchService, is_stoodie_intent
+from __future__ import annotations
+
+from importlib import import_module
+
+# Names resolve on first access, so importing one submodule does not load the others.
+_EXPORTS = {
+    'RegistletDataError': '.data',
+    'load_registlet_dataset': '.data',
+    'RegistletDataset': '.models',
+    'RegistletRecord': '.models',
+    'RegistletSearchOutcome': '.models',
+    'RegistletSearchService': '.service',
+    'is_stoodie_intent': '.service',
+}
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'RegistletDataError',
@@ -104,10 +104,30 @@ def _cached_load(path_name: str, mtime_ns: int, size: int) -> RegistletDataset:
     return _load_uncached(Path(path_name))
 
 
-def load_registlet_dataset(path: Path) -> RegistletDataset:
+# One seeded dataset per source path: seeding a newer version replaces the older one.
+_seeded: dict[str, tuple[tuple[str, int, int], RegistletDataset]] = {}
+
+
+def _source_key(path: Path) -> tuple[str, int, int]:
     resolved = Path(path).expanduser().resolve()
     try:
         stat = resolved.stat()
     except OSError as exc:
         raise RegistletDataError(f'Unable to access Registlet source: {exc}') from exc
-    return _cached_load(str(resolved), stat.st_mtime_ns, stat.st_size)
+    return str(resolved), stat.st_mtime_ns, stat.st_size
+
+
+def seed_registlet_dataset(path: Path, dataset: RegistletDataset) -> None:
+    """Serve a prebuilt dataset for the current version of the source file."""
+    key = _source_key(path)
+    _seeded[key[0]] = (key, dataset)
+
+
+def load_registlet_dataset(path: Path) -> RegistletDataset:
+    key = _source_key(path)
+    seeded = _seeded.get(key[0])
+    if seeded is not None:
+        if seeded[0] == key:
+            return seeded[1]
+        _seeded.pop(key[0], None)
+    return _cached_load(*key)
@@ -44,3 +44,5 @@ class RegistletSearchOutcome:
     interpretation: QueryInterpretation | None = None
     route_quality: RouteQuality = RouteQuality()
     match: RegistletMatch | None = None
+    total: int | None = None
+    cursor: str | None = None
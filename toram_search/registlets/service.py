@@ -3,9 +3,7 @@ from __future__ import annotations
 import re
 from pathlib import Path
 
-from rapidfuzz import fuzz
-
-from toram_search.interpretation import QueryChip, QueryInterpretation, RouteQuality
+from toram_search.interpretation import QueryChip, QueryInterpretation, RouteProbe, RouteQuality
 from .data import load_registlet_dataset
 from .models import RegistletMatch, RegistletRecord, RegistletSearchOutcome
 
@@ -41,6 +39,26 @@ class RegistletSearchService:
         rows = [(record.name, 'Registlet') for record in self.dataset.records]
         return tuple(sorted(rows, key=lambda row: row[0].casefold()))
 
+    def probe(self, query: str) -> RouteProbe[RegistletSearchOutcome]:
+        """Route quality of ``query``; the data is in memory, so the outcome is built up front."""
+        outcome = self.search(query)
+        return RouteProbe(outcome.route_quality, lambda: outcome)
+
+    def route_ceiling(self, query: str) -> RouteQuality:
+        """Best route quality ``search`` could report for ``query``, without running it."""
+        raw = ' '.join(str(query).split())
+        if not raw:
+            return RouteQuality()
+        if is_stoodie_intent(raw):
+            return RouteQuality('structured', True, 1)
+        normalized_query = _normalize_name(raw)
+        if any(_normalize_name(record.name) == normalized_query for record in self.dataset.records):
+            return RouteQuality('exact', True, 1)
+        effect_words = len(_normalize_effect(raw).split())
+        if effect_words:
+            return RouteQuality('content', True, effect_words)
+        return RouteQuality('weak', True, 1)
+
     def _nearest_level_suggestions(self, level: int) -> tuple[str, ...]:
         ranked = sorted(
             self.dataset.valid_stoodie_levels,
@@ -119,6 +137,8 @@ class RegistletSearchService:
         normalized_query = _normalize_name(raw)
         if not normalized_query:
             return ()
+        from rapidfuzz import fuzz
+
         scored: list[tuple[float, RegistletRecord]] = []
         for record in self.dataset.records:
             score = float(fuzz.ratio(normalized_query, _normalize_name(record.name)))
@@ -1,24 +1,214 @@
 from __future__ import annotations
 
+import copy
+import threading
 from dataclasses import replace
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Generic, Hashable, TypeVar
 
 from toram_search.database import FOOD_ALIASES, FOOD_ENTRIES, REGISTLET_DATA
-from toram_search.food.service import FoodSearchService, is_food_intent
-from toram_search.interpretation import QueryInterpretation, RouteQuality, SearchDomain
-from toram_search.items.service import ItemSearchService
+from toram_search.interpretation import QueryInterpretation, RouteProbe, RouteQuality, SearchDomain
 from toram_search.models import DatabaseMode, UniversalSearchOutcome
-from toram_search.registlets.data import load_registlet_dataset
-from toram_search.registlets.relationships import build_relationship_index
-from toram_search.registlets.service import RegistletSearchService, is_stoodie_intent
-from toram_search.skills.repository import SkillRepository
-from toram_search.skills.service import SkillSearchService
+
+if TYPE_CHECKING:
+    from toram_search.food.service import FoodSearchService
+    from toram_search.items.service import ItemSearchService
+    from toram_search.paging import OutcomeDomain
+    from toram_search.registlets.relationships import RegistletRelationshipIndex
+    from toram_search.registlets.service import RegistletSearchService
+    from toram_search.skills.service import SkillSearchService
+
+# Domain services, their models and rapidfuzz are imported where a search first needs them,
+# so importing the router (and the CLI, API and engine on top of it) stays cheap.
 
 _ALL_DOMAINS: frozenset[SearchDomain] = frozenset({'Items', 'Skills', 'Food', 'Registlets'})
 _DOMAIN_ORDER: tuple[SearchDomain, ...] = ('Items', 'Skills', 'Food', 'Registlets')
 
+T = TypeVar('T')
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+def _waiter_error(error: BaseException) -> BaseException:
+    """A fresh copy of the leader's exception, so each waiter raises with its own traceback."""
+    try:
+        copied = copy.copy(error)
+    except Exception:
+        copied = None
+    if not isinstance(copied, BaseException) or copied is error:
+        return RuntimeError(f'shared search failed: {error!r}')
+    copied.__traceback__ = None
+    return copied
+
+
+class SingleFlight(Generic[T]):
+    """Share one in-flight computation among concurrent callers with the same key.
+
+    A caller that arrives while its key is being computed waits for that computation and
+    gets its result, or its exception, instead of computing again. Nothing is kept once the
+    computation finishes, so results must be immutable to be shared safely.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, function: Callable[[], T], *, timeout: float | None = None) -> T:
+        """Return ``function()``, joining a running call for ``key`` if there is one.
+
+        ``timeout`` only bounds how long a joining caller waits (``TimeoutError``); the
+        caller that runs ``function`` always runs it to completion. A joining caller gets a
+        copy of the leader's exception, chained to the original as its ``__cause__``.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            if not flight.done.wait(timeout):
+                raise TimeoutError(f'shared search still running after {timeout}s')
+            if flight.error is not None:
+                raise _waiter_error(flight.error) from flight.error
+            return flight.result
+        try:
+            flight.result = function()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+
+def search_key(mode: DatabaseMode, query: str, *scope: Hashable) -> tuple[Hashable, ...]:
+    """Single-flight key for a search: searches only differ by whitespace share a key."""
+    return (mode, ' '.join(str(query).split()), *scope)
+
+
+class DomainServices:
+    """Domain services and derived indexes kept open across searches by one caller at a time.
+
+    With ``check_same_thread=False`` the connections may move between threads, as long as
+    only one thread uses them at a time (see ``SearchEngine.lease``).
+    """
+
+    def __init__(
+        self,
+        *,
+        items_path: Path,
+        skills_path: Path,
+        food_entries_path: Path = FOOD_ENTRIES,
+        food_aliases_path: Path = FOOD_ALIASES,
+        registlets_path: Path = REGISTLET_DATA,
+        check_same_thread: bool = True,
+    ) -> None:
+        self.check_same_thread = check_same_thread
+        self.items_path = Path(items_path)
+        self.skills_path = Path(skills_path)
+        self.food_entries_path = Path(food_entries_path)
+        self.food_aliases_path = Path(food_aliases_path)
+        self.registlets_path = Path(registlets_path)
+        self._items: ItemSearchService | None = None
+        self._skills: SkillSearchService | None = None
+        self._relationships: RegistletRelationshipIndex | None = None
+
+    def items(self) -> ItemSearchService:
+        if self._items is None:
+            from toram_search.items.service import ItemSearchService
+
+            self._items = ItemSearchService(self.items_path, check_same_thread=self.check_same_thread)
+        return self._items
+
+    def skills(self) -> SkillSearchService:
+        if self._skills is None:
+            from toram_search.skills.service import SkillSearchService
+
+            self._skills = SkillSearchService(self.skills_path, check_same_thread=self.check_same_thread)
+        return self._skills
+
+    def food(self) -> FoodSearchService:
+        from toram_search.food.service import FoodSearchService
+
+        return FoodSearchService(self.food_entries_path, self.food_aliases_path)
+
+    def registlets(self) -> RegistletSearchService:
+        from toram_search.registlets.service import RegistletSearchService
+
+        return RegistletSearchService(self.registlets_path)
+
+    def relationship_index(self) -> RegistletRelationshipIndex:
+        if self._relationships is None:
+            from toram_search.registlets.data import load_registlet_dataset
+            from toram_search.registlets.relationships import build_relationship_index
+
+            dataset = load_registlet_dataset(self.registlets_path)
+            self._relationships = build_relationship_index(
+                dataset.records,
+                self.skills().repository.list_skill_names(),
+            )
+        return self._relationships
+
+    def page_rows(
+        self,
+        domain: OutcomeDomain,
+        keys: tuple,
+        *,
+        available_domains: frozenset[SearchDomain] = _ALL_DOMAINS,
+    ) -> tuple:
+        """The result rows of one page of ranked keys, as ``toram_search.paging.rank`` reduced them."""
+        if domain == 'items':
+            from toram_search.items.models import ItemCardResult
+
+            summaries = self.items().repository.get_summaries(tuple(key[0] for key in keys))
+            return tuple(
+                ItemCardResult(summaries[item_id], stats, score, kind)
+                for item_id, stats, score, kind in keys
+                if item_id in summaries
+            )
+        if domain == 'skills':
+            cards = self.skills().cards(keys)
+            if 'Registlets' not in available_domains:
+                return cards
+            index = self.relationship_index()
+            return tuple(
+                replace(card, related_registlets=index.by_skill.get(card.skill.name.casefold(), ()))
+                for card in cards
+            )
+        return keys
+
+    def close(self) -> None:
+        if self._items is not None:
+            self._items.close()
+            self._items = None
+        if self._skills is not None:
+            self._skills.close()
+            self._skills = None
+
+    def __enter__(self) -> DomainServices:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _search_items(query: str, path: Path, services: DomainServices | None = None):
+    if services is not None:
+        return services.items().search(query)
+    from toram_search.items.service import ItemSearchService
 
-def _search_items(query: str, path: Path):
     service = ItemSearchService(path)
     try:
         return service.search(query)
@@ -26,7 +216,11 @@ def _search_items(query: str, path: Path):
         service.close()
 
 
-def _search_skills(query: str, path: Path):
+def _search_skills(query: str, path: Path, services: DomainServices | None = None):
+    if services is not None:
+        return services.skills().search(query, allow_weak_fallback=True)
+    from toram_search.skills.service import SkillSearchService
+
     service = SkillSearchService(path)
     try:
         return service.search(query, allow_weak_fallback=True)
@@ -35,10 +229,14 @@ def _search_skills(query: str, path: Path):
 
 
 def _search_food(query: str, entries_path: Path, aliases_path: Path):
+    from toram_search.food.service import FoodSearchService
+
     return FoodSearchService(entries_path, aliases_path).search(query)
 
 
 def _search_registlets(query: str, path: Path):
+    from toram_search.registlets.service import RegistletSearchService
+
     return RegistletSearchService(path).search(query)
 
 
@@ -64,30 +262,26 @@ def select_winning_interpretation(*outcomes) -> QueryInterpretation | None:
     return max(candidates, key=lambda row: (row[0], row[1]))[2].interpretation
 
 
-def _suppress_outcome(domain: SearchDomain, outcome):
-    if outcome is None:
-        return None
-    common = {
-        'kind': 'not_found',
-        'results': (),
-        'message': None,
-        'suggested_queries': (),
-        'interpretation': None,
-    }
-    if domain == 'Items':
-        return replace(outcome, routing_confidence='none', **common)
-    if domain == 'Registlets':
-        return replace(outcome, match=None, **common)
-    return replace(outcome, **common)
-
-
-def _enrich_skill_relationships(skills, *, skills_path: Path, registlets_path: Path):
+def _enrich_skill_relationships(
+    skills,
+    *,
+    skills_path: Path,
+    registlets_path: Path,
+    services: DomainServices | None = None,
+):
     if skills is None or not skills.results:
         return skills
-    dataset = load_registlet_dataset(registlets_path)
-    with SkillRepository(skills_path) as repository:
-        canonical_names = repository.list_skill_names()
-    index = build_relationship_index(dataset.records, canonical_names)
+    if services is not None:
+        index = services.relationship_index()
+    else:
+        from toram_search.registlets.data import load_registlet_dataset
+        from toram_search.registlets.relationships import build_relationship_index
+        from toram_search.skills.repository import SkillRepository
+
+        dataset = load_registlet_dataset(registlets_path)
+        with SkillRepository(skills_path) as repository:
+            canonical_names = repository.list_skill_names()
+        index = build_relationship_index(dataset.records, canonical_names)
     enriched = tuple(
         replace(
             card,
@@ -98,35 +292,67 @@ def _enrich_skill_relationships(skills, *, skills_path: Path, registlets_path: P
     return replace(skills, results=enriched)
 
 
-def _search_available_domains(
+def _suppressed_outcome(domain: SearchDomain, query: str, route_quality: RouteQuality = RouteQuality()):
+    """Empty outcome for a domain that lost the route ranking or was never searched."""
+    raw = ' '.join(str(query).split())
+    if domain == 'Items':
+        from toram_search.items.models import ItemSearchOutcome
+
+        return ItemSearchOutcome('not_found', raw, route_quality=route_quality)
+    if domain == 'Skills':
+        from toram_search.skills.models import SkillSearchOutcome
+
+        return SkillSearchOutcome('not_found', raw, route_quality=route_quality)
+    if domain == 'Food':
+        from toram_search.food.models import FoodSearchOutcome
+
+        return FoodSearchOutcome('not_found', raw, route_quality=route_quality)
+    from toram_search.registlets.models import RegistletSearchOutcome
+
+    return RegistletSearchOutcome('not_found', raw, route_quality=route_quality)
+
+
+def _open_domain(domain: SearchDomain, services: DomainServices):
+    if domain == 'Items':
+        return services.items()
+    if domain == 'Skills':
+        return services.skills()
+    if domain == 'Food':
+        return services.food()
+    return services.registlets()
+
+
+def _probe_available_domains(
     query: str,
     *,
     available: frozenset[SearchDomain],
-    items_path: Path,
-    skills_path: Path,
-    food_entries_path: Path,
-    food_aliases_path: Path,
-    registlets_path: Path,
-):
-    items = _search_items(query, items_path) if 'Items' in available else None
-    skills = _search_skills(query, skills_path) if 'Skills' in available else None
-    food = (
-        _search_food(query, food_entries_path, food_aliases_path)
-        if 'Food' in available
-        else None
-    )
-    registlets = (
-        _search_registlets(query, registlets_path)
-        if 'Registlets' in available
-        else None
-    )
-    if skills is not None and 'Registlets' in available:
-        skills = _enrich_skill_relationships(
-            skills,
-            skills_path=skills_path,
-            registlets_path=registlets_path,
-        )
-    return items, skills, food, registlets
+    services: DomainServices,
+    prune: bool,
+) -> dict[SearchDomain, RouteProbe | None]:
+    """Probe every available domain, skipping those whose route ceiling cannot survive.
+
+    Domains are probed from the highest ceiling down. A domain whose ceiling is below the
+    best route already probed can never be selected by ``select_surviving_domains``, so it
+    is not probed at all and reports an empty route.
+    """
+    opened = {domain: _open_domain(domain, services) for domain in _DOMAIN_ORDER if domain in available}
+    order = list(opened)
+    ceilings = {}
+    if prune:
+        ceilings = {domain: service.route_ceiling(query).sort_key for domain, service in opened.items()}
+        order.sort(key=lambda domain: ceilings[domain], reverse=True)
+
+    probes: dict[SearchDomain, RouteProbe | None] = dict.fromkeys(_DOMAIN_ORDER)
+    best: tuple[int, int, int] | None = None
+    for domain in order:
+        if prune and best is not None and ceilings[domain] < best:
+            probes[domain] = RouteProbe(RouteQuality(), lambda domain=domain: _suppressed_outcome(domain, query))
+            continue
+        probe = opened[domain].probe(query)
+        probes[domain] = probe
+        if best is None or probe.route_quality.sort_key > best:
+            best = probe.route_quality.sort_key
+    return probes
 
 
 def search_database(
@@ -139,11 +365,13 @@ def search_database(
     food_aliases_path: Path = FOOD_ALIASES,
     registlets_path: Path = REGISTLET_DATA,
     available_domains: frozenset[SearchDomain] | None = None,
+    services: DomainServices | None = None,
+    prune_domains: bool = True,
 ) -> UniversalSearchOutcome:
     available = available_domains if available_domains is not None else _ALL_DOMAINS
 
     if mode == 'Items':
-        items = _search_items(query, items_path) if 'Items' in available else None
+        items = _search_items(query, items_path, services) if 'Items' in available else None
         return UniversalSearchOutcome(
             query=query,
             items=items,
@@ -151,12 +379,13 @@ def search_database(
         )
 
     if mode == 'Skills':
-        skills = _search_skills(query, skills_path) if 'Skills' in available else None
+        skills = _search_skills(query, skills_path, services) if 'Skills' in available else None
         if skills is not None and 'Registlets' in available:
             skills = _enrich_skill_relationships(
                 skills,
                 skills_path=skills_path,
                 registlets_path=registlets_path,
+                services=services,
             )
         return UniversalSearchOutcome(
             query=query,
@@ -188,59 +417,77 @@ def search_database(
             interpretation=registlets.interpretation if registlets is not None else None,
         )
 
-    items, skills, food, registlets = _search_available_domains(
-        query,
-        available=available,
-        items_path=items_path,
-        skills_path=skills_path,
-        food_entries_path=food_entries_path,
-        food_aliases_path=food_aliases_path,
-        registlets_path=registlets_path,
-    )
+    if services is None:
+        with DomainServices(
+            items_path=items_path,
+            skills_path=skills_path,
+            food_entries_path=food_entries_path,
+            food_aliases_path=food_aliases_path,
+            registlets_path=registlets_path,
+        ) as temporary:
+            return search_database(
+                mode,
+                query,
+                items_path=items_path,
+                skills_path=skills_path,
+                food_entries_path=food_entries_path,
+                food_aliases_path=food_aliases_path,
+                registlets_path=registlets_path,
+                available_domains=available_domains,
+                services=temporary,
+                prune_domains=prune_domains,
+            )
+
+    from toram_search.food.service import is_food_intent
+    from toram_search.registlets.service import is_stoodie_intent
 
     blocked_explicit_intent = (
         ('Food' not in available and is_food_intent(query))
         or ('Registlets' not in available and is_stoodie_intent(query))
     )
-    if blocked_explicit_intent:
-        items = _suppress_outcome('Items', items)
-        skills = _suppress_outcome('Skills', skills)
-        food = _suppress_outcome('Food', food)
-        registlets = _suppress_outcome('Registlets', registlets)
-        return UniversalSearchOutcome(
-            query=query,
-            items=items,
-            skills=skills,
-            food=food,
-            registlets=registlets,
+    if blocked_explicit_intent and prune_domains:
+        probes = {
+            domain: RouteProbe(RouteQuality(), lambda domain=domain: _suppressed_outcome(domain, query))
+            if domain in available else None
+            for domain in _DOMAIN_ORDER
+        }
+    else:
+        probes = _probe_available_domains(
+            query,
+            available=available,
+            services=services,
+            prune=prune_domains,
         )
 
-    raw_outcomes = {
-        'Items': items,
-        'Skills': skills,
-        'Food': food,
-        'Registlets': registlets,
-    }
-    qualities = {
-        domain: outcome.route_quality
-        for domain, outcome in raw_outcomes.items()
-        if outcome is not None
-    }
-    survivors = select_surviving_domains(qualities)
-    interpretation = select_winning_interpretation(items, skills, food, registlets)
-
-    suppressed = {}
+    survivors = frozenset()
+    if not blocked_explicit_intent:
+        survivors = select_surviving_domains({
+            domain: probe.route_quality
+            for domain, probe in probes.items()
+            if probe is not None
+        })
+    outcomes = {}
     for domain in _DOMAIN_ORDER:
-        outcome = raw_outcomes[domain]
-        suppressed[domain] = (
-            outcome if domain in survivors else _suppress_outcome(domain, outcome)
+        probe = probes[domain]
+        if probe is None:
+            outcomes[domain] = None
+        elif domain in survivors:
+            outcomes[domain] = probe.materialize()
+        else:
+            outcomes[domain] = _suppressed_outcome(domain, query, probe.route_quality)
+    if outcomes['Skills'] is not None and 'Registlets' in available:
+        outcomes['Skills'] = _enrich_skill_relationships(
+            outcomes['Skills'],
+            skills_path=skills_path,
+            registlets_path=registlets_path,
+            services=services,
         )
 
     return UniversalSearchOutcome(
         query=query,
-        items=suppressed['Items'],
-        skills=suppressed['Skills'],
-        food=suppressed['Food'],
-        registlets=suppressed['Registlets'],
-        interpretation=interpretation,
+        items=outcomes['Items'],
+        skills=outcomes['Skills'],
+        food=outcomes['Food'],
+        registlets=outcomes['Registlets'],
+        interpretation=select_winning_interpretation(*(outcomes[domain] for domain in _DOMAIN_ORDER)),
     )
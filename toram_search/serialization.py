@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+from dataclasses import fields, is_dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from toram_search.models import UniversalSearchOutcome
+from toram_search.skills.models import SkillRecord
+
+# Detail payloads are fetched by id on demand; search payloads only carry card fields.
+_OMITTED_FIELDS: dict[type, frozenset[str]] = {
+    SkillRecord: frozenset({
+        'normalized_name', 'sections', 'description', 'game_description', 'raw_text',
+    }),
+}
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls: type, detail: bool) -> tuple[str, ...]:
+    omitted = frozenset() if detail else _OMITTED_FIELDS.get(cls, frozenset())
+    return tuple(field.name for field in fields(cls) if field.name not in omitted)
+
+
+def _canonical(payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+
+def to_payload(value: Any, *, detail: bool = False) -> Any:
+    """Convert outcome dataclasses to JSON-ready values without ``asdict`` deep copies."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if is_dataclass(value) and not isinstance(value, type):
+        return {
+            name: to_payload(getattr(value, name), detail=detail)
+            for name in _field_names(type(value), detail)
+        }
+    if isinstance(value, (tuple, list)):
+        return [to_payload(row, detail=detail) for row in value]
+    if isinstance(value, (frozenset, set)):
+        # Set iteration order follows string hashes, which differ between processes.
+        rows = [to_payload(row, detail=detail) for row in value]
+        try:
+            return sorted(rows)
+        except TypeError:
+            # Mixed types have no natural order; their JSON text still gives a stable one.
+            return sorted(rows, key=_canonical)
+    if isinstance(value, dict):
+        return {str(key): to_payload(row, detail=detail) for key, row in value.items()}
+    if isinstance(value, Path):
+        return value.as_posix()
+    return str(value)
+
+
+def outcome_payload(outcome: UniversalSearchOutcome, *, mode: str | None = None) -> dict[str, Any]:
+    payload = to_payload(outcome)
+    return payload if mode is None else {'mode': mode, **payload}
+
+
+def dumps_line(payload: dict[str, Any]) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
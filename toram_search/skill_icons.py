@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-from pathlib import Path
+import base64
+import inspect
+import io
+import threading
 import unicodedata
+import weakref
+from pathlib import Path
+from typing import Callable
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_SKILL_ICON_ROOT = PROJECT_ROOT / "coryn_skill_icons"
@@ -9,6 +15,10 @@ TREE_FOLDER_ALIASES = {
     "magicwarrior": "magicblade",
     "blacksmith": "smith",
 }
+# Cards show icons at 64px and the skill dialog at 96px.
+ICON_SIZES = (64, 96)
+
+PrebuiltIcons = Callable[[str, Path, int], "str | None"]
 
 
 def normalize_icon_key(value: str) -> str:
@@ -23,18 +33,49 @@ def _tree_folder_key(tree_name: str) -> str:
     return TREE_FOLDER_ALIASES.get(key, key)
 
 
+def resize_icon(data: bytes, size: int) -> bytes:
+    """PNG bytes that fit in a ``size`` square; small or unreadable icons are returned unchanged."""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if max(image.size) <= size:
+                return data
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            output = io.BytesIO()
+            image.save(output, format="PNG", optimize=True)
+    except (OSError, ValueError):
+        return data
+    return output.getvalue()
+
+
+def icon_data_uri(path: Path, size: int) -> str:
+    encoded = base64.b64encode(resize_icon(Path(path).read_bytes(), size)).decode("ascii")
+    return f"data:image/png;base64,{encoded}"
+
+
 class SkillIconCatalog:
-    """Lazily index checked-in skill icons and resolve them deterministically."""
+    """Lazily index checked-in skill icons, resolve them deterministically, and serve them as data URIs.
+
+    Data URIs are passed to ``st.image`` as-is, so reruns do not re-read or re-register icon files.
+    """
 
     def __init__(self, root: Path) -> None:
         self.root = Path(root).expanduser().resolve()
         self._folder_index: dict[str, dict[str, tuple[Path, ...]]] | None = None
         self._global_index: dict[str, tuple[Path, ...]] | None = None
+        self._index_lock = threading.Lock()
+        self._uris: dict[tuple[Path, int], str] = {}
+        self._prebuilt: Callable[[], PrebuiltIcons | None] | None = None
 
     def _ensure_index(self) -> None:
         if self._folder_index is not None and self._global_index is not None:
             return
+        with self._index_lock:
+            if self._folder_index is None or self._global_index is None:
+                self._global_index, self._folder_index = self._scan()
 
+    def _scan(self) -> tuple[dict[str, tuple[Path, ...]], dict[str, dict[str, tuple[Path, ...]]]]:
         folder_lists: dict[str, dict[str, list[Path]]] = {}
         global_lists: dict[str, list[Path]] = {}
 
@@ -53,17 +94,53 @@ class SkillIconCatalog:
                     local.setdefault(skill_key, []).append(icon)
                     global_lists.setdefault(skill_key, []).append(icon)
 
-        self._folder_index = {
+        folder_index = {
             folder_key: {
                 skill_key: tuple(paths)
                 for skill_key, paths in skill_map.items()
             }
             for folder_key, skill_map in folder_lists.items()
         }
-        self._global_index = {
+        global_index = {
             skill_key: tuple(paths)
             for skill_key, paths in global_lists.items()
         }
+        return global_index, folder_index
+
+    def icon_paths(self) -> tuple[Path, ...]:
+        self._ensure_index()
+        assert self._global_index is not None
+        return tuple(sorted({path for paths in self._global_index.values() for path in paths}))
+
+    def use_prebuilt(self, lookup: PrebuiltIcons) -> None:
+        """Serve icons from a build artifact, checked before resizing.
+
+        A bound method, such as ``SearchSnapshot.skill_icon``, is held weakly so the catalog does not
+        keep a closed snapshot alive; any other callable is held strongly.
+        """
+        if inspect.ismethod(lookup):
+            self._prebuilt = weakref.WeakMethod(lookup)
+        else:
+            self._prebuilt = lambda: lookup
+
+    def data_uri(self, tree_name: str, skill_name: str, size: int) -> str | None:
+        path = self.resolve(tree_name, skill_name)
+        if path is None:
+            return None
+        uri = self._uris.get((path, size))
+        if uri is None:
+            uri = self._prebuilt_uri(path, size) or icon_data_uri(path, size)
+            self._uris[(path, size)] = uri
+        return uri
+
+    def _prebuilt_uri(self, path: Path, size: int) -> str | None:
+        lookup = self._prebuilt() if self._prebuilt is not None else None
+        if lookup is None:
+            return None
+        try:
+            return lookup(path.relative_to(self.root).as_posix(), path, size)
+        except (OSError, ValueError):
+            return None
 
     def resolve(self, tree_name: str, skill_name: str) -> Path | None:
         self._ensure_index()
@@ -93,7 +170,10 @@ DEFAULT_SKILL_ICON_CATALOG = SkillIconCatalog(DEFAULT_SKILL_ICON_ROOT)
 __all__ = [
     "DEFAULT_SKILL_ICON_CATALOG",
     "DEFAULT_SKILL_ICON_ROOT",
+    "ICON_SIZES",
     "SkillIconCatalog",
     "TREE_FOLDER_ALIASES",
+    "icon_data_uri",
     "normalize_icon_key",
+    "resize_icon",
 ]
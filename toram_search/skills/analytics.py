@@ -7,7 +7,7 @@ COMPARABLE_FIELDS=frozenset({'mp_cost_value','required_level','tier'})
 
 class SkillAnalytics:
     def __init__(self,repository:SkillRepository): self.repository=repository
-    def filter_skills(self,filters:SkillFilter=SkillFilter())->tuple[SkillRecord,...]:
+    def filter_skill_ids(self,filters:SkillFilter=SkillFilter())->tuple[str,...]:
         ids=structured_skill_ids(self.repository,filters)
         if filters.ailments:
             eligible=structured_skill_ids(self.repository,SkillFilter(tree_ids=filters.tree_ids,tiers=filters.tiers,skill_types=filters.skill_types,weapons=filters.weapons,required_level_max=filters.required_level_max,mp_cost_max=filters.mp_cost_max))
@@ -17,7 +17,9 @@ class SkillAnalytics:
                 for row in self.repository.connection.execute("SELECT DISTINCT skill_id,LOWER(text) FROM skill_search_documents WHERE LOWER(text) LIKE ? OR LOWER(text) LIKE ?",(f'%inflict {term}%',f'%inflicts {term}%')):
                     prose.add(str(row[0]))
             selected=set(ids)|(prose&set(eligible)); ids=tuple(i for i in eligible if i in selected)
-        return tuple(self.repository.get_skill(i) for i in ids)
+        return tuple(ids)
+    def filter_skills(self,filters:SkillFilter=SkillFilter())->tuple[SkillRecord,...]:
+        return tuple(self.repository.get_skill(i) for i in self.filter_skill_ids(filters))
     def count(self,filters:SkillFilter=SkillFilter())->int:return len(self.filter_skills(filters))
     def rank(self,field:str,direction:str,*,filters:SkillFilter=SkillFilter(),limit:int=5)->tuple[SkillRecord,...]:
         if field not in COMPARABLE_FIELDS: raise ValueError(field)
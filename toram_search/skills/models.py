@@ -77,3 +77,5 @@ class SkillSearchOutcome:
     suggested_queries: tuple[str, ...] = ()
     interpretation: QueryInterpretation | None = None
     route_quality: RouteQuality = RouteQuality()
+    total: int | None = None
+    cursor: str | None = None
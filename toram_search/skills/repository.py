@@ -6,9 +6,9 @@ from .models import SkillRecord, SkillSection, SkillTree
 from .normalization import normalize_skill_name
 
 class SkillRepository:
-    def __init__(self, database_path: Path) -> None:
+    def __init__(self, database_path: Path, *, check_same_thread: bool = True) -> None:
         self.database_path=Path(database_path).expanduser().resolve()
-        self.connection=connect_readonly(self.database_path)
+        self.connection=connect_readonly(self.database_path,check_same_thread=check_same_thread)
     def close(self): self.connection.close()
     def __enter__(self): return self
     def __exit__(self,exc_type,exc,tb): self.close()
@@ -16,6 +16,9 @@ class SkillRepository:
     def count_skills(self)->int: return int(self.connection.execute('SELECT COUNT(*) FROM skills').fetchone()[0])
     def list_tree_names(self)->list[str]: return [str(r[0]) for r in self.connection.execute('SELECT name FROM skill_trees ORDER BY name COLLATE NOCASE,id')]
     def list_skill_names(self)->tuple[str,...]: return tuple(str(r[0]) for r in self.connection.execute('SELECT name FROM skills ORDER BY name COLLATE NOCASE,id'))
+    def list_skill_phrases(self)->tuple[str,...]: return tuple(str(r[0]) for r in self.connection.execute('SELECT name FROM skills UNION SELECT normalized_name FROM skills UNION SELECT alias FROM skill_aliases UNION SELECT normalized_alias FROM skill_aliases') if r[0] is not None)
+    def list_skill_phrase_rows(self)->tuple[tuple[str,str,str|None],...]: return tuple((str(r[0]),str(r[1]),None if r[2] is None else str(r[2])) for r in self.connection.execute('SELECT s.id,s.name,a.alias FROM skills s LEFT JOIN skill_aliases a ON a.skill_id=s.id ORDER BY s.id,a.position'))
+    def list_skill_name_rows(self)->tuple[tuple[str,str],...]: return tuple((str(r[0]),str(r[1])) for r in self.connection.execute('SELECT id,normalized_name FROM skills ORDER BY tree_id,source_order,id'))
     def list_skill_types(self)->tuple[str,...]: return tuple(str(r[0]) for r in self.connection.execute("SELECT DISTINCT skill_type FROM skills WHERE skill_type IS NOT NULL AND TRIM(skill_type)<>'' ORDER BY skill_type COLLATE NOCASE"))
     def list_known_ailments(self)->tuple[str,...]: return tuple(str(r[0]) for r in self.connection.execute('SELECT MIN(name) FROM skill_ailments GROUP BY normalized_name ORDER BY MIN(name) COLLATE NOCASE'))
     def _tree(self,row)->SkillTree:
@@ -60,7 +63,9 @@ class SkillRepository:
         if tree_id: params.append(tree_id)
         rows=self.connection.execute(f'''SELECT DISTINCT s.id FROM skills s LEFT JOIN skill_aliases a ON a.skill_id=s.id WHERE (s.normalized_name=? {tree_clause}) OR (a.normalized_alias=? {tree_clause}) ORDER BY s.tree_id,s.source_order,s.id''',tuple(params)).fetchall()
         return tuple(self.get_skill(str(r[0])) for r in rows)
+    def list_skill_ids_in_tree(self,tree_id:str)->tuple[str,...]:
+        return tuple(str(r[0]) for r in self.connection.execute('SELECT id FROM skills WHERE tree_id=? ORDER BY source_order,id',(tree_id,)))
     def list_skills_in_tree(self,tree_id:str)->tuple[SkillRecord,...]:
-        return tuple(self.get_skill(str(r[0])) for r in self.connection.execute('SELECT id FROM skills WHERE tree_id=? ORDER BY source_order,id',(tree_id,)))
+        return tuple(self.get_skill(i) for i in self.list_skill_ids_in_tree(tree_id))
     def all_skills(self)->tuple[SkillRecord,...]:
         return tuple(self.get_skill(str(r[0])) for r in self.connection.execute('SELECT id FROM skills ORDER BY tree_id,source_order,id'))
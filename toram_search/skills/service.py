@@ -1,9 +1,8 @@
 from __future__ import annotations
 import re
 from pathlib import Path
-from rapidfuzz import fuzz
 
-from toram_search.interpretation import RouteQuality
+from toram_search.interpretation import RouteProbe, RouteQuality
 from .analytics import SkillAnalytics
 from .concepts import resolve_ailment
 from .interpretation import build_skill_interpretation
@@ -13,9 +12,19 @@ from .normalization import normalize_skill_name
 from .repository import SkillRepository
 
 _SUBJECTIVE=re.compile(r'\b(?:best|strongest|highest dps|most damage)\b.*\b(?:dps|tank|build|mage|skill)\b',re.I)
+_TIER=re.compile(r'\btier\s+([1-5])\b')
+_MP_LIMIT=re.compile(r'\bmp(?:\s+cost)?\s*(?:<=|under|below|at most)\s*(\d+)\b')
+_LEVEL_LIMIT=re.compile(r'\brequired\s+level\s*(?:<=|under|below|at most)\s*(\d+)\b')
+_RANK_WORDS=('lowest','least','highest')
+_FILTER_FIELDS=7  # trees, tiers, types, ailments, weapons, MP and required level
 
 class SkillSearchService:
-    def __init__(self,database_path:Path): self.repository=SkillRepository(database_path);self.analytics=SkillAnalytics(self.repository)
+    def __init__(self,database_path:Path,*,check_same_thread:bool=True):
+        self.repository=SkillRepository(database_path,check_same_thread=check_same_thread);self.analytics=SkillAnalytics(self.repository)
+        self._phrases:frozenset[str]|None=None
+        self._phrase_rows:tuple[tuple[str,tuple[str,...]],...]|None=None
+        self._name_rows:tuple[tuple[str,str],...]|None=None
+        self._filter_terms:tuple[str,...]|None=None
     def close(self): self.repository.close()
     def get_skill(self,skill_id:str)->SkillCardResult:
         s=self.repository.get_skill(skill_id);return SkillCardResult(s,self.repository.get_tree(s.tree_id).name)
@@ -32,18 +41,57 @@ class SkillSearchService:
                 v=getattr(s,field,None);value=str(v) if v is not None else None
             out.append(SkillCardResult(s,self.repository.get_tree(s.tree_id).name,field,value))
         return tuple(out)
-    def _find_skill_phrases(self,query:str):
+    def cards(self,rows:tuple[tuple[str,str|None],...])->tuple[SkillCardResult,...]:
+        """Cards for ``(skill id, matched field)`` pairs, built as ``search`` builds them."""
+        return tuple(card for skill_id,field in rows for card in self._cards((self.repository.get_skill(skill_id),),field))
+    def _phrase_table(self)->tuple[tuple[str,tuple[str,...]],...]:
+        if self._phrase_rows is None:
+            phrases={}
+            for skill_id,name,alias in self.repository.list_skill_phrase_rows():
+                phrases.setdefault(skill_id,[normalize_skill_name(name)])
+                if alias is not None:phrases[skill_id].append(normalize_skill_name(alias))
+            self._phrase_rows=tuple((skill_id,tuple(names)) for skill_id,names in phrases.items())
+        return self._phrase_rows
+    def _name_table(self)->tuple[tuple[str,str],...]:
+        if self._name_rows is None:self._name_rows=self.repository.list_skill_name_rows()
+        return self._name_rows
+    def _find_skill_phrases(self,query:str)->tuple[str,...]:
         norm=normalize_skill_name(re.sub(r'[?!.]+$','',query))
         matches=[]
-        for s in self.repository.all_skills():
-            for phrase in (s.name,*s.aliases):
-                n=normalize_skill_name(phrase)
+        for skill_id,phrases in self._phrase_table():
+            for n in phrases:
                 if f' {n} ' in f' {norm} ':
-                    matches.append((norm.find(n),-len(n),s));break
-        matches.sort(key=lambda x:(x[0],x[1],x[2].id));seen=[]
-        for _,_,s in matches:
-            if s.id not in {x.id for x in seen}:seen.append(s)
-        return tuple(seen)
+                    matches.append((norm.find(n),-len(n),skill_id));break
+        matches.sort()
+        return tuple(skill_id for _,_,skill_id in matches)
+    def _hydrated_cards(self,skill_ids,field=None):
+        return lambda: self._cards(tuple(self.repository.get_skill(i) for i in skill_ids),field)
+    def _skill_phrases(self)->frozenset[str]:
+        if self._phrases is None:self._phrases=frozenset(normalize_skill_name(x) for x in self.repository.list_skill_phrases())
+        return self._phrases
+    def _structured_terms(self)->tuple[str,...]:
+        if self._filter_terms is None:
+            terms=[]
+            for tree_name in self.repository.list_tree_names():
+                tn=normalize_skill_name(tree_name);terms.append(tn[:-7].strip() if tn.endswith(' skills') else tn)
+            terms += [normalize_skill_name(x) for x in (*self.repository.list_skill_types(),*self.repository.list_known_ailments())]
+            self._filter_terms=tuple(terms)
+        return self._filter_terms
+    def route_ceiling(self,query:str)->RouteQuality:
+        """Best route quality ``search`` could report for ``query``, without running it."""
+        raw=' '.join(str(query).split());norm=normalize_skill_name(raw.strip(' ?!.'))
+        if not raw:return RouteQuality()
+        if _SUBJECTIVE.search(raw):return RouteQuality('structured',False,0)
+        phrases=self._skill_phrases()
+        tokens=normalize_skill_name(re.sub(r'[?!.]+$','',raw)).split()
+        spans=(' '.join(tokens[i:j]) for i in range(len(tokens)) for j in range(i+1,len(tokens)+1))
+        if '' in phrases or normalize_skill_name(raw) in phrases or any(span in phrases for span in spans):
+            return RouteQuality('exact',True,2)
+        if (any(term in norm for term in self._structured_terms())
+                or any(pattern.search(norm) for pattern in (_TIER,_MP_LIMIT,_LEVEL_LIMIT))
+                or ('mp' in norm and any(w in norm for w in _RANK_WORDS))):
+            return RouteQuality('structured',True,_FILTER_FIELDS)
+        return RouteQuality('weak',True,0)
     def _tree_id_from_query(self, norm: str) -> str | None:
         for tree_name in self.repository.list_tree_names():
             tree=self.repository.resolve_tree_name(tree_name)[0]
@@ -54,14 +102,14 @@ class SkillSearchService:
         return None
     def _structured_filter_from_query(self, norm: str) -> SkillFilter:
         tree_id=self._tree_id_from_query(norm)
-        tier_match=re.search(r'\btier\s+([1-5])\b', norm)
+        tier_match=_TIER.search(norm)
         skill_type=None
         for candidate in self.repository.list_skill_types():
             if f' {normalize_skill_name(candidate)} ' in f' {norm} ':
                 skill_type=candidate
                 break
-        mp_match=re.search(r'\bmp(?:\s+cost)?\s*(?:<=|under|below|at most)\s*(\d+)\b', norm)
-        level_match=re.search(r'\brequired\s+level\s*(?:<=|under|below|at most)\s*(\d+)\b', norm)
+        mp_match=_MP_LIMIT.search(norm)
+        level_match=_LEVEL_LIMIT.search(norm)
         ailment=None
         for known in self.repository.list_known_ailments():
             if f' {normalize_skill_name(known)} ' in f' {norm} ':
@@ -83,6 +131,9 @@ class SkillSearchService:
         if not bits and s.raw_text:bits.append(s.raw_text)
         return '\n\n'.join(bits)
     def search(self,query:str,*,allow_weak_fallback:bool=True)->SkillSearchOutcome:
+        return self.probe(query,allow_weak_fallback=allow_weak_fallback).materialize()
+    def probe(self,query:str,*,allow_weak_fallback:bool=True)->RouteProbe[SkillSearchOutcome]:
+        """Route quality of ``query``; skills are hydrated into cards only when materialized."""
         raw=' '.join(str(query).split());norm=normalize_skill_name(raw.strip(' ?!.'))
 
         def finish(
@@ -93,28 +144,33 @@ class SkillSearchService:
             family='none',
             specificity=0,
             interpretation=None,
+            *,
+            found=None,
         ):
-            return SkillSearchOutcome(
-                kind,
-                raw,
-                results,
-                message,
-                suggested_queries,
-                interpretation,
-                RouteQuality(family, bool(results), specificity),
-            )
+            def materialize():
+                cards=results() if callable(results) else results
+                return SkillSearchOutcome(
+                    kind,
+                    raw,
+                    cards,
+                    message,
+                    suggested_queries,
+                    interpretation,
+                    RouteQuality(family, bool(cards), specificity),
+                )
+            return RouteProbe(RouteQuality(family, bool(results) if found is None else found, specificity), materialize)
 
         if not raw:return finish('not_found',message='Enter a skill, tree, ailment, or objective skill query.')
         if _SUBJECTIVE.search(raw):return finish('refuse',message='This search compares objective database facts only; subjective DPS/tank/build recommendations are not supported.',family='structured')
-        skills=self._find_skill_phrases(raw)
-        if len(skills)>=2 and norm.startswith('compare '):
-            a,b=skills[:2]
+        skill_ids=self._find_skill_phrases(raw)
+        if len(skill_ids)>=2 and norm.startswith('compare '):
+            a,b=(self.repository.get_skill(i) for i in skill_ids[:2])
             msg=(f'{a.name} vs {b.name}\nTree: {self.repository.get_tree(a.tree_id).name} | {self.repository.get_tree(b.tree_id).name}\n'
                  f'Tier: {a.tier} | {b.tier}\nRequired Level: {a.required_level} | {b.required_level}\nMP: {a.mp_cost_text or "not recorded"} | {b.mp_cost_text or "not recorded"}\n'
                  f'Type: {a.skill_type or "not recorded"} | {b.skill_type or "not recorded"}')
             return finish('compare',self._cards((a,b)),msg,family='exact',specificity=2)
-        if len(skills)==1:
-            s=skills[0]
+        if len(skill_ids)==1:
+            s=self.repository.get_skill(skill_ids[0])
             if 'mp cost' in norm:return finish('structured',self._cards((s,),'mp_cost_value'),f'{s.name}: MP {s.mp_cost_text or "not recorded"}',family='exact',specificity=1)
             if 'what tree' in norm:return finish('structured',self._cards((s,)),f'{s.name} is in {self.repository.get_tree(s.tree_id).name}.',family='exact',specificity=1)
             if 'what tier' in norm:return finish('structured',self._cards((s,),'tier'),f'{s.name}: Tier {s.tier if s.tier is not None else "not recorded"}',family='exact',specificity=1)
@@ -125,7 +181,7 @@ class SkillSearchService:
         structured_filter=self._structured_filter_from_query(norm)
         has_explicit_filter=bool(structured_filter.tiers or structured_filter.skill_types or structured_filter.ailments or structured_filter.mp_cost_max is not None or structured_filter.required_level_max is not None)
         if has_explicit_filter:
-            rows=self.analytics.filter_skills(structured_filter)
+            ids=self.analytics.filter_skill_ids(structured_filter)
             unsupported=bool(structured_filter.tiers or structured_filter.skill_types or structured_filter.weapons)
             tree_name=None
             if structured_filter.tree_ids:
@@ -148,40 +204,37 @@ class SkillSearchService:
                 + int(structured_filter.required_level_max is not None)
             )
             if norm.startswith('how many'):
-                return finish('structured',message=f'{len(rows)} skills match those database filters.',family='structured',specificity=specificity,interpretation=interpretation)
-            cards=self._cards(rows)
-            return finish('results' if cards else 'not_found',cards,None if cards else 'No matching skills found.',family='structured',specificity=specificity,interpretation=interpretation)
+                return finish('structured',message=f'{len(ids)} skills match those database filters.',family='structured',specificity=specificity,interpretation=interpretation)
+            return finish('results' if ids else 'not_found',self._hydrated_cards(ids),None if ids else 'No matching skills found.',family='structured',specificity=specificity,interpretation=interpretation,found=bool(ids))
         for tree_name in self.repository.list_tree_names():
             tree=self.repository.resolve_tree_name(tree_name)[0];tn=normalize_skill_name(tree.name);short=tn[:-7].strip() if tn.endswith(' skills') else tn
             if norm in {tn,short,f'{short} skill tree',f'{short} skills tree'} or (short in norm and ('skill tree' in norm or 'skills' in norm)):
-                rows=self.repository.list_skills_in_tree(tree.id)
                 if 'mp' in norm and any(x in norm for x in ('lowest','least','highest')):
                     direction='desc' if 'highest' in norm else 'asc';rows=self.analytics.rank('mp_cost_value',direction,filters=SkillFilter(tree_ids=(tree.id,)),limit=20)
                     interpretation=build_skill_interpretation(tree_name=tree.name,mp_rank_direction=direction)
-                    return finish('results',self._cards(rows,'mp_cost_value'),family='structured',specificity=2,interpretation=interpretation)
-                cards=self._cards(rows)
-                return finish('results' if cards else 'not_found',cards,None if cards else 'No matching skills found.',family='structured',specificity=1,interpretation=build_skill_interpretation(tree_name=tree.name))
+                    return finish('results',lambda:self._cards(rows,'mp_cost_value'),family='structured',specificity=2,interpretation=interpretation,found=bool(rows))
+                ids=self.repository.list_skill_ids_in_tree(tree.id)
+                return finish('results' if ids else 'not_found',self._hydrated_cards(ids),None if ids else 'No matching skills found.',family='structured',specificity=1,interpretation=build_skill_interpretation(tree_name=tree.name),found=bool(ids))
         for ailment in self.repository.list_known_ailments():
             n=normalize_skill_name(ailment)
             if n in norm and any(w in norm for w in ('inflict','inflicts','cause','causes','ailment','skills')):
                 canonical=resolve_ailment(ailment,self.repository.list_known_ailments()) or ailment
-                rows=self.analytics.filter_skills(SkillFilter(ailments=(canonical,)))
-                cards=self._cards(rows,'ailments')
-                return finish('results' if cards else 'not_found',cards,None if cards else 'No matching skills found.',family='structured',specificity=1,interpretation=build_skill_interpretation(ailment=canonical))
+                ids=self.analytics.filter_skill_ids(SkillFilter(ailments=(canonical,)))
+                return finish('results' if ids else 'not_found',self._hydrated_cards(ids,'ailments'),None if ids else 'No matching skills found.',family='structured',specificity=1,interpretation=build_skill_interpretation(ailment=canonical),found=bool(ids))
         if 'mp' in norm and any(w in norm for w in ('lowest','least','highest')):
             direction='desc' if 'highest' in norm else 'asc';rows=self.analytics.rank('mp_cost_value',direction,limit=20)
-            cards=self._cards(rows,'mp_cost_value')
-            return finish('results' if cards else 'not_found',cards,None if cards else 'No matching skills found.',family='structured',specificity=1,interpretation=build_skill_interpretation(mp_rank_direction=direction))
+            return finish('results' if rows else 'not_found',lambda:self._cards(rows,'mp_cost_value'),None if rows else 'No matching skills found.',family='structured',specificity=1,interpretation=build_skill_interpretation(mp_rank_direction=direction),found=bool(rows))
         exact=self.repository.resolve_skill_name(raw)
-        if exact:return finish('results',self._cards(exact),family='exact',specificity=1)
+        if exact:return finish('results',lambda:self._cards(exact),family='exact',specificity=1,found=True)
         if not allow_weak_fallback:
             return finish('not_found',message='No matching skill database information found.')
+        from rapidfuzz import fuzz
         fuzzy=[]
-        for s in self.repository.all_skills():
-            score=max(float(fuzz.WRatio(norm,s.normalized_name)),float(fuzz.token_set_ratio(norm,s.normalized_name)))
-            if score>=88:fuzzy.append((score,s))
+        for skill_id,name in self._name_table():
+            score=max(float(fuzz.WRatio(norm,name)),float(fuzz.token_set_ratio(norm,name)))
+            if score>=88:fuzzy.append((score,name,skill_id))
         if fuzzy:
-            fuzzy.sort(key=lambda x:(-x[0],x[1].normalized_name,x[1].id));return finish('results',self._cards(tuple(s for _,s in fuzzy[:20])),family='weak')
+            fuzzy.sort(key=lambda x:(-x[0],x[1],x[2]));return finish('results',self._hydrated_cards(tuple(i for _,_,i in fuzzy[:20])),family='weak',found=True)
         hits=lexical_search(self.repository,raw,limit=20)
-        if hits:return finish('results',self._cards(tuple(self.repository.get_skill(h.skill_id) for h in hits)),family='weak')
+        if hits:return finish('results',self._hydrated_cards(tuple(h.skill_id for h in hits)),family='weak',found=True)
         return finish('not_found',message='No matching skill database information found.')
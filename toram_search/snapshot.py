@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from toram_search.autocomplete import build_autocomplete_index, suggestions_for_mode
+from toram_search.database import (
+    FOOD_ALIASES,
+    FOOD_ENTRIES,
+    ITEM_DATABASE,
+    REGISTLET_DATA,
+    SEARCH_SNAPSHOT,
+    SKILL_DATABASE,
+    file_fingerprint,
+)
+from toram_search.food.data import load_food_dataset, seed_food_dataset
+from toram_search.food.models import FoodDataset, FoodEntry, FoodStatDefinition
+from toram_search.interpretation import SearchDomain
+from toram_search.models import AutocompleteSuggestion, DatabaseMode
+from toram_search.registlets.data import load_registlet_dataset, seed_registlet_dataset
+from toram_search.registlets.models import RegistletDataset, RegistletRecord
+from toram_search.skill_icons import DEFAULT_SKILL_ICON_CATALOG, ICON_SIZES, SkillIconCatalog, icon_data_uri
+
+SNAPSHOT_MAGIC = b'TORAMIDX'
+SNAPSHOT_VERSION = 1
+_PREAMBLE = struct.Struct('<8sHHI')
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SourceIdentity:
+    size: int
+    mtime_ns: int
+    sha256: str
+
+    @classmethod
+    def of(cls, path: Path) -> SourceIdentity:
+        resolved = Path(path).expanduser().resolve()
+        try:
+            stat = resolved.stat()
+        except OSError:
+            return cls(-1, -1, 'missing')
+        return cls(stat.st_size, stat.st_mtime_ns, file_fingerprint(resolved))
+
+    def matches(self, path: Path) -> bool:
+        resolved = Path(path).expanduser().resolve()
+        try:
+            stat = resolved.stat()
+        except OSError:
+            return self.sha256 == 'missing'
+        if stat.st_size != self.size:
+            return False
+        # A checkout or copy changes mtimes without changing bytes, so only rehash when they differ.
+        return stat.st_mtime_ns == self.mtime_ns or file_fingerprint(resolved) == self.sha256
+
+
+def _source_paths(
+    items_path: Path,
+    skills_path: Path,
+    food_entries_path: Path,
+    food_aliases_path: Path,
+    registlets_path: Path,
+) -> dict[str, Path]:
+    return {
+        'items_path': Path(items_path),
+        'skills_path': Path(skills_path),
+        'food_entries_path': Path(food_entries_path),
+        'food_aliases_path': Path(food_aliases_path),
+        'registlets_path': Path(registlets_path),
+    }
+
+
+def _encode_food(dataset: FoodDataset) -> dict[str, Any]:
+    return {
+        'stats': [[row.key, row.display, list(row.aliases)] for row in dataset.stats],
+        'entries': [[row.code, row.stat_key, row.stat_display, row.level] for row in dataset.entries],
+        'warnings': list(dataset.warnings),
+    }
+
+
+def _decode_food(payload: dict[str, Any]) -> FoodDataset:
+    return FoodDataset(
+        stats=tuple(FoodStatDefinition(key, display, tuple(aliases)) for key, display, aliases in payload['stats']),
+        entries=tuple(FoodEntry(*row) for row in payload['entries']),
+        warnings=tuple(payload['warnings']),
+    )
+
+
+def _encode_registlets(dataset: RegistletDataset) -> dict[str, Any]:
+    return {
+        'records': [
+            [
+                row.name, row.max_lv, row.effect,
+                None if row.affects_skill is None else list(row.affects_skill),
+                row.source, row.location, list(row.source_levels),
+            ]
+            for row in dataset.records
+        ],
+        'valid_stoodie_levels': list(dataset.valid_stoodie_levels),
+        'warnings': list(dataset.warnings),
+    }
+
+
+def _decode_registlets(payload: dict[str, Any]) -> RegistletDataset:
+    return RegistletDataset(
+        records=tuple(
+            RegistletRecord(
+                name, max_lv, effect,
+                None if affects is None else tuple(affects),
+                source, location, tuple(levels),
+            )
+            for name, max_lv, effect, affects, source, location, levels in payload['records']
+        ),
+        valid_stoodie_levels=tuple(payload['valid_stoodie_levels']),
+        warnings=tuple(payload['warnings']),
+    )
+
+
+def _decode_autocomplete(payload: list[list[str]]) -> tuple[AutocompleteSuggestion, ...]:
+    return tuple(AutocompleteSuggestion(value, label, kind) for value, label, kind in payload)
+
+
+def _encode_skill_icons(catalog: SkillIconCatalog) -> dict[str, Any]:
+    payload = {}
+    for path in catalog.icon_paths():
+        identity = SourceIdentity.of(path)
+        payload[path.relative_to(catalog.root).as_posix()] = [
+            [identity.size, identity.mtime_ns, identity.sha256],
+            {str(size): icon_data_uri(path, size) for size in ICON_SIZES},
+        ]
+    return payload
+
+
+def _decode_skill_icons(payload: dict[str, Any]) -> dict[str, tuple[SourceIdentity, dict[int, str]]]:
+    return {
+        relative: (SourceIdentity(*identity), {int(size): uri for size, uri in uris.items()})
+        for relative, (identity, uris) in payload.items()
+    }
+
+
+_DECODERS: dict[str, Callable[[Any], Any]] = {
+    'autocomplete': _decode_autocomplete,
+    'food': _decode_food,
+    'registlets': _decode_registlets,
+    'skill_icons': _decode_skill_icons,
+}
+
+
+@dataclass(frozen=True)
+class SnapshotInfo:
+    path: Path
+    bytes: int
+    sections: dict[str, int]
+    available_domains: tuple[str, ...]
+    seconds: float
+
+
+def compile_snapshot(
+    output: Path = SEARCH_SNAPSHOT,
+    *,
+    items_path: Path = ITEM_DATABASE,
+    skills_path: Path = SKILL_DATABASE,
+    food_entries_path: Path = FOOD_ENTRIES,
+    food_aliases_path: Path = FOOD_ALIASES,
+    registlets_path: Path = REGISTLET_DATA,
+    available_domains: frozenset[SearchDomain],
+    skill_icons: SkillIconCatalog | None = DEFAULT_SKILL_ICON_CATALOG,
+) -> SnapshotInfo:
+    """Build every startup section live and write them to one versioned snapshot file."""
+    started = time.perf_counter()
+    paths = _source_paths(items_path, skills_path, food_entries_path, food_aliases_path, registlets_path)
+    sources = {name: SourceIdentity.of(path) for name, path in paths.items()}
+    payloads: dict[str, Any] = {
+        'autocomplete': [
+            [row.value, row.label, row.kind]
+            for row in build_autocomplete_index('Universal', **paths, available_domains=available_domains)
+        ],
+    }
+    if skill_icons is not None:
+        payloads['skill_icons'] = _encode_skill_icons(skill_icons)
+    if 'Food' in available_domains:
+        payloads['food'] = _encode_food(load_food_dataset(food_entries_path, food_aliases_path))
+    if 'Registlets' in available_domains:
+        payloads['registlets'] = _encode_registlets(load_registlet_dataset(registlets_path))
+
+    blobs = {
+        name: zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 6)
+        for name, payload in payloads.items()
+    }
+    sections: dict[str, dict[str, Any]] = {}
+    offset = 0
+    for name, blob in blobs.items():
+        sections[name] = {'offset': offset, 'length': len(blob), 'sha256': hashlib.sha256(blob).hexdigest()}
+        offset += len(blob)
+    header = {
+        'sources': {name: [row.size, row.mtime_ns, row.sha256] for name, row in sources.items()},
+        'available_domains': sorted(available_domains),
+        'sections': sections,
+    }
+    header['checksum'] = hashlib.sha256(
+        json.dumps(header, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    ).hexdigest()
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+
+    output = Path(output)
+    temporary = output.with_name(f'.{output.name}.{os.getpid()}.tmp')
+    with temporary.open('wb') as handle:
+        handle.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(header_bytes)))
+        handle.write(header_bytes)
+        for blob in blobs.values():
+            handle.write(blob)
+    os.replace(temporary, output)
+    return SnapshotInfo(
+        output,
+        output.stat().st_size,
+        {name: len(blob) for name, blob in blobs.items()},
+        tuple(sorted(available_domains)),
+        time.perf_counter() - started,
+    )
+
+
+class SearchSnapshot:
+    """Memory-mapped snapshot whose sections are verified and decoded on first use."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open('rb') as handle:
+            try:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:
+                raise SnapshotError(f'{self.path}: empty snapshot') from exc
+        try:
+            self._read_header()
+        except Exception:
+            self._map.close()
+            raise
+        self._decoded: dict[str, Any] = {}
+
+    def _read_header(self) -> None:
+        if len(self._map) < _PREAMBLE.size:
+            raise SnapshotError(f'{self.path}: truncated snapshot')
+        magic, version, _, header_length = _PREAMBLE.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f'{self.path}: not a search snapshot')
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f'{self.path}: snapshot version {version}, expected {SNAPSHOT_VERSION}')
+        start = _PREAMBLE.size
+        try:
+            header = json.loads(self._map[start:start + header_length])
+        except ValueError as exc:
+            raise SnapshotError(f'{self.path}: unreadable header') from exc
+        checksum = header.pop('checksum', None)
+        expected = hashlib.sha256(
+            json.dumps(header, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        ).hexdigest()
+        if checksum != expected:
+            raise SnapshotError(f'{self.path}: header checksum mismatch')
+        self._data_start = start + header_length
+        self.sections: dict[str, dict[str, Any]] = header['sections']
+        self.available_domains: frozenset[SearchDomain] = frozenset(header['available_domains'])
+        self.sources = {name: SourceIdentity(*row) for name, row in header['sources'].items()}
+        end = max((row['offset'] + row['length'] for row in self.sections.values()), default=0)
+        if self._data_start + end > len(self._map):
+            raise SnapshotError(f'{self.path}: truncated section data')
+
+    def matches(self, paths: dict[str, Path]) -> bool:
+        return all(
+            name in self.sources and self.sources[name].matches(path)
+            for name, path in paths.items()
+        )
+
+    def section(self, name: str) -> Any:
+        if name in self._decoded:
+            return self._decoded[name]
+        meta = self.sections.get(name)
+        if meta is None:
+            return None
+        start = self._data_start + meta['offset']
+        blob = self._map[start:start + meta['length']]
+        if hashlib.sha256(blob).hexdigest() != meta['sha256']:
+            raise SnapshotError(f'{self.path}: section {name!r} checksum mismatch')
+        value = _DECODERS[name](json.loads(zlib.decompress(blob)))
+        self._decoded[name] = value
+        return value
+
+    def autocomplete_index(
+        self,
+        mode: DatabaseMode,
+        available_domains: frozenset[SearchDomain],
+    ) -> tuple[AutocompleteSuggestion, ...] | None:
+        if available_domains != self.available_domains:
+            return None
+        rows = self.section('autocomplete')
+        return None if rows is None else suggestions_for_mode(rows, mode)
+
+    def skill_icon(self, relative: str, path: Path, size: int) -> str | None:
+        """Pre-resized data URI for an icon, unless the icon file changed after compiling."""
+        icons = self.section('skill_icons')
+        row = icons.get(relative) if icons is not None else None
+        if row is None or not row[0].matches(path):
+            return None
+        return row[1].get(size)
+
+    def seed_datasets(
+        self,
+        paths: dict[str, Path],
+        skill_icons: SkillIconCatalog = DEFAULT_SKILL_ICON_CATALOG,
+    ) -> None:
+        food = self.section('food')
+        if food is not None:
+            seed_food_dataset(paths['food_entries_path'], paths['food_aliases_path'], food)
+        registlets = self.section('registlets')
+        if registlets is not None:
+            seed_registlet_dataset(paths['registlets_path'], registlets)
+        if 'skill_icons' in self.sections:
+            skill_icons.use_prebuilt(self.skill_icon)
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def load_current_snapshot(
+    path: Path = SEARCH_SNAPSHOT,
+    *,
+    items_path: Path = ITEM_DATABASE,
+    skills_path: Path = SKILL_DATABASE,
+    food_entries_path: Path = FOOD_ENTRIES,
+    food_aliases_path: Path = FOOD_ALIASES,
+    registlets_path: Path = REGISTLET_DATA,
+    skill_icons: SkillIconCatalog = DEFAULT_SKILL_ICON_CATALOG,
+) -> SearchSnapshot | None:
+    """Open the snapshot and seed its datasets, or return ``None`` so callers build live."""
+    paths = _source_paths(items_path, skills_path, food_entries_path, food_aliases_path, registlets_path)
+    try:
+        snapshot = SearchSnapshot(path)
+    except (OSError, SnapshotError):
+        return None
+    try:
+        if not snapshot.matches(paths):
+            snapshot.close()
+            return None
+        snapshot.seed_datasets(paths, skill_icons)
+    except (OSError, SnapshotError, ValueError, KeyError):
+        snapshot.close()
+        return None
+    return snapshot
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+
+from toram_search.models import UniversalSearchOutcome
+
+# Follow-up searches run per outcome; suggestion rows show at most four buttons.
+SPECULATIVE_QUERIES = 4
+# Speculation may spend this many CPU seconds, refilled over SPECULATION_WINDOW seconds.
+SPECULATION_CPU_BUDGET = 2.0
+SPECULATION_WINDOW = 60.0
+
+
+def follow_up_queries(outcome: UniversalSearchOutcome, limit: int = SPECULATIVE_QUERIES) -> tuple[str, ...]:
+    """The searches one click away from ``outcome``: suggested queries, then filter chips removed.
+
+    Suggested and clarifying queries come first because ``suggest`` and ``clarify`` outcomes
+    exist to be followed; chip removals are a query minus one parsed filter.
+    """
+    queries: list[str] = []
+    for domain in (outcome.items, outcome.skills, outcome.food, outcome.registlets):
+        if domain is not None:
+            queries.extend(domain.suggested_queries)
+    if outcome.interpretation is not None:
+        queries.extend(chip.query_without for chip in outcome.interpretation.chips)
+    current = ' '.join(outcome.query.split())
+    unique = dict.fromkeys(' '.join(query.split()) for query in queries)
+    return tuple(query for query in unique if query and query != current)[:limit]
+
+
+class CpuBudget:
+    """Token bucket of CPU seconds: ``capacity`` at most, refilled evenly over ``window`` seconds."""
+
+    def __init__(self, capacity: float = SPECULATION_CPU_BUDGET, window: float = SPECULATION_WINDOW) -> None:
+        self.capacity = capacity
+        self.rate = capacity / window
+        self._available = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self) -> bool:
+        with self._lock:
+            self._refill()
+            return self._available > 0
+
+    def charge(self, seconds: float) -> None:
+        with self._lock:
+            self._refill()
+            self._available -= seconds
+
+
+@dataclass(frozen=True)
+class SpeculationStats:
+    """Follow-up searches run ahead of a click, how many were then asked for, and how many were skipped."""
+
+    run: int = 0
+    hits: int = 0
+    skipped: int = 0
+    cpu: float = 0.0
+
+    @property
+    def hit_rate(self) -> float | None:
+        return self.hits / self.run if self.run else None
+
+    def format(self) -> str:
+        rate = f'{self.hit_rate:.0%}' if self.hit_rate is not None else 'n/a'
+        return (
+            f'{self.run} speculative searches, {self.hits} used ({rate}), '
+            f'{self.skipped} skipped, {self.cpu * 1000:.1f} ms CPU'
+        )
+
+
+__all__ = ['CpuBudget', 'SPECULATIVE_QUERIES', 'SpeculationStats', 'follow_up_queries']
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from collections import Counter
+from pathlib import Path
+from typing import get_args
+
+from toram_search.models import DatabaseMode
+
+DEFAULT_WARM_TOP = 50
+_MODES: tuple[DatabaseMode, ...] = get_args(DatabaseMode)
+
+# The suggested searches shown under the search box; they are also the first queries warmed after startup.
+EXAMPLE_QUERIES: dict[DatabaseMode, tuple[str, ...]] = {
+    'Universal': ('critical rate', 'food maxmp', 'physical pierce'),
+    'Items': ('cr bow', 'hp >= 5000 armor', 'highest cr'),
+    'Skills': ('Guardian', 'Shield Skills', 'skills that inflict stun'),
+    'Food': ('food maxmp', 'code ampr', 'food dt fire'),
+    'Registlets': ('std 220', 'Arrow Rain Enhancer', 'physical pierce'),
+}
+
+
+def _parse_line(line: str) -> tuple[DatabaseMode, str] | None:
+    text = line.strip()
+    if not text or text.startswith('#'):
+        return None
+    mode, separator, query = text.partition('\t')
+    if separator and mode in _MODES:
+        text = query
+    else:
+        mode = 'Universal'
+    query = ' '.join(text.split())
+    return (mode, query) if query else None
+
+
+def load_top_queries(path: Path | None, limit: int = DEFAULT_WARM_TOP) -> tuple[tuple[DatabaseMode, str], ...]:
+    """The ``limit`` most frequent searches in a query file, most frequent first.
+
+    Each line is a query, optionally prefixed by its mode and a tab; lines without a mode are
+    Universal searches. A query log with one line per search and a hand-written list of
+    distinct queries both work: ties keep the order of first appearance. A missing or
+    unreadable file yields nothing.
+    """
+    if path is None or limit <= 0:
+        return ()
+    try:
+        lines = Path(path).read_text(encoding='utf-8').splitlines()
+    except (OSError, UnicodeDecodeError):
+        return ()
+    counts = Counter(parsed for parsed in map(_parse_line, lines) if parsed is not None)
+    return tuple(search for search, _ in counts.most_common(limit))
+
+
+def warm_searches(
+    top_queries: Path | None = None,
+    limit: int = DEFAULT_WARM_TOP,
+) -> tuple[tuple[DatabaseMode, str], ...]:
+    """Every example search, then the top searches of ``top_queries``, without duplicates."""
+    examples = [(mode, query) for mode, queries in EXAMPLE_QUERIES.items() for query in queries]
+    return tuple(dict.fromkeys([*examples, *load_top_queries(top_queries, limit)]))
+
+
+__all__ = ['DEFAULT_WARM_TOP', 'EXAMPLE_QUERIES', 'load_top_queries', 'warm_searches']
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from toram_search.engine import EngineTimings
+from toram_search.memory import format_bytes, memory_report, start_tracing, stop_tracing, tracing_session
+from toram_search.speculation import SpeculationStats
+
+ADMIN_TOKEN_ENV = 'TORAM_SEARCH_ADMIN_TOKEN'
+
+
+def is_admin() -> bool:
+    token = os.environ.get(ADMIN_TOKEN_ENV, '')
+    supplied = st.query_params.get('admin')
+    return bool(token) and supplied is not None and hmac.compare_digest(str(supplied), token)
+
+
+def current_session_id() -> str:
+    context = get_script_run_ctx()
+    return context.session_id if context is not None else 'local'
+
+
+def release_tracing() -> None:
+    """Stop allocation tracing once the admin session that started it has ended or left the admin view."""
+    owner = tracing_session()
+    if owner is None:
+        return
+    if owner == current_session_id():
+        ended = not is_admin()
+    else:
+        ended = runtime.exists() and not runtime.get_instance().is_active_session(owner)
+    if ended:
+        stop_tracing()
+
+
+def record_cpu(scope: str, started: float) -> None:
+    """Keep the server CPU time of the last run of ``scope``, measured from ``time.thread_time()``."""
+    st.session_state.setdefault('admin_cpu_ms', {})[scope] = (time.thread_time() - started) * 1000
+
+
+@contextmanager
+def measure_cpu(scope: str) -> Iterator[None]:
+    started = time.thread_time()
+    try:
+        yield
+    finally:
+        record_cpu(scope, started)
+
+
+def render_memory_panel(
+    *,
+    timings: EngineTimings | None = None,
+    coalesced_searches: int = 0,
+    speculation: SpeculationStats | None = None,
+) -> None:
+    with st.sidebar.expander('Memory (admin)'):
+        if timings is not None:
+            st.caption(f'Search engine: {timings.format()}; coalesced searches {coalesced_searches}')
+        if speculation is not None:
+            st.caption(f'Speculation: {speculation.format()}')
+        cpu = st.session_state.get('admin_cpu_ms', {})
+        if cpu:
+            st.caption('Server CPU, last run: ' + ' · '.join(f'{scope} {ms:.1f} ms' for scope, ms in sorted(cpu.items())))
+        session_id = current_session_id()
+        traced = tracing_session() == session_id
+        tracing = st.toggle('Trace my searches', value=traced, key='admin_tracemalloc')
+        if tracing and not traced:
+            start_tracing(session_id)
+        elif not tracing and traced:
+            stop_tracing()
+
+        report = memory_report()
+        st.metric('Caches and indexes', format_bytes(report.cache_bytes))
+        st.dataframe(
+            [
+                {'Cache': row.name, 'Entries': row.entries, 'Size': format_bytes(row.bytes)}
+                for row in report.caches
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.metric(f'Held by sessions · {len(report.sessions)}', format_bytes(report.session_bytes))
+        if report.sessions:
+            st.dataframe(
+                [
+                    {
+                        'Session': row.session_id[:8],
+                        'Query': row.query,
+                        'Held': format_bytes(row.outcome_bytes),
+                        'Traced': format_bytes(row.traced_bytes),
+                    }
+                    for row in sorted(report.sessions, key=lambda row: -row.outcome_bytes)
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
+        if report.traced_current is not None:
+            st.caption(
+                f'tracemalloc current {format_bytes(report.traced_current)} · '
+                f'peak {format_bytes(report.traced_peak)}'
+            )
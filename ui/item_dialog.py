@@ -1,6 +1,7 @@
 from __future__ import annotations
 import streamlit as st
-from toram_search.items.models import ItemDetail
+from toram_search.engine import SearchEngine
+from toram_search.item_thumbnails import DEFAULT_ITEM_THUMBNAILS
 
 def _amount(value: object) -> str:
     try: number=float(value)
@@ -8,10 +9,14 @@ def _amount(value: object) -> str:
     return str(int(number)) if number.is_integer() else f'{number:g}'
 
 @st.dialog('Item details')
-def show_item_dialog(detail: ItemDetail) -> None:
+def show_item_dialog(item_id: int, *, engine: SearchEngine) -> None:
+    try: detail=engine.item_detail(item_id)
+    except KeyError:
+        st.info('This item is no longer in the database.'); return
     st.subheader(detail.summary.name); st.caption(detail.summary.item_type)
-    image_urls=[str(row.get('source_url')) for row in detail.images if row.get('source_url')]
-    if image_urls: st.image(image_urls[0], width=220)
+    images=[DEFAULT_ITEM_THUMBNAILS.data_uri(row.get('local_path'),220) or row.get('source_url') for row in detail.images]
+    image=next((str(image) for image in images if image),None)
+    if image: st.image(image, width=220)
     if detail.badge: st.write(f'**Badge:** {detail.badge}')
     if detail.sell_price is not None: st.write(f'**Sell:** {_amount(detail.sell_price)}')
     if detail.process_material:
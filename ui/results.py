@@ -1,16 +1,22 @@
 from __future__ import annotations
-from pathlib import Path
 import streamlit as st
+from toram_search.engine import SearchEngine
+from toram_search.paging import OutcomeDomain
 from toram_search.food.models import FoodSearchOutcome
 from toram_search.items.models import ItemSearchOutcome
 from toram_search.registlets.models import RegistletSearchOutcome
 from toram_search.skills.models import SkillSearchOutcome
+from ui.admin import measure_cpu
 from ui.food_cards import render_food_cards
 from ui.item_cards import render_item_cards
 from ui.registlet_cards import render_registlet_cards
 from ui.skill_cards import render_skill_cards
 
 
+def _total(outcome)->int:
+    return outcome.total if outcome.total is not None else len(outcome.results)
+
+
 def _render_message(kind:str,message:str|None,suggestions:tuple[str,...],*,key_prefix:str)->str|None:
     if message:
         if kind=='refuse': st.warning(message)
@@ -27,32 +33,64 @@ def _render_message(kind:str,message:str|None,suggestions:tuple[str,...],*,key_p
     return None
 
 
-def render_item_results(outcome:ItemSearchOutcome,*,database_path:Path,limit:int)->str|None:
+def render_item_results(outcome:ItemSearchOutcome,*,engine:SearchEngine)->str|None:
     fill_query=_render_message(outcome.kind,outcome.message,outcome.suggested_queries,key_prefix='item')
     if outcome.results:
-        st.markdown(f'### Items · {len(outcome.results)}'); render_item_cards(outcome.results,database_path=database_path,limit=limit)
+        st.markdown(f'### Items · {_total(outcome)}'); render_item_cards(outcome.results,engine=engine,limit=len(outcome.results))
     return fill_query
 
 
-def render_skill_results(outcome:SkillSearchOutcome,*,limit:int)->str|None:
+def render_skill_results(outcome:SkillSearchOutcome)->str|None:
     fill_query=_render_message(outcome.kind,outcome.message,outcome.suggested_queries,key_prefix='skill')
     if outcome.results:
-        st.markdown(f'### Skills · {len(outcome.results)}'); render_skill_cards(outcome.results,limit=limit)
+        st.markdown(f'### Skills · {_total(outcome)}'); render_skill_cards(outcome.results,limit=len(outcome.results))
     return fill_query
 
 
-def render_food_results(outcome:FoodSearchOutcome,*,limit:int)->str|None:
+def render_food_results(outcome:FoodSearchOutcome)->str|None:
     fill_query=_render_message(outcome.kind,outcome.message,outcome.suggested_queries,key_prefix='food')
     if outcome.results:
-        st.markdown(f'### Food Codes · {len(outcome.results)}')
+        st.markdown(f'### Food Codes · {_total(outcome)}')
         st.caption(outcome.results[0].stat_display)
-        render_food_cards(outcome.results,limit=limit)
+        render_food_cards(outcome.results,limit=len(outcome.results))
     return fill_query
 
 
-def render_registlet_results(outcome:RegistletSearchOutcome,*,limit:int)->str|None:
+def render_registlet_results(outcome:RegistletSearchOutcome)->str|None:
     fill_query=_render_message(outcome.kind,outcome.message,outcome.suggested_queries,key_prefix='registlet')
     if outcome.results:
-        st.markdown(f'### Registlets · {len(outcome.results)}')
-        render_registlet_cards(outcome.results,limit=limit,match=outcome.match)
+        st.markdown(f'### Registlets · {_total(outcome)}')
+        render_registlet_cards(outcome.results,limit=len(outcome.results),match=outcome.match)
     return fill_query
+
+
+_SHOW_MORE:dict[OutcomeDomain,tuple[str,str]]={
+    'items':('Show more items','show_more_items'),
+    'skills':('Show more skills','show_more_skills'),
+    'food':('Show more Food codes','show_more_food'),
+    'registlets':('Show more Registlets','show_more_registlets'),
+}
+
+
+def _show_more(domain:OutcomeDomain)->None:
+    handle=st.session_state.last_search
+    if handle is not None: st.session_state.last_search=handle.show_more(domain)
+
+
+@st.fragment
+def render_domain_results(domain:OutcomeDomain,*,engine:SearchEngine)->None:
+    """One domain's results as its own fragment: paging and detail dialogs rerun only this part."""
+    with measure_cpu(f'results.{domain}'):
+        handle=st.session_state.last_search
+        shown=getattr(engine.outcome(handle,domains=(domain,)),domain) if handle is not None else None
+        if shown is None: return
+        if domain=='items': fill=render_item_results(shown,engine=engine)
+        elif domain=='skills': fill=render_skill_results(shown)
+        elif domain=='food': fill=render_food_results(shown)
+        else: fill=render_registlet_results(shown)
+        if fill is not None:
+            st.session_state.query=fill
+            st.session_state.last_search=None
+            st.rerun()
+        label,key=_SHOW_MORE[domain]
+        if shown.cursor is not None: st.button(label,key=key,on_click=_show_more,args=(domain,))
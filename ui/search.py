@@ -2,12 +2,21 @@ from __future__ import annotations
 
 from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Callable
 
+import streamlit as st
 import streamlit.components.v1 as components
 
+from toram_search.autocomplete import AutocompleteEngine, encode_suggestions
 from toram_search.models import AutocompleteSuggestion
 
 _COMPONENT_PATH = Path(__file__).resolve().parents[1] / 'components' / 'autocomplete_search'
+_COMPONENT_KEY = 'toram_search_box'
+_SENT_KEY = 'toram_search_box_sent'
+_RESYNC_KEY = 'toram_search_box_resync'
+SENT_HASH_LIMIT = 4
+CLIENT_SUGGESTION_LIMIT = 1500
+MATCH_LIMIT = 6
 autocomplete_search = components.declare_component('autocomplete_search', path=str(_COMPONENT_PATH))
 
 
@@ -17,8 +26,41 @@ class SearchSubmission:
     nonce: int
 
 
-def render_search_box(*, value: str, suggestions: tuple[AutocompleteSuggestion, ...], placeholder: str, disabled: bool = False) -> SearchSubmission | None:
-    result = autocomplete_search(value=value, suggestions=[asdict(row) for row in suggestions], placeholder=placeholder, disabled=disabled, default=None, key='toram_search_box')
+def _pending_typed_value() -> str | None:
+    pending = st.session_state.get(_COMPONENT_KEY)
+    if not isinstance(pending, dict) or pending.get('event') != 'type':
+        return None
+    return str(pending.get('value') or '')
+
+
+def _client_has(digest: str) -> bool:
+    # The component caches the last few decoded lists by hash; it asks for a resync when a bare hash is unknown to it.
+    pending = st.session_state.get(_COMPONENT_KEY)
+    if isinstance(pending, dict) and pending.get('event') == 'resync' and pending.get('nonce') != st.session_state.get(_RESYNC_KEY):
+        st.session_state[_RESYNC_KEY] = pending.get('nonce'); st.session_state[_SENT_KEY] = ()
+        return False
+    return digest in st.session_state.get(_SENT_KEY, ())
+
+
+def _suggestion_payload(wire: dict[str, object]) -> dict[str, object]:
+    digest = str(wire['hash'])
+    if _client_has(digest): return {'hash': digest}
+    sent = tuple(value for value in st.session_state.get(_SENT_KEY, ()) if value != digest)
+    st.session_state[_SENT_KEY] = (*sent, digest)[-SENT_HASH_LIMIT:]
+    return wire
+
+
+def render_search_box(*, value: str, suggestions: tuple[AutocompleteSuggestion, ...], placeholder: str, disabled: bool = False, engine: AutocompleteEngine | None = None, on_top_match: Callable[[str], None] | None = None) -> SearchSubmission | None:
+    # Small lists ship once and rank in the browser; large ones stay here and only the top-k rows go out per keystroke.
+    if engine is None or len(engine) <= CLIENT_SUGGESTION_LIMIT:
+        wire = engine.wire if engine is not None else encode_suggestions(suggestions)
+        result = autocomplete_search(value=value, suggestions=_suggestion_payload(wire), placeholder=placeholder, disabled=disabled, default=None, key=_COMPONENT_KEY)
+    else:
+        typed = _pending_typed_value()
+        matches = engine.matches(typed, MATCH_LIMIT) if typed else ()
+        # Only this path ranks on the server, so only here is the top suggestion known in time to search it ahead.
+        if matches and on_top_match is not None: on_top_match(matches[0].value)
+        result = autocomplete_search(value=value, suggestions=None, matches=[asdict(row) for row in matches], matches_for=typed, placeholder=placeholder, disabled=disabled, default=None, key=_COMPONENT_KEY)
     if not isinstance(result, dict) or result.get('event') != 'submit': return None
     query = str(result.get('value') or '').strip(); nonce = result.get('nonce')
     if not query or not isinstance(nonce, int): return None
@@ -7,7 +7,7 @@ from ui.skill_dialog import show_skill_dialog
 
 def _render_skill_header(card: SkillCardResult) -> None:
     skill=card.skill
-    icon=DEFAULT_SKILL_ICON_CATALOG.resolve(card.tree_name,skill.name)
+    icon=DEFAULT_SKILL_ICON_CATALOG.data_uri(card.tree_name,skill.name,64)
     if icon is None:
         st.markdown(f'**{skill.name}**')
         meta=[card.tree_name]
@@ -16,7 +16,7 @@ def _render_skill_header(card: SkillCardResult) -> None:
         return
     icon_column,text_column=st.columns([1,4])
     with icon_column:
-        st.image(str(icon),width=64)
+        st.image(icon,width=64)
     with text_column:
         st.markdown(f'**{skill.name}**')
         meta=[card.tree_name]
@@ -7,11 +7,11 @@ from toram_search.skills.models import SkillCardResult
 @st.dialog('Skill details')
 def show_skill_dialog(card: SkillCardResult) -> None:
     skill=card.skill
-    icon=DEFAULT_SKILL_ICON_CATALOG.resolve(card.tree_name,skill.name)
+    icon=DEFAULT_SKILL_ICON_CATALOG.data_uri(card.tree_name,skill.name,96)
     if icon is not None:
         icon_column,text_column=st.columns([1,4])
         with icon_column:
-            st.image(str(icon),width=96)
+            st.image(icon,width=96)
         with text_column:
             st.subheader(skill.name)
             header=[card.tree_name]